@@ -0,0 +1,429 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Callable
+
+import asyncpg
+from decouple import config
+from sqlalchemy.engine import make_url
+
+from app.database import DATABASE_URL
+from app.utils.frames import Frame
+from app.utils.websocket_enums import BrokerBackend
+
+logger = logging.getLogger(__name__)
+
+BROKER_BACKEND: BrokerBackend = config(
+    "WS_BROKER", default=BrokerBackend.MEMORY.value, cast=BrokerBackend
+)
+# Channel used for LISTEN/NOTIFY by the PostgreSQL broker
+BROKER_CHANNEL: str = config("WS_BROKER_CHANNEL", default="apms_ws")
+# Seconds to wait before the PostgreSQL broker reconnects its listener
+BROKER_RECONNECT_DELAY: float = config(
+    "WS_BROKER_RECONNECT_DELAY", default=1.0, cast=float
+)
+
+# Seconds between the announcements of the clients connected to each process
+BROKER_PRESENCE_INTERVAL: float = config(
+    "WS_BROKER_PRESENCE_INTERVAL", default=5.0, cast=float
+)
+# Seconds after which the clients announced by a silent process are forgotten
+BROKER_PRESENCE_TTL: float = 3 * BROKER_PRESENCE_INTERVAL
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_PAYLOAD: int = 7999
+# Characters of a larger payload sent per NOTIFY. The payload is ASCII JSON, and quoting
+# it again as the part of a chunk at most doubles it, leaving room for the chunk header
+NOTIFY_CHUNK_SIZE: int = (MAX_NOTIFY_PAYLOAD - 256) // 2
+
+# Receives the topic and the frame
+DeliveryHandler = Callable[[str, Frame], None]
+
+
+class Broker(ABC):
+    """
+    Carries WebSocket frames to the ConnectionManager of every process, so
+    that a frame published by one worker reaches the clients connected to any worker.
+    """
+
+    def __init__(self):
+        self.handler: DeliveryHandler | None = None
+
+    async def start(self, handler: DeliveryHandler) -> None:
+        """
+        Starts the broker.
+
+        Args:
+            handler (DeliveryHandler): Called with every frame published by any process.
+        """
+        self.handler = handler
+
+    async def stop(self) -> None:
+        """
+        Stops the broker.
+        """
+        self.handler = None
+
+    @abstractmethod
+    async def publish(self, topic: str, frame: Frame) -> None:
+        """
+        Publishes a frame to every process.
+
+        Args:
+            topic (str): The topic of the frame.
+            frame (Frame): The frame.
+        """
+
+    def deliver(self, topic: str, frame: Frame) -> None:
+        """
+        Passes a frame to the handler of this process.
+
+        Args:
+            topic (str): The topic of the frame.
+            frame (Frame): The frame.
+        """
+        if self.handler is not None:
+            self.handler(topic, frame)
+
+    def announce(self, clients: frozenset[str]) -> None:
+        """
+        Shares the identifiers of the clients connected to this process with the other
+        processes.
+
+        Args:
+            clients (frozenset[str]): The client identifiers.
+        """
+
+    def is_remote_client(self, client_id: str) -> bool:
+        """
+        Args:
+            client_id (str): The client identifier.
+
+        Returns:
+            bool: True if the client is connected to another process.
+        """
+        return False
+
+
+class InMemoryBroker(Broker):
+    """
+    Delivers frames to the connections of the current process only. Suitable for a single
+    worker.
+    """
+
+    async def publish(self, topic: str, frame: Frame) -> None:
+        self.deliver(topic, frame)
+
+
+class PostgresBroker(Broker):
+    """
+    Relays frames through PostgreSQL LISTEN/NOTIFY, so every worker and pod connected to
+    the same database delivers them to its own connections.
+
+    Frames too large for a NOTIFY payload are split into chunks sent in one transaction,
+    which PostgreSQL delivers together and in order, and joined by the receivers. Every
+    process also announces its connected clients on connect and disconnect, and every
+    BROKER_PRESENCE_INTERVAL seconds, so any worker can tell whether a client is
+    connected to another one.
+    """
+
+    def __init__(self, dsn: str, channel: str = BROKER_CHANNEL):
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self.pool: asyncpg.Pool | None = None
+        self.listener_task: asyncio.Task | None = None
+        self.presence_task: asyncio.Task | None = None
+        # Identifies the notifications of this process
+        self.process_id: str = uuid.uuid4().hex
+        # Clients connected to this process, and to the other processes with the time
+        # their announcement expires
+        self.clients: frozenset[str] = frozenset()
+        self.remote_clients: dict[str, tuple[frozenset[str], float]] = {}
+        self.announce_requested = asyncio.Event()
+        # Parts received of the chunked payloads, by chunk identifier
+        self.chunks: dict[str, list[str | None]] = {}
+
+    async def start(self, handler: DeliveryHandler) -> None:
+        await super().start(handler)
+
+        self.pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=4)
+
+        # Listen before returning, frames published earlier would be missed
+        connection, lost = await self._connect_listener()
+        self.listener_task = asyncio.create_task(self._listen(connection, lost))
+        self.presence_task = asyncio.create_task(self._announce_clients())
+
+    async def stop(self) -> None:
+        for task in (self.presence_task, self.listener_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self.presence_task, self.listener_task = None, None
+
+        if self.pool is not None:
+            try:
+                # Let the other processes forget the clients of this one right away
+                await self._notify(json.dumps({"presence": self.process_id}))
+            except Exception as e:
+                logger.warning(
+                    "WebSocket broker failed to announce its stop error=%s", e
+                )
+
+            await self.pool.close()
+            self.pool = None
+
+        await super().stop()
+
+    async def publish(self, topic: str, frame: Frame) -> None:
+        # The frame travels as its JSON text, which the receivers reuse as is
+        payload: str = json.dumps({"topic": topic, "message": frame.encode()})
+
+        if self.pool is None:
+            logger.warning("Frame not relayed to other processes topic=%s", topic)
+            self.deliver(topic, frame)
+            return
+
+        await self._notify(payload)
+
+    def announce(self, clients: frozenset[str]) -> None:
+        self.clients = clients
+        self.announce_requested.set()
+
+    def is_remote_client(self, client_id: str) -> bool:
+        now: float = time.monotonic()
+        return any(
+            client_id in clients and expires_at > now
+            for clients, expires_at in self.remote_clients.values()
+        )
+
+    async def _notify(self, payload: str) -> None:
+        """
+        Sends a payload to every process, in chunks if it is too large for one NOTIFY.
+
+        Args:
+            payload (str): The payload, ASCII JSON.
+        """
+
+        if len(payload) <= MAX_NOTIFY_PAYLOAD:
+            await self.pool.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+            return
+
+        chunk_id: str = uuid.uuid4().hex
+        parts: list[str] = [
+            payload[start : start + NOTIFY_CHUNK_SIZE]
+            for start in range(0, len(payload), NOTIFY_CHUNK_SIZE)
+        ]
+
+        async with self.pool.acquire() as connection:
+            async with connection.transaction():
+                await connection.executemany(
+                    "SELECT pg_notify($1, $2)",
+                    [
+                        (
+                            self.channel,
+                            json.dumps(
+                                {
+                                    "chunk": chunk_id,
+                                    "index": index,
+                                    "count": len(parts),
+                                    "part": part,
+                                }
+                            ),
+                        )
+                        for index, part in enumerate(parts)
+                    ],
+                )
+
+    async def _announce_clients(self) -> None:
+        """
+        Announces the clients connected to this process every BROKER_PRESENCE_INTERVAL
+        seconds, and as soon as they change or another process starts.
+        """
+        while True:
+            self.announce_requested.clear()
+            try:
+                await self._notify(
+                    json.dumps(
+                        {"presence": self.process_id, "clients": sorted(self.clients)}
+                    )
+                )
+            except Exception as e:
+                logger.warning(
+                    "WebSocket broker failed to announce the clients error=%s", e
+                )
+
+            try:
+                await asyncio.wait_for(
+                    self.announce_requested.wait(), timeout=BROKER_PRESENCE_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def _on_notification(
+        self, connection: asyncpg.Connection, pid: int, channel: str, payload: str
+    ) -> None:
+        """
+        Handles a notification received from PostgreSQL: delivers a frame to the handler,
+        stores the clients announced by another process, or keeps the part of a chunked
+        payload until the last part arrives.
+        """
+        try:
+            notification: dict = json.loads(payload)
+        except ValueError:
+            return
+
+        if "chunk" in notification:
+            notification = self._join_chunk(notification)
+            if notification is None:
+                return
+
+        if "presence" in notification:
+            self._update_remote_clients(notification)
+            return
+
+        self.deliver(
+            notification.get("topic", ""), Frame(text=notification.get("message", ""))
+        )
+
+    def _join_chunk(self, chunk: dict) -> dict | None:
+        """
+        Args:
+            chunk (dict): The chunk {"chunk": ..., "index": ..., "count": ..., "part": ...}.
+
+        Returns:
+            dict | None: The notification once every part of it has arrived, otherwise
+                None.
+        """
+
+        parts = self.chunks.setdefault(chunk["chunk"], [None] * chunk["count"])
+        parts[chunk["index"]] = chunk["part"]
+        if any(part is None for part in parts):
+            return None
+
+        del self.chunks[chunk["chunk"]]
+        try:
+            return json.loads("".join(parts))
+        except ValueError:
+            return None
+
+    def _update_remote_clients(self, presence: dict) -> None:
+        """
+        Stores the clients announced by another process, or forgets them when the
+        process stops. A process announcing itself for the first time is answered with
+        the clients of this one, so it does not wait for the next announcement.
+
+        Args:
+            presence (dict): The announcement {"presence": ..., "clients": [...]}, without
+                clients when the process stops.
+        """
+
+        process_id: str = presence["presence"]
+        if process_id == self.process_id:
+            return
+
+        if "clients" not in presence:
+            self.remote_clients.pop(process_id, None)
+            return
+
+        now: float = time.monotonic()
+        if process_id not in self.remote_clients:
+            self.announce_requested.set()
+
+        # Forget the processes that stopped announcing, e.g. after a crash
+        for other_id, (_, expires_at) in list(self.remote_clients.items()):
+            if expires_at <= now:
+                del self.remote_clients[other_id]
+
+        self.remote_clients[process_id] = (
+            frozenset(presence["clients"]),
+            now + BROKER_PRESENCE_TTL,
+        )
+
+    async def _connect_listener(self) -> tuple[asyncpg.Connection, asyncio.Event]:
+        """
+        Opens a dedicated connection listening on the channel.
+
+        Returns:
+            tuple[asyncpg.Connection, asyncio.Event]: The connection, and an event set when
+                the connection is lost.
+        """
+        connection: asyncpg.Connection = await asyncpg.connect(self.dsn)
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _: lost.set())
+        await connection.add_listener(self.channel, self._on_notification)
+
+        return connection, lost
+
+    async def _listen(
+        self, connection: asyncpg.Connection, lost: asyncio.Event
+    ) -> None:
+        """
+        Keeps the listening connection open, reconnecting when it is lost. Frames published
+        while reconnecting are not delivered, and the clients of the other processes are
+        known again after their next announcement.
+
+        Args:
+            connection (asyncpg.Connection): The listening connection.
+            lost (asyncio.Event): Set when the connection is lost.
+        """
+        try:
+            while True:
+                await lost.wait()
+                logger.warning("WebSocket broker connection lost, reconnecting")
+
+                # The remaining parts of a chunked payload were lost with the connection
+                self.chunks.clear()
+
+                while lost.is_set():
+                    await asyncio.sleep(BROKER_RECONNECT_DELAY)
+                    try:
+                        connection, lost = await self._connect_listener()
+                    except Exception as e:
+                        logger.warning(
+                            "WebSocket broker failed to reconnect error=%s", e
+                        )
+        finally:
+            if not connection.is_closed():
+                await connection.close()
+
+
+def get_postgres_dsn(database_url: str) -> str:
+    """
+    Derives the asyncpg DSN from a SQLAlchemy database URL.
+
+    Args:
+        database_url (str): The SQLAlchemy database URL.
+
+    Returns:
+        str: The DSN without a driver suffix.
+    """
+
+    return (
+        make_url(database_url)
+        .set(drivername="postgresql")
+        .render_as_string(hide_password=False)
+    )
+
+
+def create_broker(backend: BrokerBackend = BROKER_BACKEND) -> Broker:
+    """
+    Creates the broker selected by the WS_BROKER setting.
+
+    Args:
+        backend (BrokerBackend): The broker backend.
+
+    Returns:
+        Broker: The broker, not yet started.
+    """
+
+    if backend == BrokerBackend.POSTGRES:
+        return PostgresBroker(get_postgres_dsn(DATABASE_URL))
+
+    return InMemoryBroker()
@@ -0,0 +1,363 @@
+import asyncio
+import queue
+import threading
+from collections.abc import AsyncIterator, Iterator
+from decouple import config
+from sqlalchemy import Table, column, table, text
+
+from app.database import engine
+from app.models import (
+    TemperatureLog as TemperatureLogORM,
+    HumidityLog as HumidityLogORM,
+    OvenLog as OvenLogORM,
+    PressLog as PressLogORM,
+    PressDistanceLog as PressDistanceLogORM,
+)
+from app.models.utc_datetime import as_naive_utc
+from app.crud.rollups import ROLLUP_RESOLUTIONS, get_rollup_upsert, has_rollups
+from app.utils.copy_enums import CopyFormat, LogTable
+
+from datetime import datetime
+
+# Bytes handed over between the COPY thread and the event loop at a time
+COPY_CHUNK_SIZE: int = config("COPY_CHUNK_SIZE", default=65536, cast=int)
+# Chunks buffered between the COPY thread and the event loop, bounds the memory in use
+COPY_QUEUE_SIZE: int = config("COPY_QUEUE_SIZE", default=16, cast=int)
+
+LOG_MODELS: dict[LogTable, type] = {
+    LogTable.TEMPERATURE_LOGS: TemperatureLogORM,
+    LogTable.HUMIDITY_LOGS: HumidityLogORM,
+    LogTable.OVEN_LOGS: OvenLogORM,
+    LogTable.PRESS_LOGS: PressLogORM,
+    LogTable.PRESS_DISTANCE_LOGS: PressDistanceLogORM,
+}
+
+LOG_TABLES: dict[LogTable, Table] = {
+    log_table: model.__table__ for log_table, model in LOG_MODELS.items()
+}
+
+# Marks the end of the data in a chunk queue
+_END = object()
+
+
+def is_copy_supported() -> bool:
+    """
+    Returns:
+        bool: True if the database supports COPY, i.e. is PostgreSQL.
+    """
+    return engine.dialect.name == "postgresql"
+
+
+def get_copy_columns(log_table: LogTable) -> list[str]:
+    """
+    Lists the columns that are imported and exported. The primary key is left out, so an
+    export can be imported again and the imported rows get new identifiers.
+
+    Args:
+        log_table (LogTable): The log table.
+
+    Returns:
+        list[str]: The column names.
+    """
+
+    return [
+        column.name
+        for column in LOG_TABLES[log_table].columns
+        if not column.primary_key
+    ]
+
+
+def _copy_options(copy_format: CopyFormat) -> str:
+    """
+    Args:
+        copy_format (CopyFormat): The COPY format.
+
+    Returns:
+        str: The options of the COPY statement.
+    """
+
+    if copy_format == CopyFormat.BINARY:
+        return "(FORMAT binary)"
+
+    return "(FORMAT csv, HEADER true)"
+
+
+def copy_to(
+    file,
+    log_table: LogTable,
+    copy_format: CopyFormat = CopyFormat.CSV,
+    machine_id: int | None = None,
+    batch_id: int | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> None:
+    """
+    Writes the logs of a table to a file with COPY ... TO STDOUT, oldest first.
+
+    Args:
+        file: The file-like object to write to, in binary mode.
+        log_table (LogTable): The log table.
+        copy_format (CopyFormat): The COPY format.
+        machine_id (int | None): Only export the logs of this machine.
+        batch_id (int | None): Only export the logs of this batch.
+        since (datetime | None): Only export logs created from this time onwards.
+        until (datetime | None): Only export logs created before this time.
+    """
+
+    columns: list[str] = get_copy_columns(log_table)
+    conditions: list[str] = []
+    parameters: list = []
+
+    for condition, value in (
+        ("machine_id = %s", machine_id),
+        ("batch_id = %s", batch_id),
+        ("created_at >= %s", as_naive_utc(since) if since else None),
+        ("created_at < %s", as_naive_utc(until) if until else None),
+    ):
+        if value is not None:
+            conditions.append(condition)
+            parameters.append(value)
+
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            query: str = cursor.mogrify(
+                f"SELECT {', '.join(columns)} FROM {log_table.value}"
+                + (f" WHERE {' AND '.join(conditions)}" if conditions else "")
+                + " ORDER BY created_at",
+                parameters,
+            ).decode()
+
+            cursor.copy_expert(
+                f"COPY ({query}) TO STDOUT {_copy_options(copy_format)}", file
+            )
+        connection.rollback()
+    finally:
+        connection.close()
+
+
+def copy_from(
+    file, log_table: LogTable, copy_format: CopyFormat = CopyFormat.CSV
+) -> int:
+    """
+    Reads logs into a table from a file with COPY ... FROM STDIN, in one transaction.
+    For tables with rollups, the data is copied into a temporary staging table first,
+    then inserted and added to the rollups from there.
+
+    Args:
+        file: The file-like object to read from, in binary mode.
+        log_table (LogTable): The log table.
+        copy_format (CopyFormat): The COPY format.
+
+    Returns:
+        int: The number of imported rows.
+    """
+
+    columns: list[str] = get_copy_columns(log_table)
+    model: type = LOG_MODELS[log_table]
+    target: str = (
+        f"{log_table.value}_staging" if has_rollups(model) else log_table.value
+    )
+
+    with engine.begin() as connection:
+        if target != log_table.value:
+            connection.execute(
+                text(
+                    f"CREATE TEMPORARY TABLE {target} "
+                    f"(LIKE {log_table.value} INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+            )
+
+        with connection.connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {target} ({', '.join(columns)}) FROM STDIN "
+                f"{_copy_options(copy_format)}",
+                file,
+                size=COPY_CHUNK_SIZE,
+            )
+            rows: int = cursor.rowcount
+
+        if target != log_table.value:
+            connection.execute(
+                text(
+                    f"INSERT INTO {log_table.value} ({', '.join(columns)}) "
+                    f"SELECT {', '.join(columns)} FROM {target}"
+                )
+            )
+            staging = table(target, *(column(name) for name in columns))
+            for resolution in ROLLUP_RESOLUTIONS:
+                connection.execute(get_rollup_upsert(model, staging, resolution))
+
+    return rows
+
+
+class _QueueWriter:
+    """
+    A file-like object for COPY ... TO STDOUT that hands the data over to a queue in
+    chunks, waiting while the queue is full.
+    """
+
+    def __init__(self, chunks: queue.Queue, cancelled: threading.Event):
+        self.chunks = chunks
+        self.cancelled = cancelled
+        self.buffer = bytearray()
+
+    def write(self, data: bytes) -> None:
+        self.buffer += data
+        if len(self.buffer) >= COPY_CHUNK_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buffer:
+            _put(self.chunks, bytes(self.buffer), self.cancelled.is_set)
+            self.buffer.clear()
+
+
+class _QueueReader:
+    """
+    A file-like object for COPY ... FROM STDIN that reads the data from a queue of chunks.
+    """
+
+    def __init__(self, chunks: queue.Queue):
+        self.chunks = chunks
+        self.buffer = b""
+        self.finished = False
+
+    def read(self, size: int = -1) -> bytes:
+        while not self.buffer and not self.finished:
+            chunk = self.chunks.get()
+            if chunk is _END:
+                self.finished = True
+            elif isinstance(chunk, Exception):
+                # Aborts the COPY, which rolls the import back
+                raise chunk
+            else:
+                self.buffer = chunk
+
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+
+        return data
+
+
+def _put(chunks: queue.Queue, item, cancelled) -> None:
+    """
+    Puts an item in a bounded queue, waiting while it is full.
+
+    Args:
+        chunks (queue.Queue): The queue.
+        item: The item.
+        cancelled: Returns True once the other side has stopped reading.
+
+    Raises:
+        InterruptedError: If the other side stopped reading.
+    """
+
+    while True:
+        try:
+            chunks.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            if cancelled():
+                raise InterruptedError("The reader of the COPY data stopped.")
+
+
+def stream_export(
+    log_table: LogTable,
+    copy_format: CopyFormat = CopyFormat.CSV,
+    machine_id: int | None = None,
+    batch_id: int | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> Iterator[bytes]:
+    """
+    Streams the export of a log table. COPY runs in a separate thread and at most
+    COPY_QUEUE_SIZE chunks are buffered, so the memory in use does not depend on the size
+    of the table. The COPY is aborted when the iterator is closed early.
+
+    Args:
+        log_table (LogTable): The log table.
+        copy_format (CopyFormat): The COPY format.
+        machine_id (int | None): Only export the logs of this machine.
+        batch_id (int | None): Only export the logs of this batch.
+        since (datetime | None): Only export logs created from this time onwards.
+        until (datetime | None): Only export logs created before this time.
+
+    Returns:
+        Iterator[bytes]: The exported data in chunks.
+    """
+
+    chunks: queue.Queue = queue.Queue(maxsize=COPY_QUEUE_SIZE)
+    cancelled = threading.Event()
+
+    def produce() -> None:
+        writer = _QueueWriter(chunks, cancelled)
+        try:
+            copy_to(writer, log_table, copy_format, machine_id, batch_id, since, until)
+            writer.flush()
+            _put(chunks, _END, cancelled.is_set)
+        except InterruptedError:
+            pass
+        except Exception as e:
+            try:
+                _put(chunks, e, cancelled.is_set)
+            except InterruptedError:
+                pass
+
+    threading.Thread(target=produce, daemon=True).start()
+
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is _END:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+    finally:
+        cancelled.set()
+
+
+async def import_stream(
+    stream: AsyncIterator[bytes],
+    log_table: LogTable,
+    copy_format: CopyFormat = CopyFormat.CSV,
+) -> int:
+    """
+    Imports a stream of data into a log table. COPY runs in a separate thread and at most
+    COPY_QUEUE_SIZE chunks are buffered, so the memory in use does not depend on the size
+    of the upload.
+
+    Args:
+        stream (AsyncIterator[bytes]): The data in chunks, e.g. a request body.
+        log_table (LogTable): The log table.
+        copy_format (CopyFormat): The COPY format.
+
+    Returns:
+        int: The number of imported rows.
+    """
+
+    chunks: queue.Queue = queue.Queue(maxsize=COPY_QUEUE_SIZE)
+    copy_task = asyncio.ensure_future(
+        asyncio.to_thread(copy_from, _QueueReader(chunks), log_table, copy_format)
+    )
+
+    try:
+        async for chunk in stream:
+            if chunk:
+                await asyncio.to_thread(_put, chunks, chunk, copy_task.done)
+        await asyncio.to_thread(_put, chunks, _END, copy_task.done)
+    except InterruptedError:
+        # COPY stopped reading, its exception is raised below
+        pass
+    except Exception as e:
+        # The upload failed, abort the COPY so nothing is imported
+        try:
+            await asyncio.to_thread(_put, chunks, e, copy_task.done)
+        except InterruptedError:
+            pass
+        await asyncio.gather(copy_task, return_exceptions=True)
+        raise e
+
+    return await copy_task
@@ -0,0 +1,129 @@
+import time
+from decouple import config
+from pydantic import BaseModel
+
+from app.models.utc_datetime import as_naive_utc
+from app.utils.cache_enums import LiveStateKey
+
+from datetime import datetime
+
+# Seconds a cached entry is trusted before it is read from the database again. This
+# bounds how stale the state can get when another process changes it.
+LIVE_STATE_TTL: float = config("LIVE_STATE_TTL", default=30.0, cast=float)
+
+# Returned when a machine has no cached entry, since None is a valid cached value
+MISSING = object()
+
+
+def _as_stored(value: BaseModel) -> BaseModel:
+    """
+    Args:
+        value (BaseModel): The snapshot.
+
+    Returns:
+        BaseModel: The snapshot with its timestamps in naive UTC, as they are read from
+            the database, so a cache hit is serialized like a miss.
+    """
+
+    timestamps: dict[str, datetime] = {
+        name: as_naive_utc(field)
+        for name, field in value
+        if isinstance(field, datetime) and field.tzinfo is not None
+    }
+
+    return value.model_copy(update=timestamps) if timestamps else value
+
+
+class LiveStateCache:
+    """
+    Holds each machine's latest oven batch, latest press batch and active temperature
+    profile in process memory, so that the hot paths (readings, status polls) do not
+    query the database.
+
+    The CRUD functions that change this state write through to the cache, and the
+    entries are snapshots (schemas), never ORM objects bound to a session.
+    """
+
+    def __init__(self, ttl: float = LIVE_STATE_TTL):
+        self.ttl = ttl
+        self._entries: dict[
+            tuple[LiveStateKey, int], tuple[float, BaseModel | None]
+        ] = {}
+
+    def get(self, key: LiveStateKey, machine_id: int) -> BaseModel | None | object:
+        """
+        Retrieves the cached state of a machine.
+
+        Args:
+            key (LiveStateKey): The kind of state.
+            machine_id (int): The machine identifier.
+
+        Returns:
+            BaseModel | None | object: The cached snapshot, or MISSING if the state is
+                not cached or has expired.
+        """
+
+        entry = self._entries.get((key, machine_id))
+
+        if entry is None or entry[0] < time.monotonic():
+            return MISSING
+
+        return entry[1]
+
+    def set(self, key: LiveStateKey, machine_id: int, value: BaseModel | None) -> None:
+        """
+        Caches the state of a machine.
+
+        Args:
+            key (LiveStateKey): The kind of state.
+            machine_id (int): The machine identifier.
+            value (BaseModel | None): The snapshot, None when the machine has no such state.
+                Its timestamps are stored in naive UTC.
+        """
+
+        if value is not None:
+            value = _as_stored(value)
+
+        self._entries[(key, machine_id)] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key: LiveStateKey, machine_id: int | None = None) -> None:
+        """
+        Removes the cached state of one machine, or of all machines.
+
+        Args:
+            key (LiveStateKey): The kind of state.
+            machine_id (int | None): The machine identifier, None for all machines.
+        """
+
+        if machine_id is not None:
+            self._entries.pop((key, machine_id), None)
+            return
+
+        for entry_key in [
+            entry_key for entry_key in self._entries if entry_key[0] == key
+        ]:
+            del self._entries[entry_key]
+
+    def invalidate_id(self, key: LiveStateKey, id: int) -> None:
+        """
+        Removes every cached entry whose snapshot has the given identifier, e.g. a deleted
+        batch or profile.
+
+        Args:
+            key (LiveStateKey): The kind of state.
+            id (int): The identifier of the batch or profile.
+        """
+
+        for entry_key, (_, value) in list(self._entries.items()):
+            if entry_key[0] == key and getattr(value, "id", None) == id:
+                del self._entries[entry_key]
+
+    def clear(self) -> None:
+        """
+        Removes all cached state.
+        """
+
+        self._entries.clear()
+
+
+live_state = LiveStateCache()
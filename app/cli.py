@@ -0,0 +1,81 @@
+"""
+Bulk imports and exports the log tables with PostgreSQL COPY, for backfilling the
+history from HMI SD cards or exporting logs for analysis.
+
+The file is read or written as COPY streams it, so the memory in use does not depend
+on the size of the table.
+
+Usage:
+    python -m app.cli export temperature_logs --output march.csv --since 2026-03-01 --until 2026-04-01
+    python -m app.cli export oven_logs --format binary --machine-id 3 --output oven_logs.bin
+    python -m app.cli import temperature_logs sd_card.csv
+"""
+
+import argparse
+import sys
+from datetime import datetime
+
+from app.bulk_copy import copy_from, copy_to, is_copy_supported
+from app.utils.copy_enums import CopyFormat, LogTable
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Export a log table.")
+    export_parser.add_argument("table", type=LogTable, choices=list(LogTable))
+    export_parser.add_argument(
+        "--format", type=CopyFormat, choices=list(CopyFormat), default=CopyFormat.CSV
+    )
+    export_parser.add_argument("--machine-id", type=int, default=None)
+    export_parser.add_argument("--batch-id", type=int, default=None)
+    export_parser.add_argument("--since", type=datetime.fromisoformat, default=None)
+    export_parser.add_argument("--until", type=datetime.fromisoformat, default=None)
+    export_parser.add_argument(
+        "--output", default=None, help="The file to write, standard output by default."
+    )
+
+    import_parser = commands.add_parser("import", help="Import into a log table.")
+    import_parser.add_argument("table", type=LogTable, choices=list(LogTable))
+    import_parser.add_argument("input", help="The file to read, - for standard input.")
+    import_parser.add_argument(
+        "--format", type=CopyFormat, choices=list(CopyFormat), default=CopyFormat.CSV
+    )
+
+    args = parser.parse_args()
+
+    if not is_copy_supported():
+        parser.error("Bulk import and export require a PostgreSQL database.")
+
+    if args.command == "export":
+        output = open(args.output, "wb") if args.output else sys.stdout.buffer
+        try:
+            copy_to(
+                output,
+                args.table,
+                args.format,
+                args.machine_id,
+                args.batch_id,
+                args.since,
+                args.until,
+            )
+        finally:
+            if args.output:
+                output.close()
+        return
+
+    input_file = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    try:
+        rows: int = copy_from(input_file, args.table, args.format)
+    finally:
+        if args.input != "-":
+            input_file.close()
+
+    print(f"Imported {rows} rows into {args.table}.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
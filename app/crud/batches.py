@@ -0,0 +1,113 @@
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import lazyload
+from decouple import config
+
+from app.models import Machine as MachineORM
+from app.utils.state_enum import BatchState
+
+from datetime import datetime
+
+# Attempts of a start command that lost the race for the active batch of the machine
+BATCH_START_ATTEMPTS: int = config("BATCH_START_ATTEMPTS", default=3, cast=int)
+
+# Partial unique indexes allowing one active batch per machine
+ACTIVE_BATCH_INDEXES: tuple[str, ...] = (
+    "ux_oven_batches_machine_id_active",
+    "ux_press_batches_machine_id_active",
+)
+
+
+def is_active_batch_conflict(error: IntegrityError) -> bool:
+    """
+    Args:
+        error (IntegrityError): The error raised by the database.
+
+    Returns:
+        bool: True if a concurrent command started another active batch on the machine.
+    """
+    return any(index in str(error.orig) for index in ACTIVE_BATCH_INDEXES)
+
+
+async def lock_machine(db: AsyncSession, machine_id: int) -> None:
+    """
+    Locks the row of a machine until the end of the transaction, so that the start
+    commands of a machine run one after the other instead of failing on the unique
+    index of the active batches and retrying. The lock is FOR NO KEY UPDATE, which
+    does not block the inserts of logs referencing the machine, e.g. the write-behind
+    flush done while summarising the previous batch.
+
+    Args:
+        db (AsyncSession): The database session.
+        machine_id (int): The machine identifier.
+    """
+    await db.execute(
+        select(MachineORM.id)
+        .where(MachineORM.id == machine_id)
+        .with_for_update(key_share=True)
+    )
+
+
+async def complete_active_batch(
+    db: AsyncSession, model: type, machine_id: int, stop_time: datetime
+):
+    """
+    Completes the active batch of a machine, in the transaction of the session. The
+    update returns the batch, so it is not selected first. A concurrent command that
+    completed the batch first leaves nothing to complete.
+
+    Args:
+        db (AsyncSession): The database session.
+        model (type): The ORM model of the batches, OvenBatch or PressBatch.
+        machine_id (int): The machine identifier.
+        stop_time (datetime): The stop time of the batch.
+
+    Returns:
+        The completed batch, or None if the machine had no active batch.
+    """
+
+    return await db.scalar(
+        update(model)
+        .where(model.machine_id == machine_id)
+        .where(model.state == BatchState.ACTIVE)
+        .values(state=BatchState.COMPLETED, stop_time=stop_time)
+        .returning(model)
+        # The batch is returned alone, without its eagerly loaded relationships
+        .options(lazyload("*")),
+        execution_options={"synchronize_session": False},
+    )
+
+
+async def add_active_batch(
+    db: AsyncSession, model: type, machine_id: int, start_time: datetime
+):
+    """
+    Inserts an active batch for a machine, in the transaction of the session. The
+    identifier comes back with the INSERT ... RETURNING of the flush, and every other
+    column is set here, so the batch does not need a refresh.
+
+    Args:
+        db (AsyncSession): The database session.
+        model (type): The ORM model of the batches, OvenBatch or PressBatch.
+        machine_id (int): The machine identifier.
+        start_time (datetime): The start time of the batch.
+
+    Returns:
+        The inserted batch.
+
+    Raises:
+        IntegrityError: If the machine has another active batch, see
+            is_active_batch_conflict.
+    """
+
+    batch = model(
+        start_time=start_time,
+        stop_time=None,
+        state=BatchState.ACTIVE,
+        machine_id=machine_id,
+    )
+    db.add(batch)
+    await db.flush()
+
+    return batch
@@ -1,4 +1,5 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Machine as MachineORM
 
@@ -7,13 +8,16 @@ from app.schemas import (
     MachineUpdate,
 )
 
+from app.cache import live_state
+from app.utils.cache_enums import LiveStateKey
 
-def create_machine(db: Session, machine: MachineCreate) -> MachineORM:
+
+async def create_machine(db: AsyncSession, machine: MachineCreate) -> MachineORM:
     """
     Creates a machine.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         machine (MachineCreate): The machine to be created.
 
     Returns:
@@ -23,52 +27,56 @@ def create_machine(db: Session, machine: MachineCreate) -> MachineORM:
     try:
         new_machine = MachineORM(**machine.dict())
         db.add(new_machine)
-        db.commit()
-        db.refresh(new_machine)
+        await db.commit()
+        await db.refresh(new_machine)
         return new_machine
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise e
 
 
-def get_machine(db: Session, machine_id: int) -> MachineORM:
+async def get_machine(db: AsyncSession, machine_id: int) -> MachineORM:
     """
     Retrieves a machine.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         machine_id (int): The machine ID.
 
     Returns:
         MachineORM: The retrieved machine.
     """
 
-    return db.query(MachineORM).filter(MachineORM.id == machine_id).first()
+    return await db.scalar(select(MachineORM).where(MachineORM.id == machine_id))
 
 
-def get_machines(db: Session, limit: int | None = 100) -> list[MachineORM]:
+async def get_machines(db: AsyncSession, limit: int | None = 100) -> list[MachineORM]:
     """
     Retrieves all the machines.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         list[MachineORM]: The list of machines.
     """
 
-    if limit is None:
-        return db.query(MachineORM).all()
+    query = select(MachineORM)
+
+    if limit is not None:
+        query = query.limit(limit)
 
-    return db.query(MachineORM).limit(limit).all()
+    return list(await db.scalars(query))
 
 
-def update_machine(db: Session, machine_id: int, machine: MachineUpdate) -> MachineORM:
+async def update_machine(
+    db: AsyncSession, machine_id: int, machine: MachineUpdate
+) -> MachineORM:
     """
     Updates a machine.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         machine_id (int): The machine ID.
         machine (MachineUpdate): The machine to be updated.
 
@@ -77,26 +85,30 @@ def update_machine(db: Session, machine_id: int, machine: MachineUpdate) -> Mach
     """
 
     try:
-        db_machine = db.query(MachineORM).filter(MachineORM.id == machine_id).first()
+        db_machine = await db.scalar(
+            select(MachineORM).where(MachineORM.id == machine_id)
+        )
 
         for key, value in machine.dict(exclude_unset=True).items():
             setattr(db_machine, key, value)
 
-        db.commit()
-        db.refresh(db_machine)
+        await db.commit()
+        await db.refresh(db_machine)
+
+        live_state.invalidate(LiveStateKey.ACTIVE_PROFILE, machine_id)
 
         return db_machine
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise e
 
 
-def delete_machine(db: Session, machine_id: int) -> MachineORM:
+async def delete_machine(db: AsyncSession, machine_id: int) -> MachineORM:
     """
     Deletes a machine.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         machine_id (int): The machine ID.
 
     Returns:
@@ -104,23 +116,29 @@ def delete_machine(db: Session, machine_id: int) -> MachineORM:
     """
 
     try:
-        db_machine = db.query(MachineORM).filter(MachineORM.id == machine_id).first()
-        db.delete(db_machine)
-        db.commit()
+        db_machine = await db.scalar(
+            select(MachineORM).where(MachineORM.id == machine_id)
+        )
+        await db.delete(db_machine)
+        await db.commit()
+
+        for key in LiveStateKey:
+            live_state.invalidate(key, machine_id)
+
         return db_machine
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise e
 
 
-def set_machine_active_temperature_profile(
-    db: Session, machine_id: int, profile_id: int
+async def set_machine_active_temperature_profile(
+    db: AsyncSession, machine_id: int, profile_id: int
 ) -> MachineORM:
     """
     Sets the active temperature profile for a machine.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         machine_id (int): The machine ID.
         profile_id (int): The profile ID.
 
@@ -129,11 +147,15 @@ def set_machine_active_temperature_profile(
     """
 
     try:
-        db_machine = db.query(MachineORM).filter(MachineORM.id == machine_id).first()
+        db_machine = await db.scalar(
+            select(MachineORM).where(MachineORM.id == machine_id)
+        )
         db_machine.active_profile_id = profile_id
-        db.commit()
-        db.refresh(db_machine)
+        await db.commit()
+        await db.refresh(db_machine)
+
+        live_state.invalidate(LiveStateKey.ACTIVE_PROFILE, machine_id)
         return db_machine
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise e
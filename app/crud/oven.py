@@ -1,138 +1,265 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import (
+    Row,
+    case,
+    delete,
+    extract,
+    func,
+    insert,
+    literal,
+    select,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from collections.abc import AsyncIterator
+from decouple import config
 
 from app.models import (
     OvenBatch as OvenBatchORM,
+    OvenBatchSummary as OvenBatchSummaryORM,
     TemperatureLog as TemperatureLogORM,
+    HumidityLog as HumidityLogORM,
     OvenLog as OvenLogORM,
     TemperatureProfile as TemperatureProfileORM,
     Machine as MachineORM,
 )
+from app.models.utc_datetime import UTCDateTime, as_naive_utc
 
 from app.schemas import (
-    OvenBatchCreate,
+    OvenBatchWithSummary,
     TemperatureLogCreate,
+    HumidityLogCreate,
     OvenLogCreate,
+    TemperatureProfile,
     TemperatureProfileCreate,
 )
 
+from app.cache import MISSING, live_state
+from app.write_behind import write_behind
+
+from app.crud.batches import (
+    BATCH_START_ATTEMPTS,
+    add_active_batch,
+    complete_active_batch,
+    is_active_batch_conflict,
+    lock_machine,
+)
+from app.crud.pagination import DEFAULT_PAGE_SIZE, paginate
+from app.crud.timeseries import get_buckets, get_downsampled, stream_readings
+from app.crud.rollups import (
+    choose_rollup_resolution,
+    get_rollup_buckets,
+    rollups_enabled,
+    update_rollups,
+)
+
 from app.utils.state_enum import BatchState
+from app.utils.logs_enums import OvenLogType
+from app.utils.cache_enums import LiveStateKey
+from app.utils.resolution_enum import BucketResolution
 
 from datetime import datetime, timezone
 
+# Allowed deviation from the desired temperature that still counts as in band
+TEMPERATURE_BAND_TOLERANCE: float = config(
+    "TEMPERATURE_BAND_TOLERANCE", default=5.0, cast=float
+)
 
-def create_oven_batch(db: Session, oven_batch: OvenBatchCreate) -> OvenBatchORM:
+# Columns returned by the downsampled and streamed temperature and humidity series
+TEMPERATURE_LOG_COLUMNS = [
+    TemperatureLogORM.temperature,
+    TemperatureLogORM.created_at,
+    TemperatureLogORM.machine_id,
+    TemperatureLogORM.batch_id,
+]
+HUMIDITY_LOG_COLUMNS = [
+    HumidityLogORM.humidity,
+    HumidityLogORM.created_at,
+    HumidityLogORM.machine_id,
+    HumidityLogORM.batch_id,
+]
+
+
+async def get_oven_batch(db: AsyncSession, batch_id: int) -> OvenBatchORM:
     """
-    Creates an oven batch.
+    Retrieves an oven batch by the identifier.
 
     Args:
-        db (Session): The database session.
-        oven_batch (OvenBatchCreate): The oven batch details.
+        db (AsyncSession): The database session.
+        batch_id (int): The batch identifier.
 
     Returns:
         OvenBatchORM: The response containing the batch details.
     """
 
-    try:
-        new_oven_batch = OvenBatchORM(
-            start_time=oven_batch.start_time,
-            state=oven_batch.state.value,
-            machine_id=oven_batch.machine_id,
-        )
-        db.add(new_oven_batch)
-        db.commit()
-        db.refresh(new_oven_batch)
+    return await db.scalar(select(OvenBatchORM).where(OvenBatchORM.id == batch_id))
 
-        return new_oven_batch
-    except Exception as e:
-        db.rollback()
-        raise e
 
+async def get_oven_batches_for_machine(
+    db: AsyncSession,
+    machine_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int | None = DEFAULT_PAGE_SIZE,
+) -> list[OvenBatchORM] | None:
+    """
+    Retrieves a page of the oven batches for a machine.
+
+    Args:
+        db (AsyncSession): The database session.
+        machine_id (int): The machine identifier.
+        since (datetime | None): The inclusive lower bound of the batch start time range.
+        until (datetime | None): The exclusive upper bound of the batch start time range.
+        after_id (int | None): The cursor, the id of the last batch of the previous page.
+        limit (int | None): The limit of the number of batches to retrieve.
 
-def get_oven_batch(db: Session, batch_id: int) -> OvenBatchORM:
+    Returns:
+        list[OvenBatchORM] | None: The list of batches, newest first.
     """
-    Retrieves an oven batch by the identifier.
+
+    query = paginate(
+        select(OvenBatchORM).where(OvenBatchORM.machine_id == machine_id),
+        OvenBatchORM.id,
+        OvenBatchORM.start_time,
+        since=since,
+        until=until,
+        after_id=after_id,
+        limit=limit,
+    )
+
+    return list(await db.scalars(query))
+
+
+async def get_active_oven_batches(db: AsyncSession) -> OvenBatchORM:
+    """
+    Retrieves the active oven batch.
 
     Args:
-        db (Session): The database session.
-        batch_id (int): The batch identifier.
+        db (AsyncSession): The database session.
 
     Returns:
-        OvenBatchORM: The response containing the batch details.
+        OvenBatchORM: The response containing the active batch details.
     """
 
-    return db.query(OvenBatchORM).filter(OvenBatchORM.id == batch_id).first()
+    return list(
+        await db.scalars(
+            select(OvenBatchORM).where(OvenBatchORM.state == BatchState.ACTIVE)
+        )
+    )
 
 
-def get_oven_batches_for_machine(
-    db: Session, machine_id: int, limit: int | None = 100
-) -> list[OvenBatchORM] | None:
+async def get_latest_oven_batch_for_machine(
+    db: AsyncSession, machine_id: int
+) -> OvenBatchWithSummary | None:
     """
-    Retrieves all the oven batches.
+    Retrieves the latest oven batch for a machine, from the live state cache if possible.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         machine_id (int): The machine identifier.
-        limit (int | None): The limit of the number of batches to retrieve.
 
     Returns:
-        list[OvenBatchORM] | None: The list of oven batches.
+        OvenBatchWithSummary | None: The response containing the latest batch details.
     """
 
-    query = (
-        db.query(OvenBatchORM)
-        .filter(OvenBatchORM.machine_id == machine_id)
-        .order_by(desc(OvenBatchORM.start_time))
+    cached = live_state.get(LiveStateKey.OVEN_BATCH, machine_id)
+    if cached is not MISSING:
+        return cached
+
+    latest_batch = await db.scalar(
+        select(OvenBatchORM)
+        .where(OvenBatchORM.machine_id == machine_id)
+        .order_by(OvenBatchORM.start_time.desc())
+        .limit(1)
+    )
+    latest_batch = (
+        OvenBatchWithSummary.model_validate(latest_batch) if latest_batch else None
     )
 
-    if limit is not None:
-        query = query.limit(limit)
+    live_state.set(LiveStateKey.OVEN_BATCH, machine_id, latest_batch)
 
-    return query.all()
+    return latest_batch
 
 
-def get_active_oven_batches(db: Session) -> OvenBatchORM:
+async def get_active_oven_batch_ids_for_machines(
+    db: AsyncSession, machine_ids: list[int]
+) -> dict[int, int]:
     """
-    Retrieves the active oven batch.
+    Retrieves the active oven batch identifier for each of the given machines in a single query.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
+        machine_ids (list[int]): The machine identifiers.
 
     Returns:
-        OvenBatchORM: The response containing the active batch details.
+        dict[int, int]: The active batch identifier keyed by machine identifier.
+            Machines without an active batch are omitted.
     """
 
-    return db.query(OvenBatchORM).filter(OvenBatchORM.state == BatchState.ACTIVE).all()
+    active_batch_ids: dict[int, int] = {}
+    uncached_machine_ids: list[int] = []
+
+    # The latest batch of a machine is its active batch, if it is still active
+    for machine_id in machine_ids:
+        cached = live_state.get(LiveStateKey.OVEN_BATCH, machine_id)
 
+        if cached is MISSING:
+            uncached_machine_ids.append(machine_id)
+        elif cached is not None and cached.state == BatchState.ACTIVE:
+            active_batch_ids[machine_id] = cached.id
 
-def get_latest_oven_batch_for_machine(
-    db: Session, machine_id: int
+    if not uncached_machine_ids:
+        return active_batch_ids
+
+    active_batches = await db.execute(
+        select(OvenBatchORM.machine_id, OvenBatchORM.id)
+        .where(OvenBatchORM.machine_id.in_(uncached_machine_ids))
+        .where(OvenBatchORM.state == BatchState.ACTIVE)
+        .order_by(OvenBatchORM.start_time)
+    )
+
+    # Later batches overwrite earlier ones so the latest active batch wins
+    active_batch_ids.update(
+        {machine_id: batch_id for machine_id, batch_id in active_batches}
+    )
+
+    return active_batch_ids
+
+
+async def _complete_active_oven_batch(
+    db: AsyncSession, machine_id: int, stop_time: datetime
 ) -> OvenBatchORM | None:
     """
-    Retrieves the latest oven batch for a machine.
+    Completes the active oven batch and adds its summary, without committing.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         machine_id (int): The machine identifier.
+        stop_time (datetime): The stop time of the batch.
 
     Returns:
-        OvenBatchORM | None: The response containing the latest batch details.
+        OvenBatchORM | None: The completed batch, or None if no batch was active.
     """
 
-    return (
-        db.query(OvenBatchORM)
-        .filter(OvenBatchORM.machine_id == machine_id)
-        .order_by(OvenBatchORM.start_time.desc())
-        .first()
+    active_batch: OvenBatchORM | None = await complete_active_batch(
+        db, OvenBatchORM, machine_id, stop_time
     )
 
+    if active_batch is not None:
+        summary: OvenBatchSummaryORM = await summarise_oven_batch(db, active_batch)
+        db.add(summary)
+        set_committed_value(active_batch, "summary", summary)
+
+    return active_batch
+
 
-def stop_active_oven_batch(db: Session, machine_id: int) -> OvenBatchORM:
+async def stop_active_oven_batch(db: AsyncSession, machine_id: int) -> OvenBatchORM:
     """
     Stops the active oven batch.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         machine_id (int): The machine identifier.
 
     Returns:
@@ -140,32 +267,182 @@ def stop_active_oven_batch(db: Session, machine_id: int) -> OvenBatchORM:
     """
 
     try:
-        # Get all actives batches
-        active_batch = (
-            db.query(OvenBatchORM)
-            .filter(OvenBatchORM.state == BatchState.ACTIVE)
-            .filter(OvenBatchORM.machine_id == machine_id)
-            .first()
+        active_batch = await _complete_active_oven_batch(
+            db, machine_id, datetime.now(tz=timezone.utc)
         )
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise e
 
-        if active_batch:
-            active_batch.state = BatchState.COMPLETED.value
-            active_batch.stop_time = datetime.now(tz=timezone.utc)
+    if active_batch:
+        live_state.set(
+            LiveStateKey.OVEN_BATCH,
+            machine_id,
+            OvenBatchWithSummary.model_validate(active_batch),
+        )
 
-            db.commit()
+    return active_batch
 
-        return active_batch
-    except Exception as e:
-        db.rollback()
-        raise e
 
+async def start_oven_batch(
+    db: AsyncSession, machine_id: int, log_type: OvenLogType
+) -> tuple[OvenBatchORM, OvenLogORM]:
+    """
+    Stops the active oven batch, starts a new one and logs the start, in a single
+    transaction. Concurrent starts of a machine wait on the lock of the machine row. The
+    partial unique index on the active batches allows one active batch per machine
+    whatever the writer, and a start that still loses the race to another writer is
+    retried up to BATCH_START_ATTEMPTS times, stopping the batch that won.
+
+    Args:
+        db (AsyncSession): The database session.
+        machine_id (int): The machine identifier.
+        log_type (OvenLogType): The type of the log of the start.
+
+    Returns:
+        tuple[OvenBatchORM, OvenLogORM]: The started batch and the log.
+    """
+
+    for attempt in range(1, BATCH_START_ATTEMPTS + 1):
+        now: datetime = datetime.now(tz=timezone.utc)
+
+        try:
+            await lock_machine(db, machine_id)
+            await _complete_active_oven_batch(db, machine_id, now)
+            oven_batch: OvenBatchORM = await add_active_batch(
+                db, OvenBatchORM, machine_id, now
+            )
+            set_committed_value(oven_batch, "summary", None)
+            log: OvenLogORM = _add_log(
+                db,
+                OvenLogCreate(machine_id=machine_id, type=log_type, batch_id=None),
+                now,
+            )
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            if attempt < BATCH_START_ATTEMPTS and is_active_batch_conflict(e):
+                continue
+            raise e
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+        live_state.set(
+            LiveStateKey.OVEN_BATCH,
+            machine_id,
+            OvenBatchWithSummary.model_validate(oven_batch),
+        )
+
+        return oven_batch, log
+
+
+async def summarise_oven_batch(
+    db: AsyncSession, oven_batch: OvenBatchORM
+) -> OvenBatchSummaryORM:
+    """
+    Computes the summary of a stopped oven batch from its temperature logs in a single
+    scan, measured against the temperature profile active on the machine, resolved like
+    get_active_temperature_profile_for_machine. Readings buffered in write-behind mode
+    are flushed first.
+
+    Each reading is taken to hold until the next reading, or the stop time for the
+    last reading, when measuring the time spent in band and above the maximum.
+
+    Args:
+        db (AsyncSession): The database session.
+        oven_batch (OvenBatchORM): The batch, with its stop time set.
 
-def delete_oven_batch(db: Session, batch_id: int) -> bool:
+    Returns:
+        OvenBatchSummaryORM: The summary, not yet committed.
+    """
+
+    # Readings still buffered by the write-behind buffer belong in the summary
+    if write_behind.enabled:
+        await write_behind.flush()
+
+    profile: TemperatureProfile | TemperatureProfileORM | None = live_state.get(
+        LiveStateKey.ACTIVE_PROFILE, oven_batch.machine_id
+    )
+    if profile is MISSING:
+        machine: MachineORM = await db.scalar(
+            select(MachineORM).where(MachineORM.id == oven_batch.machine_id)
+        )
+        profile = await _resolve_active_profile(db, machine)
+
+    stop_time = literal(oven_batch.stop_time, UTCDateTime)
+    next_time = func.lead(TemperatureLogORM.created_at).over(
+        order_by=(TemperatureLogORM.created_at, TemperatureLogORM.id)
+    )
+    readings = (
+        select(
+            TemperatureLogORM.temperature.label("temperature"),
+            extract(
+                "epoch",
+                func.coalesce(next_time, stop_time) - TemperatureLogORM.created_at,
+            ).label("held_sec"),
+        )
+        .where(TemperatureLogORM.batch_id == oven_batch.id)
+        .where(TemperatureLogORM.created_at.is_not(None))
+        .subquery()
+    )
+
+    if profile is not None:
+        in_band = readings.c.temperature.between(
+            profile.desired_temp - TEMPERATURE_BAND_TOLERANCE,
+            profile.desired_temp + TEMPERATURE_BAND_TOLERANCE,
+        )
+        over_max = readings.c.temperature > profile.max_temp
+        time_in_band = func.coalesce(
+            func.sum(case((in_band, readings.c.held_sec), else_=0)), 0
+        )
+        time_over_max = func.coalesce(
+            func.sum(case((over_max, readings.c.held_sec), else_=0)), 0
+        )
+    else:
+        time_in_band = time_over_max = literal(None)
+
+    statistics = (
+        await db.execute(
+            select(
+                func.count().label("reading_count"),
+                func.max(readings.c.temperature).label("peak_temperature"),
+                func.avg(readings.c.temperature).label("mean_temperature"),
+                time_in_band.label("time_in_band_sec"),
+                time_over_max.label("time_over_max_sec"),
+            )
+        )
+    ).one()
+
+    peak_overshoot: float | None = None
+    if profile is not None and statistics.peak_temperature is not None:
+        peak_overshoot = max(statistics.peak_temperature - profile.max_temp, 0.0)
+
+    return OvenBatchSummaryORM(
+        batch_id=oven_batch.id,
+        profile_id=profile.id if profile else None,
+        desired_temp=profile.desired_temp if profile else None,
+        max_temp=profile.max_temp if profile else None,
+        band_tolerance=TEMPERATURE_BAND_TOLERANCE,
+        reading_count=statistics.reading_count,
+        peak_temperature=statistics.peak_temperature,
+        mean_temperature=statistics.mean_temperature,
+        time_in_band_sec=statistics.time_in_band_sec,
+        time_over_max_sec=statistics.time_over_max_sec,
+        peak_overshoot=peak_overshoot,
+        duration_sec=(
+            as_naive_utc(oven_batch.stop_time) - as_naive_utc(oven_batch.start_time)
+        ).total_seconds(),
+    )
+
+
+async def delete_oven_batch(db: AsyncSession, batch_id: int) -> bool:
     """
     Deletes an oven batch by the identifier.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         batch_id (int): The batch identifier.
 
     Returns:
@@ -173,23 +450,26 @@ def delete_oven_batch(db: Session, batch_id: int) -> bool:
     """
 
     try:
-        db.query(OvenBatchORM).filter(OvenBatchORM.id == batch_id).delete()
-        db.commit()
+        await db.execute(delete(OvenBatchORM).where(OvenBatchORM.id == batch_id))
+        await db.commit()
+
+        live_state.invalidate_id(LiveStateKey.OVEN_BATCH, batch_id)
 
         return True
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise e
 
 
-def create_temperature_log(
-    db: Session, temperature_log: TemperatureLogCreate
+async def create_temperature_log(
+    db: AsyncSession, temperature_log: TemperatureLogCreate
 ) -> TemperatureLogORM:
     """
-    Creates a temperature log for the oven.
+    Creates a temperature log for the oven. In write-behind mode the log is buffered and
+    the returned log is not persisted yet, so it has no id.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         temperature (TemperatureLogCreate): The temperature log details.
 
     Returns:
@@ -201,132 +481,766 @@ def create_temperature_log(
             temperature=temperature_log.temperature,
             machine_id=temperature_log.machine_id,
             batch_id=temperature_log.batch_id,
-            created_at=datetime.now(tz=timezone.utc),
+            created_at=temperature_log.created_at or datetime.now(tz=timezone.utc),
         )
 
+        row: dict = {
+            "temperature": temperature_log.temperature,
+            "machine_id": temperature_log.machine_id,
+            "batch_id": temperature_log.batch_id,
+            "created_at": temperature_log.created_at,
+        }
+
+        if write_behind.enabled:
+            await write_behind.put(TemperatureLogORM, [row])
+            return temperature_log
+
         db.add(temperature_log)
-        db.commit()
-        db.refresh(temperature_log)
+        await update_rollups(db, TemperatureLogORM, [row])
+        await db.commit()
+        await db.refresh(temperature_log)
 
         return temperature_log
     except Exception as e:
-        db.rollback()
+        await db.rollback()
+        raise e
+
+
+async def create_temperature_logs(
+    db: AsyncSession,
+    temperature_logs: list[TemperatureLogCreate],
+    buffered: bool = True,
+) -> int:
+    """
+    Creates multiple temperature logs for the oven with a single bulk insert in one transaction.
+    In write-behind mode the logs are buffered and inserted in the background instead,
+    unless buffered is False.
+
+    Args:
+        db (AsyncSession): The database session.
+        temperature_logs (list[TemperatureLogCreate]): The temperature log details.
+        buffered (bool): Whether the logs may go through the write-behind buffer. False
+            when the caller reports them as stored, e.g. acknowledges them.
+
+    Returns:
+        int: The number of logs created.
+    """
+
+    if not temperature_logs:
+        return 0
+
+    now = datetime.now(tz=timezone.utc)
+    rows: list[dict] = [
+        {
+            "temperature": temperature_log.temperature,
+            "machine_id": temperature_log.machine_id,
+            "batch_id": temperature_log.batch_id,
+            "created_at": temperature_log.created_at or now,
+        }
+        for temperature_log in temperature_logs
+    ]
+
+    if buffered and write_behind.enabled:
+        await write_behind.put(TemperatureLogORM, rows)
+        return len(rows)
+
+    try:
+        await db.execute(insert(TemperatureLogORM), rows)
+        await update_rollups(db, TemperatureLogORM, rows)
+        await db.commit()
+
+        return len(rows)
+    except Exception as e:
+        await db.rollback()
         raise e
 
 
-def get_temperature_logs_for_batch(
-    db: Session, batch_id: int
+async def get_temperature_logs_for_batch(
+    db: AsyncSession,
+    batch_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int | None = DEFAULT_PAGE_SIZE,
 ) -> list[TemperatureLogORM]:
     """
-    Retrieves the temperature logs for a batch.
+    Retrieves a page of the temperature logs for a batch.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         batch_id (int): The batch identifier.
+        since (datetime | None): The inclusive lower bound of the log time range.
+        until (datetime | None): The exclusive upper bound of the log time range.
+        after_id (int | None): The cursor, the id of the last log of the previous page.
+        limit (int | None): The limit of the number of logs to retrieve.
 
     Returns:
-        list[TemperatureLogORM]: The list of temperature logs.
+        list[TemperatureLogORM]: The list of logs, newest first.
     """
 
-    return (
-        db.query(TemperatureLogORM).filter(TemperatureLogORM.batch_id == batch_id).all()
+    query = paginate(
+        select(TemperatureLogORM).where(TemperatureLogORM.batch_id == batch_id),
+        TemperatureLogORM.id,
+        TemperatureLogORM.created_at,
+        since=since,
+        until=until,
+        after_id=after_id,
+        limit=limit,
     )
 
+    return list(await db.scalars(query))
 
-def get_temperature_logs_for_machine(
-    db: Session, machine_id: int, limit: int | None = None
+
+async def get_temperature_logs_for_machine(
+    db: AsyncSession,
+    machine_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int | None = DEFAULT_PAGE_SIZE,
 ) -> list[TemperatureLogORM]:
     """
-    Retrieves the temperature logs for a machine.
+    Retrieves a page of the temperature logs for a machine.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         machine_id (int): The machine identifier.
+        since (datetime | None): The inclusive lower bound of the log time range.
+        until (datetime | None): The exclusive upper bound of the log time range.
+        after_id (int | None): The cursor, the id of the last log of the previous page.
         limit (int | None): The limit of the number of logs to retrieve.
 
     Returns:
-        list[TemperatureLogORM]: The list of temperature logs.
+        list[TemperatureLogORM]: The list of logs, newest first.
+    """
+
+    query = paginate(
+        select(TemperatureLogORM).where(TemperatureLogORM.machine_id == machine_id),
+        TemperatureLogORM.id,
+        TemperatureLogORM.created_at,
+        since=since,
+        until=until,
+        after_id=after_id,
+        limit=limit,
+    )
+
+    return list(await db.scalars(query))
+
+
+async def get_temperature_buckets_for_machine(
+    db: AsyncSession,
+    machine_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    resolution: BucketResolution | None = None,
+    buckets: int | None = None,
+) -> list[Row]:
     """
+    Retrieves the temperature logs for a machine aggregated into time buckets. The buckets are
+    read from the coarsest rollup that answers the query exactly, see
+    choose_rollup_resolution, and otherwise computed from the logs.
+
+    Args:
+        db (AsyncSession): The database session.
+        machine_id (int): The machine identifier.
+        since (datetime | None): The inclusive lower bound of the time range.
+        until (datetime | None): The exclusive upper bound of the time range.
+        resolution (BucketResolution | None): The calendar resolution of the buckets.
+        buckets (int | None): The number of equal-width buckets, used without a resolution.
 
-    if limit is None:
-        return (
-            db.query(TemperatureLogORM)
-            .filter(TemperatureLogORM.machine_id == machine_id)
-            .all()
+    Returns:
+        list[Row]: The bucket_start, min, max, mean and count per bucket, oldest first.
+    """
+
+    rollup_resolution = choose_rollup_resolution(since, until, resolution, buckets)
+    if rollup_resolution is not None and rollups_enabled(db, TemperatureLogORM):
+        return await get_rollup_buckets(
+            db,
+            TemperatureLogORM,
+            machine_id,
+            rollup_resolution,
+            since=since,
+            until=until,
+            resolution=resolution,
+            buckets=buckets,
         )
 
-    return (
-        db.query(TemperatureLogORM)
-        .filter(TemperatureLogORM.machine_id == machine_id)
-        .limit(limit)
-        .all()
+    return await get_buckets(
+        db,
+        TemperatureLogORM.temperature,
+        TemperatureLogORM.created_at,
+        TemperatureLogORM.machine_id == machine_id,
+        since=since,
+        until=until,
+        resolution=resolution,
+        buckets=buckets,
     )
 
 
-def create_log(db: Session, log: OvenLogCreate) -> OvenLogORM:
+async def get_temperature_buckets_for_batch(
+    db: AsyncSession,
+    batch_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    resolution: BucketResolution | None = None,
+    buckets: int | None = None,
+) -> list[Row]:
     """
-    Creates a log for the oven.
+    Retrieves the temperature logs for a batch aggregated into time buckets.
 
     Args:
-        db (Session): The database session.
-        log (OvenLogCreate): The log details.
+        db (AsyncSession): The database session.
+        batch_id (int): The batch identifier.
+        since (datetime | None): The inclusive lower bound of the time range.
+        until (datetime | None): The exclusive upper bound of the time range.
+        resolution (BucketResolution | None): The calendar resolution of the buckets.
+        buckets (int | None): The number of equal-width buckets, used without a resolution.
 
     Returns:
-        OvenLogCreate: The response containing the log details.
+        list[Row]: The bucket_start, min, max, mean and count per bucket, oldest first.
+    """
+
+    return await get_buckets(
+        db,
+        TemperatureLogORM.temperature,
+        TemperatureLogORM.created_at,
+        TemperatureLogORM.batch_id == batch_id,
+        since=since,
+        until=until,
+        resolution=resolution,
+        buckets=buckets,
+    )
+
+
+async def get_downsampled_temperature_logs_for_machine(
+    db: AsyncSession,
+    machine_id: int,
+    points: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> list[Row]:
+    """
+    Retrieves the temperature logs for a machine, downsampled with LTTB.
+
+    Args:
+        db (AsyncSession): The database session.
+        machine_id (int): The machine identifier.
+        points (int): The maximum number of logs to return.
+        since (datetime | None): The inclusive lower bound of the time range.
+        until (datetime | None): The exclusive upper bound of the time range.
+
+    Returns:
+        list[Row]: The selected logs, oldest first.
     """
 
+    return await get_downsampled(
+        db,
+        TemperatureLogORM.temperature,
+        TemperatureLogORM.created_at,
+        TemperatureLogORM.id,
+        TEMPERATURE_LOG_COLUMNS,
+        TemperatureLogORM.machine_id == machine_id,
+        points,
+        since=since,
+        until=until,
+    )
+
+
+async def get_downsampled_temperature_logs_for_batch(
+    db: AsyncSession,
+    batch_id: int,
+    points: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> list[Row]:
+    """
+    Retrieves the temperature logs for a batch, downsampled with LTTB.
+
+    Args:
+        db (AsyncSession): The database session.
+        batch_id (int): The batch identifier.
+        points (int): The maximum number of logs to return.
+        since (datetime | None): The inclusive lower bound of the time range.
+        until (datetime | None): The exclusive upper bound of the time range.
+
+    Returns:
+        list[Row]: The selected logs, oldest first.
+    """
+
+    return await get_downsampled(
+        db,
+        TemperatureLogORM.temperature,
+        TemperatureLogORM.created_at,
+        TemperatureLogORM.id,
+        TEMPERATURE_LOG_COLUMNS,
+        TemperatureLogORM.batch_id == batch_id,
+        points,
+        since=since,
+        until=until,
+    )
+
+
+def stream_temperature_logs_for_machine(
+    machine_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> AsyncIterator[list[Row]]:
+    """
+    Streams the temperature logs for a machine, oldest first, in partitions.
+
+    Args:
+        machine_id (int): The machine identifier.
+        since (datetime | None): The inclusive lower bound of the log time range.
+        until (datetime | None): The exclusive upper bound of the log time range.
+
+    Returns:
+        AsyncIterator[list[Row]]: The logs, with the TEMPERATURE_LOG_COLUMNS.
+    """
+
+    return stream_readings(
+        TEMPERATURE_LOG_COLUMNS,
+        TemperatureLogORM.created_at,
+        TemperatureLogORM.id,
+        TemperatureLogORM.machine_id == machine_id,
+        since=since,
+        until=until,
+    )
+
+
+def stream_temperature_logs_for_batch(
+    batch_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> AsyncIterator[list[Row]]:
+    """
+    Streams the temperature logs for a batch, oldest first, in partitions.
+
+    Args:
+        batch_id (int): The batch identifier.
+        since (datetime | None): The inclusive lower bound of the log time range.
+        until (datetime | None): The exclusive upper bound of the log time range.
+
+    Returns:
+        AsyncIterator[list[Row]]: The logs, with the TEMPERATURE_LOG_COLUMNS.
+    """
+
+    return stream_readings(
+        TEMPERATURE_LOG_COLUMNS,
+        TemperatureLogORM.created_at,
+        TemperatureLogORM.id,
+        TemperatureLogORM.batch_id == batch_id,
+        since=since,
+        until=until,
+    )
+
+
+async def create_humidity_logs(
+    db: AsyncSession,
+    humidity_logs: list[HumidityLogCreate],
+    buffered: bool = True,
+) -> int:
+    """
+    Creates multiple humidity logs for the oven with a single bulk insert in one transaction.
+    In write-behind mode the logs are buffered and inserted in the background instead,
+    unless buffered is False.
+
+    Args:
+        db (AsyncSession): The database session.
+        humidity_logs (list[HumidityLogCreate]): The humidity log details.
+        buffered (bool): Whether the logs may go through the write-behind buffer. False
+            when the caller reports them as stored, e.g. acknowledges them.
+
+    Returns:
+        int: The number of logs created.
+    """
+
+    if not humidity_logs:
+        return 0
+
+    now = datetime.now(tz=timezone.utc)
+    rows: list[dict] = [
+        {
+            "humidity": humidity_log.humidity,
+            "machine_id": humidity_log.machine_id,
+            "batch_id": humidity_log.batch_id,
+            "created_at": humidity_log.created_at or now,
+        }
+        for humidity_log in humidity_logs
+    ]
+
+    if buffered and write_behind.enabled:
+        await write_behind.put(HumidityLogORM, rows)
+        return len(rows)
+
     try:
-        new_log = OvenLogORM(
-            machine_id=log.machine_id,
-            type=log.type,
-            batch_id=log.batch_id,
-            created_at=datetime.now(tz=timezone.utc),
+        await db.execute(insert(HumidityLogORM), rows)
+        await update_rollups(db, HumidityLogORM, rows)
+        await db.commit()
+
+        return len(rows)
+    except Exception as e:
+        await db.rollback()
+        raise e
+
+
+async def get_humidity_logs_for_batch(
+    db: AsyncSession,
+    batch_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int | None = DEFAULT_PAGE_SIZE,
+) -> list[HumidityLogORM]:
+    """
+    Retrieves a page of the humidity logs for a batch.
+
+    Args:
+        db (AsyncSession): The database session.
+        batch_id (int): The batch identifier.
+        since (datetime | None): The inclusive lower bound of the log time range.
+        until (datetime | None): The exclusive upper bound of the log time range.
+        after_id (int | None): The cursor, the id of the last log of the previous page.
+        limit (int | None): The limit of the number of logs to retrieve.
+
+    Returns:
+        list[HumidityLogORM]: The list of logs, newest first.
+    """
+
+    query = paginate(
+        select(HumidityLogORM).where(HumidityLogORM.batch_id == batch_id),
+        HumidityLogORM.id,
+        HumidityLogORM.created_at,
+        since=since,
+        until=until,
+        after_id=after_id,
+        limit=limit,
+    )
+
+    return list(await db.scalars(query))
+
+
+async def get_humidity_logs_for_machine(
+    db: AsyncSession,
+    machine_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int | None = DEFAULT_PAGE_SIZE,
+) -> list[HumidityLogORM]:
+    """
+    Retrieves a page of the humidity logs for a machine.
+
+    Args:
+        db (AsyncSession): The database session.
+        machine_id (int): The machine identifier.
+        since (datetime | None): The inclusive lower bound of the log time range.
+        until (datetime | None): The exclusive upper bound of the log time range.
+        after_id (int | None): The cursor, the id of the last log of the previous page.
+        limit (int | None): The limit of the number of logs to retrieve.
+
+    Returns:
+        list[HumidityLogORM]: The list of logs, newest first.
+    """
+
+    query = paginate(
+        select(HumidityLogORM).where(HumidityLogORM.machine_id == machine_id),
+        HumidityLogORM.id,
+        HumidityLogORM.created_at,
+        since=since,
+        until=until,
+        after_id=after_id,
+        limit=limit,
+    )
+
+    return list(await db.scalars(query))
+
+
+async def get_humidity_buckets_for_machine(
+    db: AsyncSession,
+    machine_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    resolution: BucketResolution | None = None,
+    buckets: int | None = None,
+) -> list[Row]:
+    """
+    Retrieves the humidity logs for a machine aggregated into time buckets. The buckets are
+    read from the coarsest rollup that answers the query exactly, see
+    choose_rollup_resolution, and otherwise computed from the logs.
+
+    Args:
+        db (AsyncSession): The database session.
+        machine_id (int): The machine identifier.
+        since (datetime | None): The inclusive lower bound of the time range.
+        until (datetime | None): The exclusive upper bound of the time range.
+        resolution (BucketResolution | None): The calendar resolution of the buckets.
+        buckets (int | None): The number of equal-width buckets, used without a resolution.
+
+    Returns:
+        list[Row]: The bucket_start, min, max, mean and count per bucket, oldest first.
+    """
+
+    rollup_resolution = choose_rollup_resolution(since, until, resolution, buckets)
+    if rollup_resolution is not None and rollups_enabled(db, HumidityLogORM):
+        return await get_rollup_buckets(
+            db,
+            HumidityLogORM,
+            machine_id,
+            rollup_resolution,
+            since=since,
+            until=until,
+            resolution=resolution,
+            buckets=buckets,
         )
 
-        db.add(new_log)
-        db.commit()
-        db.refresh(new_log)
+    return await get_buckets(
+        db,
+        HumidityLogORM.humidity,
+        HumidityLogORM.created_at,
+        HumidityLogORM.machine_id == machine_id,
+        since=since,
+        until=until,
+        resolution=resolution,
+        buckets=buckets,
+    )
+
+
+async def get_humidity_buckets_for_batch(
+    db: AsyncSession,
+    batch_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    resolution: BucketResolution | None = None,
+    buckets: int | None = None,
+) -> list[Row]:
+    """
+    Retrieves the humidity logs for a batch aggregated into time buckets.
+
+    Args:
+        db (AsyncSession): The database session.
+        batch_id (int): The batch identifier.
+        since (datetime | None): The inclusive lower bound of the time range.
+        until (datetime | None): The exclusive upper bound of the time range.
+        resolution (BucketResolution | None): The calendar resolution of the buckets.
+        buckets (int | None): The number of equal-width buckets, used without a resolution.
+
+    Returns:
+        list[Row]: The bucket_start, min, max, mean and count per bucket, oldest first.
+    """
+
+    return await get_buckets(
+        db,
+        HumidityLogORM.humidity,
+        HumidityLogORM.created_at,
+        HumidityLogORM.batch_id == batch_id,
+        since=since,
+        until=until,
+        resolution=resolution,
+        buckets=buckets,
+    )
+
+
+async def get_downsampled_humidity_logs_for_machine(
+    db: AsyncSession,
+    machine_id: int,
+    points: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> list[Row]:
+    """
+    Retrieves the humidity logs for a machine, downsampled with LTTB.
+
+    Args:
+        db (AsyncSession): The database session.
+        machine_id (int): The machine identifier.
+        points (int): The maximum number of logs to return.
+        since (datetime | None): The inclusive lower bound of the time range.
+        until (datetime | None): The exclusive upper bound of the time range.
+
+    Returns:
+        list[Row]: The selected logs, oldest first.
+    """
+
+    return await get_downsampled(
+        db,
+        HumidityLogORM.humidity,
+        HumidityLogORM.created_at,
+        HumidityLogORM.id,
+        HUMIDITY_LOG_COLUMNS,
+        HumidityLogORM.machine_id == machine_id,
+        points,
+        since=since,
+        until=until,
+    )
+
+
+async def get_downsampled_humidity_logs_for_batch(
+    db: AsyncSession,
+    batch_id: int,
+    points: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> list[Row]:
+    """
+    Retrieves the humidity logs for a batch, downsampled with LTTB.
+
+    Args:
+        db (AsyncSession): The database session.
+        batch_id (int): The batch identifier.
+        points (int): The maximum number of logs to return.
+        since (datetime | None): The inclusive lower bound of the time range.
+        until (datetime | None): The exclusive upper bound of the time range.
+
+    Returns:
+        list[Row]: The selected logs, oldest first.
+    """
+
+    return await get_downsampled(
+        db,
+        HumidityLogORM.humidity,
+        HumidityLogORM.created_at,
+        HumidityLogORM.id,
+        HUMIDITY_LOG_COLUMNS,
+        HumidityLogORM.batch_id == batch_id,
+        points,
+        since=since,
+        until=until,
+    )
+
 
-        return new_log
+def _add_log(db: AsyncSession, log: OvenLogCreate, created_at: datetime) -> OvenLogORM:
+    """
+    Adds a log for the oven to the session, inserted with the next flush.
+
+    Args:
+        db (AsyncSession): The database session.
+        log (OvenLogCreate): The log details.
+        created_at (datetime): The creation time of the log.
+
+    Returns:
+        OvenLogORM: The log.
+    """
+
+    new_log = OvenLogORM(
+        machine_id=log.machine_id,
+        type=log.type,
+        batch_id=log.batch_id,
+        created_at=created_at,
+    )
+    db.add(new_log)
+
+    return new_log
+
+
+async def create_logs(
+    db: AsyncSession, logs: list[tuple[OvenLogCreate, bool]]
+) -> list[OvenLogORM]:
+    """
+    Creates logs for the oven in a single transaction, so either every log is stored or
+    none is.
+
+    Args:
+        db (AsyncSession): The database session.
+        logs (list[tuple[OvenLogCreate, bool]]): The log details, each with whether the
+            log finishes the active batch of its machine, which is then stopped in the
+            same transaction.
+
+    Returns:
+        list[OvenLogORM]: The logs, in the given order.
+    """
+
+    try:
+        now: datetime = datetime.now(tz=timezone.utc)
+        new_logs: list[OvenLogORM] = []
+        stopped_batches: dict[int, OvenBatchORM] = {}
+
+        for log, stop_batch in logs:
+            new_logs.append(_add_log(db, log, now))
+            if stop_batch:
+                stopped_batch = await _complete_active_oven_batch(
+                    db, log.machine_id, now
+                )
+                if stopped_batch is not None:
+                    stopped_batches[log.machine_id] = stopped_batch
+
+        # The logs are inserted with INSERT ... RETURNING id, so they need no refresh
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise e
 
+    for machine_id, stopped_batch in stopped_batches.items():
+        live_state.set(
+            LiveStateKey.OVEN_BATCH,
+            machine_id,
+            OvenBatchWithSummary.model_validate(stopped_batch),
+        )
+
+    return new_logs
+
+
+async def create_log(
+    db: AsyncSession, log: OvenLogCreate, stop_batch: bool = False
+) -> OvenLogORM:
+    """
+    Creates a log for the oven.
+
+    Args:
+        db (AsyncSession): The database session.
+        log (OvenLogCreate): The log details.
+        stop_batch (bool): Whether the log finishes the active batch, which is then
+            stopped in the same transaction.
+
+    Returns:
+        OvenLogCreate: The response containing the log details.
+    """
+    return (await create_logs(db, [(log, stop_batch)]))[0]
 
-def get_logs_for_machine(
-    db: Session, machine_id: int, limit: int | None = 100
+
+async def get_logs_for_machine(
+    db: AsyncSession,
+    machine_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int | None = DEFAULT_PAGE_SIZE,
 ) -> list[OvenLogORM] | None:
     """
-    Retrieves the logs for a machine. Option to specify the limit.
+    Retrieves a page of the logs for a machine.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         machine_id (int): The machine identifier.
+        since (datetime | None): The inclusive lower bound of the log time range.
+        until (datetime | None): The exclusive upper bound of the log time range.
+        after_id (int | None): The cursor, the id of the last log of the previous page.
         limit (int | None): The limit of the number of logs to retrieve.
 
     Returns:
-        list[OvenLogORM] | None: The list of logs.
+        list[OvenLogORM] | None: The list of logs, newest first.
     """
 
-    if limit is None:
-        return db.query(OvenLogORM).filter(OvenLogORM.machine_id == machine_id).all()
-
-    return (
-        db.query(OvenLogORM)
-        .filter(OvenLogORM.machine_id == machine_id)
-        .limit(limit)
-        .all()
+    query = paginate(
+        select(OvenLogORM).where(OvenLogORM.machine_id == machine_id),
+        OvenLogORM.id,
+        OvenLogORM.created_at,
+        since=since,
+        until=until,
+        after_id=after_id,
+        limit=limit,
     )
 
+    return list(await db.scalars(query))
 
-def create_temperature_profile(
-    db: Session, temperature_profile: TemperatureProfileCreate
+
+async def create_temperature_profile(
+    db: AsyncSession, temperature_profile: TemperatureProfileCreate
 ) -> TemperatureProfileORM:
     """
     Creates a temperature profile for the oven.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         temperature_profile (TemperatureProfileCreate): The temperature profile details.
 
     Returns:
@@ -344,42 +1258,47 @@ def create_temperature_profile(
         )
 
         db.add(new_profile)
-        db.commit()
-        db.refresh(new_profile)
+        await db.commit()
+        await db.refresh(new_profile)
+
+        # The first profile of a machine becomes active on the next read
+        live_state.invalidate(LiveStateKey.ACTIVE_PROFILE, new_profile.machine_id)
 
         return new_profile
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise e
 
 
-def get_temperature_profiles_for_machine(
-    db: Session, machine_id: int
+async def get_temperature_profiles_for_machine(
+    db: AsyncSession, machine_id: int
 ) -> list[TemperatureProfileORM]:
     """
     Retrieves the temperature profiles for a machine.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         machine_id (int): The machine identifier.
 
     Returns:
         list[TemperatureProfileORM]: The list of temperature profiles.
     """
 
-    return (
-        db.query(TemperatureProfileORM)
-        .filter(TemperatureProfileORM.machine_id == machine_id)
-        .all()
+    return list(
+        await db.scalars(
+            select(TemperatureProfileORM).where(
+                TemperatureProfileORM.machine_id == machine_id
+            )
+        )
     )
 
 
-def delete_temperature_profile(db: Session, profile_id: int) -> bool:
+async def delete_temperature_profile(db: AsyncSession, profile_id: int) -> bool:
     """
     Deletes a temperature profile for the oven.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         profile_id (int): The profile identifier.
 
     Returns:
@@ -387,53 +1306,84 @@ def delete_temperature_profile(db: Session, profile_id: int) -> bool:
     """
 
     try:
-        db.query(TemperatureProfileORM).filter(
-            TemperatureProfileORM.id == profile_id
-        ).delete()
-        db.commit()
+        await db.execute(
+            delete(TemperatureProfileORM).where(TemperatureProfileORM.id == profile_id)
+        )
+        await db.commit()
+
+        live_state.invalidate_id(LiveStateKey.ACTIVE_PROFILE, profile_id)
 
         return True
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise e
 
 
-def get_active_temperature_profile_for_machine(
-    db: Session, machine_id: int
+async def _resolve_active_profile(
+    db: AsyncSession, machine: MachineORM
 ) -> TemperatureProfileORM | None:
     """
-    Retrieves the active temperature profile for a machine by looking at the active id in the machines table
+    Resolves the active temperature profile of a machine without changing it: the
+    profile set as active, or else the first profile of the machine.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
+        machine (MachineORM): The machine.
+
+    Returns:
+        TemperatureProfileORM | None: The profile, or None if the machine has none.
+    """
+
+    if machine.active_profile_id is not None:
+        return await db.scalar(
+            select(TemperatureProfileORM).where(
+                TemperatureProfileORM.id == machine.active_profile_id
+            )
+        )
+
+    return await db.scalar(
+        select(TemperatureProfileORM)
+        .where(TemperatureProfileORM.machine_id == machine.id)
+        .limit(1)
+    )
+
+
+async def get_active_temperature_profile_for_machine(
+    db: AsyncSession, machine_id: int
+) -> TemperatureProfile | None:
+    """
+    Retrieves the active temperature profile for a machine by looking at the active id in the machines table,
+    from the live state cache if possible.
+
+    Args:
+        db (AsyncSession): The database session.
         machine_id (int): The machine identifier.
 
     Returns:
-        TemperatureProfileORM | None: The response containing the profile details.
+        TemperatureProfile | None: The response containing the profile details.
     """
 
+    cached = live_state.get(LiveStateKey.ACTIVE_PROFILE, machine_id)
+    if cached is not MISSING:
+        return cached
+
     # Get the machine
-    machine: MachineORM = (
-        db.query(MachineORM).filter(MachineORM.id == machine_id).first()
+    machine: MachineORM = await db.scalar(
+        select(MachineORM).where(MachineORM.id == machine_id)
     )
 
-    # If no active profile, get the first profile and set it as active
-    if machine.active_profile_id is None:
-        active_profile = (
-            db.query(TemperatureProfileORM)
-            .filter(TemperatureProfileORM.machine_id == machine_id)
-            .first()
-        )
+    active_profile = await _resolve_active_profile(db, machine)
 
-        if active_profile:
-            machine.active_profile_id = active_profile.id
-            db.commit()
-            db.refresh(machine)
-    else:
-        active_profile = (
-            db.query(TemperatureProfileORM)
-            .filter(TemperatureProfileORM.id == machine.active_profile_id)
-            .first()
-        )
+    # If no active profile, set the first profile as active
+    if machine.active_profile_id is None and active_profile:
+        machine.active_profile_id = active_profile.id
+        await db.commit()
+        await db.refresh(machine)
+
+    active_profile = (
+        TemperatureProfile.model_validate(active_profile) if active_profile else None
+    )
+
+    live_state.set(LiveStateKey.ACTIVE_PROFILE, machine_id, active_profile)
 
     return active_profile
@@ -0,0 +1,77 @@
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE: int = 100
+MAX_PAGE_SIZE: int = 1000
+
+
+def paginate(
+    query: Select,
+    id_column: InstrumentedAttribute,
+    time_column: InstrumentedAttribute,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int | None = DEFAULT_PAGE_SIZE,
+) -> Select:
+    """
+    Applies a time range and a keyset cursor to a query, newest rows first.
+
+    The rows are ordered by (time_column, id_column) descending, so the query is served
+    by the (machine_id, created_at) style indexes. The cursor is the id of the last row
+    of the previous page, and only rows strictly older than that row are returned.
+
+    Args:
+        query (Select): The query to paginate.
+        id_column (InstrumentedAttribute): The primary key column of the table.
+        time_column (InstrumentedAttribute): The timestamp column of the table.
+        since (datetime | None): The inclusive lower bound of the time range.
+        until (datetime | None): The exclusive upper bound of the time range.
+        after_id (int | None): The id of the last row of the previous page.
+        limit (int | None): The page size.
+
+    Returns:
+        Select: The paginated query.
+    """
+
+    if since is not None:
+        query = query.where(time_column >= since)
+
+    if until is not None:
+        query = query.where(time_column < until)
+
+    if after_id is not None:
+        cursor = (
+            select(time_column, id_column)
+            .where(id_column == after_id)
+            .correlate(None)
+            .scalar_subquery()
+        )
+        query = query.where(tuple_(time_column, id_column) < cursor)
+
+    query = query.order_by(time_column.desc(), id_column.desc())
+
+    if limit is not None:
+        query = query.limit(limit)
+
+    return query
+
+
+def get_next_cursor(items: list, limit: int | None) -> int | None:
+    """
+    Determines the cursor of the next page.
+
+    Args:
+        items (list): The rows of the current page.
+        limit (int | None): The page size.
+
+    Returns:
+        int | None: The id of the last row if the page is full, None if there are no more pages.
+    """
+
+    if limit is None or len(items) < limit:
+        return None
+
+    return items[-1].id
@@ -1,135 +1,198 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import Row, delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import (
     PressBatch as PressBatchORM,
     PressLog as PressLogORM,
+    PressDistanceLog as PressDistanceLogORM,
 )
 
 from app.schemas import (
-    PressBatchCreate,
+    PressBatch,
     PressLogCreate,
+    PressDistanceLogCreate,
 )
 
-from app.utils.state_enum import BatchState
-
-from datetime import datetime, timezone
-
-
-def create_press_batch(db: Session, press_batch: PressBatchCreate) -> PressBatchORM:
-    """
-    Creates a press batch.
+from app.cache import MISSING, live_state
+from app.write_behind import write_behind
 
-    Args:
-        db (Session): The database session.
-        press_batch (PressBatchCreate): The press batch details.
+from app.crud.batches import (
+    BATCH_START_ATTEMPTS,
+    add_active_batch,
+    complete_active_batch,
+    is_active_batch_conflict,
+    lock_machine,
+)
+from app.crud.pagination import DEFAULT_PAGE_SIZE, paginate
+from app.crud.timeseries import get_downsampled
 
-    Returns:
-        PressBatchORM: The response containing the batch details.
-    """
+from app.utils.state_enum import BatchState
+from app.utils.logs_enums import PressLogType
+from app.utils.cache_enums import LiveStateKey
 
-    try:
-        new_press_batch = PressBatchORM(
-            start_time=press_batch.start_time,
-            state=press_batch.state.value,
-            machine_id=press_batch.machine_id,
-        )
-        db.add(new_press_batch)
-        db.commit()
-        db.refresh(new_press_batch)
+from datetime import datetime, timezone
 
-        return new_press_batch
-    except Exception as e:
-        db.rollback()
-        raise e
+# Columns returned by the downsampled press distance series
+PRESS_DISTANCE_LOG_COLUMNS = [
+    PressDistanceLogORM.distance,
+    PressDistanceLogORM.created_at,
+    PressDistanceLogORM.machine_id,
+    PressDistanceLogORM.batch_id,
+]
 
 
-def get_press_batch(db: Session, batch_id: int) -> PressBatchORM:
+async def get_press_batch(db: AsyncSession, batch_id: int) -> PressBatchORM:
     """
     Retrieves a press batch by the identifier.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         batch_id (int): The batch identifier.
 
     Returns:
         PressBatchORM: The response containing the batch details.
     """
 
-    return db.query(PressBatchORM).filter(PressBatchORM.id == batch_id).first()
+    return await db.scalar(select(PressBatchORM).where(PressBatchORM.id == batch_id))
 
 
-def get_press_batches_for_machine(
-    db: Session, machine_id: int, limit: int | None = 100
+async def get_press_batches_for_machine(
+    db: AsyncSession,
+    machine_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int | None = DEFAULT_PAGE_SIZE,
 ) -> list[PressBatchORM] | None:
     """
-    Retrieves all the press batches.
+    Retrieves a page of the press batches for a machine.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         machine_id (int): The machine identifier.
+        since (datetime | None): The inclusive lower bound of the batch start time range.
+        until (datetime | None): The exclusive upper bound of the batch start time range.
+        after_id (int | None): The cursor, the id of the last batch of the previous page.
         limit (int | None): The limit of the number of batches to retrieve.
 
     Returns:
-        list[PressBatchORM] | None: The list of press batches.
+        list[PressBatchORM] | None: The list of batches, newest first.
     """
 
-    query = (
-        db.query(PressBatchORM)
-        .filter(PressBatchORM.machine_id == machine_id)
-        .order_by(desc(PressBatchORM.start_time))
+    query = paginate(
+        select(PressBatchORM).where(PressBatchORM.machine_id == machine_id),
+        PressBatchORM.id,
+        PressBatchORM.start_time,
+        since=since,
+        until=until,
+        after_id=after_id,
+        limit=limit,
     )
 
-    if limit is not None:
-        query = query.limit(limit)
+    return list(await db.scalars(query))
 
-    return query.all()
 
-
-def get_active_press_batches(db: Session) -> PressBatchORM:
+async def get_active_press_batches(db: AsyncSession) -> PressBatchORM:
     """
     Retrieves the active press batch.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         PressBatchORM: The response containing the active batch details.
     """
 
-    return (
-        db.query(PressBatchORM).filter(PressBatchORM.state == BatchState.ACTIVE).all()
+    return list(
+        await db.scalars(
+            select(PressBatchORM).where(PressBatchORM.state == BatchState.ACTIVE)
+        )
     )
 
 
-def get_latest_press_batch_for_machine(
-    db: Session, machine_id: int
-) -> PressBatchORM | None:
+async def get_latest_press_batch_for_machine(
+    db: AsyncSession, machine_id: int
+) -> PressBatch | None:
     """
-    Retrieves the latest press batch for a machine.
+    Retrieves the latest press batch for a machine, from the live state cache if possible.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         machine_id (int): The machine identifier.
 
     Returns:
-        PressBatchORM | None: The response containing the latest batch details.
+        PressBatch | None: The response containing the latest batch details.
     """
 
-    return (
-        db.query(PressBatchORM)
-        .filter(PressBatchORM.machine_id == machine_id)
+    cached = live_state.get(LiveStateKey.PRESS_BATCH, machine_id)
+    if cached is not MISSING:
+        return cached
+
+    latest_batch = await db.scalar(
+        select(PressBatchORM)
+        .where(PressBatchORM.machine_id == machine_id)
         .order_by(PressBatchORM.start_time.desc())
-        .first()
+        .limit(1)
     )
+    latest_batch = PressBatch.model_validate(latest_batch) if latest_batch else None
+
+    live_state.set(LiveStateKey.PRESS_BATCH, machine_id, latest_batch)
+
+    return latest_batch
 
 
-def stop_active_press_batch(db: Session, machine_id: int) -> PressBatchORM:
+async def get_active_press_batch_ids_for_machines(
+    db: AsyncSession, machine_ids: list[int]
+) -> dict[int, int]:
+    """
+    Retrieves the active press batch identifier for each of the given machines in a single query.
+
+    Args:
+        db (AsyncSession): The database session.
+        machine_ids (list[int]): The machine identifiers.
+
+    Returns:
+        dict[int, int]: The active batch identifier keyed by machine identifier.
+            Machines without an active batch are omitted.
+    """
+
+    active_batch_ids: dict[int, int] = {}
+    uncached_machine_ids: list[int] = []
+
+    # The latest batch of a machine is its active batch, if it is still active
+    for machine_id in machine_ids:
+        cached = live_state.get(LiveStateKey.PRESS_BATCH, machine_id)
+
+        if cached is MISSING:
+            uncached_machine_ids.append(machine_id)
+        elif cached is not None and cached.state == BatchState.ACTIVE:
+            active_batch_ids[machine_id] = cached.id
+
+    if not uncached_machine_ids:
+        return active_batch_ids
+
+    active_batches = await db.execute(
+        select(PressBatchORM.machine_id, PressBatchORM.id)
+        .where(PressBatchORM.machine_id.in_(uncached_machine_ids))
+        .where(PressBatchORM.state == BatchState.ACTIVE)
+        .order_by(PressBatchORM.start_time)
+    )
+
+    # Later batches overwrite earlier ones so the latest active batch wins
+    active_batch_ids.update(
+        {machine_id: batch_id for machine_id, batch_id in active_batches}
+    )
+
+    return active_batch_ids
+
+
+async def stop_active_press_batch(db: AsyncSession, machine_id: int) -> PressBatchORM:
     """
     Stops the active press batch.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         machine_id (int): The machine identifier.
 
     Returns:
@@ -137,32 +200,80 @@ def stop_active_press_batch(db: Session, machine_id: int) -> PressBatchORM:
     """
 
     try:
-        # Get all actives batches
-        active_batch = (
-            db.query(PressBatchORM)
-            .filter(PressBatchORM.state == BatchState.ACTIVE)
-            .filter(PressBatchORM.machine_id == machine_id)
-            .first()
+        active_batch: PressBatchORM | None = await complete_active_batch(
+            db, PressBatchORM, machine_id, datetime.now(tz=timezone.utc)
         )
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise e
 
-        if active_batch:
-            active_batch.state = BatchState.COMPLETED.value
-            active_batch.stop_time = datetime.now(tz=timezone.utc)
+    if active_batch:
+        live_state.set(
+            LiveStateKey.PRESS_BATCH,
+            machine_id,
+            PressBatch.model_validate(active_batch),
+        )
 
-            db.commit()
+    return active_batch
 
-        return active_batch
-    except Exception as e:
-        db.rollback()
-        raise e
+
+async def start_press_batch(
+    db: AsyncSession, machine_id: int, log_type: PressLogType
+) -> tuple[PressBatchORM, PressLogORM]:
+    """
+    Stops the active press batch, starts a new one and logs the start, in a single
+    transaction. Concurrent starts of a machine wait on the lock of the machine row. The
+    partial unique index on the active batches allows one active batch per machine
+    whatever the writer, and a start that still loses the race to another writer is
+    retried up to BATCH_START_ATTEMPTS times, stopping the batch that won.
+
+    Args:
+        db (AsyncSession): The database session.
+        machine_id (int): The machine identifier.
+        log_type (PressLogType): The type of the log of the start.
+
+    Returns:
+        tuple[PressBatchORM, PressLogORM]: The started batch and the log.
+    """
+
+    for attempt in range(1, BATCH_START_ATTEMPTS + 1):
+        now: datetime = datetime.now(tz=timezone.utc)
+
+        try:
+            await lock_machine(db, machine_id)
+            await complete_active_batch(db, PressBatchORM, machine_id, now)
+            press_batch: PressBatchORM = await add_active_batch(
+                db, PressBatchORM, machine_id, now
+            )
+            log: PressLogORM = _add_log(
+                db,
+                PressLogCreate(machine_id=machine_id, type=log_type, batch_id=None),
+                now,
+            )
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            if attempt < BATCH_START_ATTEMPTS and is_active_batch_conflict(e):
+                continue
+            raise e
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+        live_state.set(
+            LiveStateKey.PRESS_BATCH, machine_id, PressBatch.model_validate(press_batch)
+        )
+
+        return press_batch, log
 
 
-def delete_press_batch(db: Session, batch_id: int) -> bool:
+async def delete_press_batch(db: AsyncSession, batch_id: int) -> bool:
     """
     Deletes a press batch by the identifier.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         batch_id (int): The batch identifier.
 
     Returns:
@@ -170,66 +281,326 @@ def delete_press_batch(db: Session, batch_id: int) -> bool:
     """
 
     try:
-        db.query(PressBatchORM).filter(PressBatchORM.id == batch_id).delete()
-        db.commit()
+        await db.execute(delete(PressBatchORM).where(PressBatchORM.id == batch_id))
+        await db.commit()
+
+        live_state.invalidate_id(LiveStateKey.PRESS_BATCH, batch_id)
 
         return True
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise e
 
 
-def create_log(db: Session, log: PressLogCreate) -> PressLogORM:
+def _add_log(
+    db: AsyncSession, log: PressLogCreate, created_at: datetime
+) -> PressLogORM:
     """
-    Creates a log for the press.
+    Adds a log for the press to the session, inserted with the next flush.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         log (PressLogCreate): The log details.
+        created_at (datetime): The creation time of the log.
 
     Returns:
-        PressLogCreate: The response containing the log details.
+        PressLogORM: The log.
+    """
+
+    new_log = PressLogORM(
+        machine_id=log.machine_id,
+        type=log.type,
+        batch_id=log.batch_id,
+        created_at=created_at,
+    )
+    db.add(new_log)
+
+    return new_log
+
+
+async def create_logs(
+    db: AsyncSession, logs: list[tuple[PressLogCreate, bool]]
+) -> list[PressLogORM]:
+    """
+    Creates logs for the press in a single transaction, so either every log is stored
+    or none is.
+
+    Args:
+        db (AsyncSession): The database session.
+        logs (list[tuple[PressLogCreate, bool]]): The log details, each with whether the
+            log finishes the active batch of its machine, which is then stopped in the
+            same transaction.
+
+    Returns:
+        list[PressLogORM]: The logs, in the given order.
     """
 
     try:
-        new_log = PressLogORM(
-            machine_id=log.machine_id,
-            type=log.type,
-            batch_id=log.batch_id,
-            created_at=datetime.now(tz=timezone.utc),
+        now: datetime = datetime.now(tz=timezone.utc)
+        new_logs: list[PressLogORM] = []
+        stopped_batches: dict[int, PressBatchORM] = {}
+
+        for log, stop_batch in logs:
+            new_logs.append(_add_log(db, log, now))
+            if stop_batch:
+                stopped_batch = await complete_active_batch(
+                    db, PressBatchORM, log.machine_id, now
+                )
+                if stopped_batch is not None:
+                    stopped_batches[log.machine_id] = stopped_batch
+
+        # The logs are inserted with INSERT ... RETURNING id, so they need no refresh
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise e
+
+    for machine_id, stopped_batch in stopped_batches.items():
+        live_state.set(
+            LiveStateKey.PRESS_BATCH,
+            machine_id,
+            PressBatch.model_validate(stopped_batch),
         )
 
-        db.add(new_log)
-        db.commit()
-        db.refresh(new_log)
+    return new_logs
+
 
-        return new_log
+async def create_log(
+    db: AsyncSession, log: PressLogCreate, stop_batch: bool = False
+) -> PressLogORM:
+    """
+    Creates a log for the press.
+
+    Args:
+        db (AsyncSession): The database session.
+        log (PressLogCreate): The log details.
+        stop_batch (bool): Whether the log finishes the active batch, which is then
+            stopped in the same transaction.
+
+    Returns:
+        PressLogCreate: The response containing the log details.
+    """
+    return (await create_logs(db, [(log, stop_batch)]))[0]
+
+
+async def get_logs_for_machine(
+    db: AsyncSession,
+    machine_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int | None = DEFAULT_PAGE_SIZE,
+) -> list[PressLogORM] | None:
+    """
+    Retrieves a page of the logs for a machine.
+
+    Args:
+        db (AsyncSession): The database session.
+        machine_id (int): The machine identifier.
+        since (datetime | None): The inclusive lower bound of the log time range.
+        until (datetime | None): The exclusive upper bound of the log time range.
+        after_id (int | None): The cursor, the id of the last log of the previous page.
+        limit (int | None): The limit of the number of logs to retrieve.
+
+    Returns:
+        list[PressLogORM] | None: The list of logs, newest first.
+    """
+
+    query = paginate(
+        select(PressLogORM).where(PressLogORM.machine_id == machine_id),
+        PressLogORM.id,
+        PressLogORM.created_at,
+        since=since,
+        until=until,
+        after_id=after_id,
+        limit=limit,
+    )
+
+    return list(await db.scalars(query))
+
+
+async def create_press_distance_logs(
+    db: AsyncSession,
+    press_distance_logs: list[PressDistanceLogCreate],
+    buffered: bool = True,
+) -> int:
+    """
+    Creates multiple press distance logs with a single bulk insert in one transaction.
+    In write-behind mode the logs are buffered and inserted in the background instead,
+    unless buffered is False.
+
+    Args:
+        db (AsyncSession): The database session.
+        press_distance_logs (list[PressDistanceLogCreate]): The press distance log details.
+        buffered (bool): Whether the logs may go through the write-behind buffer. False
+            when the caller reports them as stored, e.g. acknowledges them.
+
+    Returns:
+        int: The number of logs created.
+    """
+
+    if not press_distance_logs:
+        return 0
+
+    rows: list[dict] = [
+        {
+            "distance": press_distance_log.distance,
+            "machine_id": press_distance_log.machine_id,
+            "batch_id": press_distance_log.batch_id,
+            "created_at": press_distance_log.created_at,
+        }
+        for press_distance_log in press_distance_logs
+    ]
+
+    if buffered and write_behind.enabled:
+        await write_behind.put(PressDistanceLogORM, rows)
+        return len(rows)
+
+    try:
+        await db.execute(insert(PressDistanceLogORM), rows)
+        await db.commit()
+
+        return len(rows)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise e
 
 
-def get_logs_for_machine(
-    db: Session, machine_id: int, limit: int | None = 100
-) -> list[PressLogORM] | None:
+async def get_press_distance_logs_for_machine(
+    db: AsyncSession,
+    machine_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int | None = DEFAULT_PAGE_SIZE,
+) -> list[PressDistanceLogORM]:
     """
-    Retrieves the logs for a machine. Option to specify the limit.
+    Retrieves a page of the press distance logs for a machine.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         machine_id (int): The machine identifier.
+        since (datetime | None): The inclusive lower bound of the log time range.
+        until (datetime | None): The exclusive upper bound of the log time range.
+        after_id (int | None): The cursor, the id of the last log of the previous page.
+        limit (int | None): The limit of the number of logs to retrieve.
+
+    Returns:
+        list[PressDistanceLogORM]: The list of logs, newest first.
+    """
+
+    query = paginate(
+        select(PressDistanceLogORM).where(PressDistanceLogORM.machine_id == machine_id),
+        PressDistanceLogORM.id,
+        PressDistanceLogORM.created_at,
+        since=since,
+        until=until,
+        after_id=after_id,
+        limit=limit,
+    )
+
+    return list(await db.scalars(query))
+
+
+async def get_press_distance_logs_for_batch(
+    db: AsyncSession,
+    batch_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int | None = DEFAULT_PAGE_SIZE,
+) -> list[PressDistanceLogORM]:
+    """
+    Retrieves a page of the press distance logs for a batch.
+
+    Args:
+        db (AsyncSession): The database session.
+        batch_id (int): The batch identifier.
+        since (datetime | None): The inclusive lower bound of the log time range.
+        until (datetime | None): The exclusive upper bound of the log time range.
+        after_id (int | None): The cursor, the id of the last log of the previous page.
         limit (int | None): The limit of the number of logs to retrieve.
 
     Returns:
-        list[PressLogORM] | None: The list of logs.
+        list[PressDistanceLogORM]: The list of logs, newest first.
+    """
+
+    query = paginate(
+        select(PressDistanceLogORM).where(PressDistanceLogORM.batch_id == batch_id),
+        PressDistanceLogORM.id,
+        PressDistanceLogORM.created_at,
+        since=since,
+        until=until,
+        after_id=after_id,
+        limit=limit,
+    )
+
+    return list(await db.scalars(query))
+
+
+async def get_downsampled_press_distance_logs_for_machine(
+    db: AsyncSession,
+    machine_id: int,
+    points: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> list[Row]:
+    """
+    Retrieves the press distance logs for a machine, downsampled with LTTB.
+
+    Args:
+        db (AsyncSession): The database session.
+        machine_id (int): The machine identifier.
+        points (int): The maximum number of logs to return.
+        since (datetime | None): The inclusive lower bound of the time range.
+        until (datetime | None): The exclusive upper bound of the time range.
+
+    Returns:
+        list[Row]: The selected logs, oldest first.
+    """
+
+    return await get_downsampled(
+        db,
+        PressDistanceLogORM.distance,
+        PressDistanceLogORM.created_at,
+        PressDistanceLogORM.id,
+        PRESS_DISTANCE_LOG_COLUMNS,
+        PressDistanceLogORM.machine_id == machine_id,
+        points,
+        since=since,
+        until=until,
+    )
+
+
+async def get_downsampled_press_distance_logs_for_batch(
+    db: AsyncSession,
+    batch_id: int,
+    points: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> list[Row]:
     """
+    Retrieves the press distance logs for a batch, downsampled with LTTB.
 
-    if limit is None:
-        return db.query(PressLogORM).filter(PressLogORM.machine_id == machine_id).all()
+    Args:
+        db (AsyncSession): The database session.
+        batch_id (int): The batch identifier.
+        points (int): The maximum number of logs to return.
+        since (datetime | None): The inclusive lower bound of the time range.
+        until (datetime | None): The exclusive upper bound of the time range.
+
+    Returns:
+        list[Row]: The selected logs, oldest first.
+    """
 
-    return (
-        db.query(PressLogORM)
-        .filter(PressLogORM.machine_id == machine_id)
-        .limit(limit)
-        .all()
+    return await get_downsampled(
+        db,
+        PressDistanceLogORM.distance,
+        PressDistanceLogORM.created_at,
+        PressDistanceLogORM.id,
+        PRESS_DISTANCE_LOG_COLUMNS,
+        PressDistanceLogORM.batch_id == batch_id,
+        points,
+        since=since,
+        until=until,
     )
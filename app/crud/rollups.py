@@ -0,0 +1,364 @@
+from sqlalchemy import (
+    ColumnElement,
+    Row,
+    Select,
+    TableClause,
+    func,
+    literal,
+    literal_column,
+    select,
+)
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from decouple import config
+
+from app.models import (
+    TemperatureLog as TemperatureLogORM,
+    HumidityLog as HumidityLogORM,
+    TemperatureRollup as TemperatureRollupORM,
+    HumidityRollup as HumidityRollupORM,
+)
+from app.models.utc_datetime import as_naive_utc
+from app.crud.timeseries import _within_range, get_bucket_start
+from app.utils.resolution_enum import BucketResolution
+
+from datetime import datetime
+
+# Maintain the rollups on insert and answer bucket queries from them when possible
+READING_ROLLUPS: bool = config("READING_ROLLUPS", default=True, cast=bool)
+
+# Resolutions of the stored rollups, finest first
+ROLLUP_RESOLUTIONS: tuple[BucketResolution, ...] = (
+    BucketResolution.SECOND,
+    BucketResolution.MINUTE,
+    BucketResolution.HOUR,
+)
+
+# Rollup table and aggregated column per log table
+ROLLUPS: dict[type, tuple[type, str]] = {
+    TemperatureLogORM: (TemperatureRollupORM, "temperature"),
+    HumidityLogORM: (HumidityRollupORM, "humidity"),
+}
+
+
+def has_rollups(model: type) -> bool:
+    """
+    Args:
+        model (type): The ORM model of a log table.
+
+    Returns:
+        bool: True if the rollups of the table are maintained.
+    """
+    return READING_ROLLUPS and model in ROLLUPS
+
+
+def rollups_enabled(db: AsyncSession, model: type) -> bool:
+    """
+    Args:
+        db (AsyncSession): The database session.
+        model (type): The ORM model of a log table.
+
+    Returns:
+        bool: True if the rollups of the table are maintained on the database of the
+            session. The upsert and the bucket queries use PostgreSQL functions, so on
+            other databases the logs are inserted and bucketed without rollups.
+    """
+    return has_rollups(model) and db.get_bind().dialect.name == "postgresql"
+
+
+def truncate_timestamp(value: datetime, resolution: BucketResolution) -> datetime:
+    """
+    Truncates a timestamp like date_trunc does.
+
+    Args:
+        value (datetime): The timestamp.
+        resolution (BucketResolution): The resolution to truncate to.
+
+    Returns:
+        datetime: The start of the bucket the timestamp falls in.
+    """
+
+    value = value.replace(microsecond=0)
+    if resolution in (BucketResolution.MINUTE, BucketResolution.HOUR):
+        value = value.replace(second=0)
+    if resolution == BucketResolution.HOUR:
+        value = value.replace(minute=0)
+    if resolution == BucketResolution.DAY:
+        value = value.replace(hour=0, minute=0, second=0)
+
+    return value
+
+
+def _merge_on_conflict(model: type, statement: Insert) -> Insert:
+    """
+    Merges the inserted aggregates into the existing bucket rows.
+
+    Args:
+        model (type): The ORM model of the log table.
+        statement (Insert): The insert into the rollup table.
+
+    Returns:
+        Insert: The upsert.
+    """
+
+    rollup, key = ROLLUPS[model]
+    excluded = statement.excluded
+
+    return statement.on_conflict_do_update(
+        index_elements=[rollup.machine_id, rollup.resolution, rollup.bucket_start],
+        set_={
+            f"min_{key}": func.least(
+                getattr(rollup, f"min_{key}"), excluded[f"min_{key}"]
+            ),
+            f"max_{key}": func.greatest(
+                getattr(rollup, f"max_{key}"), excluded[f"max_{key}"]
+            ),
+            f"sum_{key}": getattr(rollup, f"sum_{key}") + excluded[f"sum_{key}"],
+            "count": rollup.count + excluded["count"],
+        },
+    )
+
+
+async def update_rollups(db: AsyncSession, model: type, rows: list[dict]) -> None:
+    """
+    Adds inserted logs to the rollups of their table, in the transaction of the insert.
+    The logs are aggregated per bucket first, so a batch of logs updates each bucket
+    once. Does nothing for tables without rollups and on databases other than
+    PostgreSQL, see rollups_enabled.
+
+    Args:
+        db (AsyncSession): The database session.
+        model (type): The ORM model of the log table.
+        rows (list[dict]): The column values of the inserted logs.
+    """
+
+    if not rollups_enabled(db, model):
+        return
+
+    _, key = ROLLUPS[model]
+    aggregates: dict[tuple, dict] = {}
+
+    for row in rows:
+        machine_id, created_at, value = (
+            row.get("machine_id"),
+            row.get("created_at"),
+            row.get(key),
+        )
+        if machine_id is None or created_at is None or value is None:
+            continue
+
+        created_at = as_naive_utc(created_at)
+        for resolution in ROLLUP_RESOLUTIONS:
+            bucket_start = truncate_timestamp(created_at, resolution)
+            aggregate = aggregates.get((machine_id, resolution, bucket_start))
+            if aggregate is None:
+                aggregates[(machine_id, resolution, bucket_start)] = {
+                    "machine_id": machine_id,
+                    "resolution": resolution,
+                    "bucket_start": bucket_start,
+                    f"min_{key}": value,
+                    f"max_{key}": value,
+                    f"sum_{key}": value,
+                    "count": 1,
+                }
+            else:
+                aggregate[f"min_{key}"] = min(aggregate[f"min_{key}"], value)
+                aggregate[f"max_{key}"] = max(aggregate[f"max_{key}"], value)
+                aggregate[f"sum_{key}"] += value
+                aggregate["count"] += 1
+
+    if not aggregates:
+        return
+
+    rollup, _ = ROLLUPS[model]
+    # Upsert in key order, so concurrent inserts lock the bucket rows in the same order
+    await db.execute(
+        _merge_on_conflict(model, insert(rollup)),
+        [
+            aggregates[bucket]
+            for bucket in sorted(aggregates, key=lambda k: (k[0], k[1].seconds, k[2]))
+        ],
+    )
+
+
+def get_rollup_upsert(
+    model: type, source: TableClause, resolution: BucketResolution
+) -> Insert:
+    """
+    Builds the statement that adds the logs of a table (e.g. the staging table of a COPY
+    import) to the rollups of one resolution, aggregating them in SQL.
+
+    Args:
+        model (type): The ORM model of the log table.
+        source (TableClause): The table holding the logs to add.
+        resolution (BucketResolution): The resolution of the rollups.
+
+    Returns:
+        Insert: The upsert.
+    """
+
+    rollup, key = ROLLUPS[model]
+    value_column = source.c[key]
+    # Inline the resolution, so the bucket expression in GROUP BY matches the select list
+    bucket_start = func.date_trunc(
+        literal_column(f"'{resolution.value}'"), source.c.created_at
+    )
+
+    aggregates: Select = (
+        select(
+            source.c.machine_id,
+            literal(resolution, type_=rollup.resolution.type),
+            bucket_start,
+            func.min(value_column),
+            func.max(value_column),
+            func.sum(value_column),
+            func.count(value_column),
+        )
+        .where(
+            source.c.machine_id.is_not(None),
+            source.c.created_at.is_not(None),
+            value_column.is_not(None),
+        )
+        .group_by(source.c.machine_id, bucket_start)
+    )
+
+    return _merge_on_conflict(
+        model,
+        insert(rollup).from_select(
+            [
+                "machine_id",
+                "resolution",
+                "bucket_start",
+                f"min_{key}",
+                f"max_{key}",
+                f"sum_{key}",
+                "count",
+            ],
+            aggregates,
+        ),
+    )
+
+
+def choose_rollup_resolution(
+    since: datetime | None = None,
+    until: datetime | None = None,
+    resolution: BucketResolution | None = None,
+    buckets: int | None = None,
+) -> BucketResolution | None:
+    """
+    Picks the coarsest rollup that answers a bucket query exactly: every requested bucket
+    must be made of whole rollup buckets, and the bounds of the range must fall on rollup
+    bucket boundaries. E.g. daily buckets are read from the hourly rollup, and 300 buckets
+    over the last 5 hours (60 seconds wide) from the minute rollup if the range starts on
+    a whole minute.
+
+    Args:
+        since (datetime | None): The inclusive lower bound of the time range.
+        until (datetime | None): The exclusive upper bound of the time range.
+        resolution (BucketResolution | None): The calendar resolution of the buckets.
+        buckets (int | None): The number of equal-width buckets, used without a resolution.
+
+    Returns:
+        BucketResolution | None: The resolution of the rollup, or None if the query needs
+            the raw logs.
+    """
+
+    if not READING_ROLLUPS:
+        return None
+
+    if resolution is not None:
+        candidates = [r for r in ROLLUP_RESOLUTIONS if r.seconds <= resolution.seconds]
+    else:
+        # The range of equal-width buckets is only known up front when it is closed
+        if since is None or until is None or not buckets:
+            return None
+
+        width: float = (
+            as_naive_utc(until) - as_naive_utc(since)
+        ).total_seconds() / buckets
+        if not width.is_integer():
+            return None
+        candidates = [r for r in ROLLUP_RESOLUTIONS if int(width) % r.seconds == 0]
+
+    bounds: list[datetime] = [
+        as_naive_utc(bound) for bound in (since, until) if bound is not None
+    ]
+
+    for candidate in reversed(candidates):
+        if all(truncate_timestamp(bound, candidate) == bound for bound in bounds):
+            return candidate
+
+    return None
+
+
+async def get_rollup_buckets(
+    db: AsyncSession,
+    model: type,
+    machine_id: int,
+    rollup_resolution: BucketResolution,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    resolution: BucketResolution | None = None,
+    buckets: int | None = None,
+) -> list[Row]:
+    """
+    Aggregates the rollups of a machine into time buckets, with the same buckets and
+    labels as get_buckets on the log table.
+
+    Args:
+        db (AsyncSession): The database session.
+        model (type): The ORM model of the log table.
+        machine_id (int): The machine identifier.
+        rollup_resolution (BucketResolution): The resolution of the rollup to read, see
+            choose_rollup_resolution.
+        since (datetime | None): The inclusive lower bound of the time range.
+        until (datetime | None): The exclusive upper bound of the time range.
+        resolution (BucketResolution | None): The calendar resolution of the buckets.
+        buckets (int | None): The number of equal-width buckets, used without a resolution.
+
+    Returns:
+        list[Row]: The bucket_start, min, max, mean and count per bucket, oldest first.
+    """
+
+    rollup, key = ROLLUPS[model]
+    condition: ColumnElement[bool] = _within_range(
+        (rollup.machine_id == machine_id) & (rollup.resolution == rollup_resolution),
+        rollup.bucket_start,
+        since,
+        until,
+    )
+
+    bucket_start = await get_bucket_start(
+        db, rollup.bucket_start, condition, since, until, resolution, buckets
+    )
+    if bucket_start is None:
+        return []
+
+    # Bucket the rollup rows in a subquery, in GROUP BY the name bucket_start would
+    # refer to the column of the rollup table instead of the bucket
+    rows = (
+        select(
+            bucket_start.label("bucket_start"),
+            getattr(rollup, f"min_{key}").label("min_value"),
+            getattr(rollup, f"max_{key}").label("max_value"),
+            getattr(rollup, f"sum_{key}").label("sum_value"),
+            rollup.count,
+        )
+        .where(condition)
+        .subquery()
+    )
+
+    count = func.sum(rows.c.count)
+    query = (
+        select(
+            rows.c.bucket_start,
+            func.min(rows.c.min_value).label(f"min_{key}"),
+            func.max(rows.c.max_value).label(f"max_{key}"),
+            (func.sum(rows.c.sum_value) / count).label(f"mean_{key}"),
+            count.label("count"),
+        )
+        .group_by(rows.c.bucket_start)
+        .order_by(rows.c.bucket_start)
+    )
+
+    return list((await db.execute(query)).all())
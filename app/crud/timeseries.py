@@ -0,0 +1,261 @@
+import asyncio
+from sqlalchemy import (
+    ColumnElement,
+    Row,
+    bindparam,
+    extract,
+    func,
+    literal_column,
+    select,
+)
+from collections.abc import AsyncIterator
+from decouple import config
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.database import AsyncSessionLocal
+from app.models.utc_datetime import UTCDateTime, as_naive_utc
+from app.utils.downsampling import lttb
+from app.utils.resolution_enum import BucketResolution
+
+from datetime import datetime, timezone
+
+DEFAULT_BUCKETS: int = 300
+MAX_BUCKETS: int = 10000
+# Rows fetched from the server-side cursor at a time when streaming a history
+STREAM_BATCH_SIZE: int = config("STREAM_BATCH_SIZE", default=1000, cast=int)
+
+
+def _within_range(
+    condition: ColumnElement[bool],
+    time_column: InstrumentedAttribute,
+    since: datetime | None,
+    until: datetime | None,
+) -> ColumnElement[bool]:
+    """
+    Restricts a condition to the timestamped rows within a time range.
+
+    Args:
+        condition (ColumnElement[bool]): The filter selecting the rows.
+        time_column (InstrumentedAttribute): The timestamp column of the table.
+        since (datetime | None): The inclusive lower bound of the time range.
+        until (datetime | None): The exclusive upper bound of the time range.
+
+    Returns:
+        ColumnElement[bool]: The restricted condition.
+    """
+
+    condition = condition & time_column.is_not(None)
+    if since is not None:
+        condition = condition & (time_column >= since)
+    if until is not None:
+        condition = condition & (time_column < until)
+
+    return condition
+
+
+async def get_bucket_start(
+    db: AsyncSession,
+    time_column: InstrumentedAttribute,
+    condition: ColumnElement[bool],
+    since: datetime | None = None,
+    until: datetime | None = None,
+    resolution: BucketResolution | None = None,
+    buckets: int | None = None,
+) -> ColumnElement | None:
+    """
+    Builds the expression of the start of the bucket a timestamp falls in.
+
+    The buckets either follow a calendar resolution (date_trunc), or split the time range
+    into equal-width buckets. Without a closed range, the range of the stored rows is used.
+
+    Args:
+        db (AsyncSession): The database session.
+        time_column (InstrumentedAttribute): The timestamp column of the table.
+        condition (ColumnElement[bool]): The filter selecting the rows within the range.
+        since (datetime | None): The inclusive lower bound of the time range.
+        until (datetime | None): The exclusive upper bound of the time range.
+        resolution (BucketResolution | None): The calendar resolution of the buckets.
+        buckets (int | None): The number of equal-width buckets, used without a resolution.
+
+    Returns:
+        ColumnElement | None: The bucket start, or None if no rows match the condition.
+    """
+
+    if resolution is not None:
+        return func.date_trunc(resolution.value, time_column)
+
+    # Equal-width buckets need a closed range, default to the range of the data
+    if since is None or until is None:
+        first, last = (
+            await db.execute(
+                select(func.min(time_column), func.max(time_column)).where(condition)
+            )
+        ).one()
+
+        if first is None:
+            return None
+
+        since = since or first
+        until = until or last
+
+    # The stored timestamps are naive UTC, compare the bounds in the same form
+    since, until = as_naive_utc(since), as_naive_utc(until)
+
+    width: float = max((until - since).total_seconds() / buckets, 1e-6)
+    origin = bindparam("origin", since, type_=UTCDateTime)
+    bucket_index = func.least(
+        func.floor(extract("epoch", time_column - origin) / width),
+        buckets - 1,
+    )
+
+    return origin + func.make_interval(0, 0, 0, 0, 0, 0, bucket_index * width)
+
+
+async def get_buckets(
+    db: AsyncSession,
+    value_column: InstrumentedAttribute,
+    time_column: InstrumentedAttribute,
+    condition: ColumnElement[bool],
+    since: datetime | None = None,
+    until: datetime | None = None,
+    resolution: BucketResolution | None = None,
+    buckets: int | None = None,
+) -> list[Row]:
+    """
+    Aggregates the readings matching a condition into time buckets in SQL, see
+    get_bucket_start. The aggregates are labelled after the value column, e.g.
+    min_temperature.
+
+    Args:
+        db (AsyncSession): The database session.
+        value_column (InstrumentedAttribute): The column of the readings.
+        time_column (InstrumentedAttribute): The timestamp column of the table.
+        condition (ColumnElement[bool]): The filter selecting the readings.
+        since (datetime | None): The inclusive lower bound of the time range.
+        until (datetime | None): The exclusive upper bound of the time range.
+        resolution (BucketResolution | None): The calendar resolution of the buckets.
+        buckets (int | None): The number of equal-width buckets, used without a resolution.
+
+    Returns:
+        list[Row]: The bucket_start, min, max, mean and count per bucket, oldest first.
+    """
+
+    condition = _within_range(condition, time_column, since, until)
+
+    bucket_start = await get_bucket_start(
+        db, time_column, condition, since, until, resolution, buckets
+    )
+    if bucket_start is None:
+        return []
+
+    # Group by the output column, the bucket expression contains bind parameters
+    query = (
+        select(
+            bucket_start.label("bucket_start"),
+            func.min(value_column).label(f"min_{value_column.key}"),
+            func.max(value_column).label(f"max_{value_column.key}"),
+            func.avg(value_column).label(f"mean_{value_column.key}"),
+            func.count().label("count"),
+        )
+        .where(condition)
+        .group_by(literal_column("bucket_start"))
+        .order_by(literal_column("bucket_start"))
+    )
+
+    return list((await db.execute(query)).all())
+
+
+async def get_downsampled(
+    db: AsyncSession,
+    value_column: InstrumentedAttribute,
+    time_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    columns: list[InstrumentedAttribute],
+    condition: ColumnElement[bool],
+    points: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> list[Row]:
+    """
+    Retrieves the readings matching a condition, downsampled with LTTB in a worker
+    thread.
+
+    Args:
+        db (AsyncSession): The database session.
+        value_column (InstrumentedAttribute): The column of the readings.
+        time_column (InstrumentedAttribute): The timestamp column of the table.
+        id_column (InstrumentedAttribute): The primary key column of the table.
+        columns (list[InstrumentedAttribute]): The columns to return.
+        condition (ColumnElement[bool]): The filter selecting the readings.
+        points (int): The maximum number of readings to return.
+        since (datetime | None): The inclusive lower bound of the time range.
+        until (datetime | None): The exclusive upper bound of the time range.
+
+    Returns:
+        list[Row]: The selected readings, oldest first.
+    """
+
+    condition = _within_range(condition, time_column, since, until)
+
+    # Only fetch the plotted columns, not full ORM objects
+    rows: list[Row] = list(
+        (
+            await db.execute(
+                select(*columns).where(condition).order_by(time_column, id_column)
+            )
+        ).all()
+    )
+
+    # LTTB is pure Python and scales with the rows, keep it off the event loop. The
+    # stored timestamps are naive UTC, .timestamp() alone would read them as local time
+    return await asyncio.to_thread(
+        lttb,
+        rows,
+        points,
+        x=lambda row: getattr(row, time_column.key)
+        .replace(tzinfo=timezone.utc)
+        .timestamp(),
+        y=lambda row: getattr(row, value_column.key),
+    )
+
+
+async def stream_readings(
+    columns: list[InstrumentedAttribute],
+    time_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    condition: ColumnElement[bool],
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> AsyncIterator[list[Row]]:
+    """
+    Streams the readings matching a condition from a server-side cursor, oldest first,
+    STREAM_BATCH_SIZE rows at a time. Only one partition is held in memory at a time.
+
+    The stream opens its own session, since a streamed response is still being sent
+    after the session of the request has been closed.
+
+    Args:
+        columns (list[InstrumentedAttribute]): The columns to return.
+        time_column (InstrumentedAttribute): The timestamp column of the table.
+        id_column (InstrumentedAttribute): The primary key column of the table.
+        condition (ColumnElement[bool]): The filter selecting the readings.
+        since (datetime | None): The inclusive lower bound of the time range.
+        until (datetime | None): The exclusive upper bound of the time range.
+
+    Returns:
+        AsyncIterator[list[Row]]: The readings, in partitions.
+    """
+
+    condition = _within_range(condition, time_column, since, until)
+    query = (
+        select(*columns)
+        .where(condition)
+        .order_by(time_column, id_column)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for partition in result.partitions():
+            yield partition
@@ -1,14 +1,46 @@
 from decouple import config
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import registry, sessionmaker
 from sqlalchemy_utils import database_exists, create_database
 
+# Async drivers used for each database backend
+ASYNC_DRIVERS: dict[str, str] = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """
+    Derives the URL of the async driver from a synchronous database URL.
+
+    Args:
+        database_url (str): The synchronous database URL.
+
+    Returns:
+        str: The database URL using the async driver of the same backend.
+    """
+
+    url = make_url(database_url)
+    async_driver: str = ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)
+
+    return url.set(drivername=async_driver).render_as_string(hide_password=False)
+
+
 # Load database URL from environment variables
 DATABASE_URL = config("DATABASE_URL")
+ASYNC_DATABASE_URL = config(
+    "ASYNC_DATABASE_URL", default=get_async_database_url(DATABASE_URL)
+)
 
-# Create the SQLAlchemy engine
+# Create the SQLAlchemy engine, used for schema management and maintenance scripts
 engine = create_engine(DATABASE_URL, pool_pre_ping=True)
 
+# Create the async SQLAlchemy engine, used by the application routes
+async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True)
+
 # Create a base class for declarative class definitions
 mapper_registry = registry()
 Base = mapper_registry.generate_base()
@@ -16,6 +48,12 @@ Base = mapper_registry.generate_base()
 # Create a configured "Session" class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create a configured "AsyncSession" class. Objects stay readable after a commit so
+# they can be serialised without lazy loading on the event loop.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 def initialise_database() -> None:
     """
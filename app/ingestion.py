@@ -0,0 +1,767 @@
+import asyncio
+import logging
+from decouple import config
+from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.models import OvenLog as OvenLogORM, PressLog as PressLogORM
+from app.models.utc_datetime import as_naive_utc
+from app.websocket import ClientConnection, Throttle, manager as WebSocketManager
+from app.utils.frames import Frame, decode_frame
+from app.utils.logs_enums import OvenLogType, PressLogType
+from app.utils.message_identifiers import MessageIdentifiers
+
+from app.schemas import (
+    IngestFrame,
+    TemperatureLogCreate,
+    TemperatureReading,
+    TemperatureLogAggregate,
+    HumidityLogCreate,
+    HumidityReading,
+    HumidityLogAggregate,
+    OvenLogCreate,
+    OvenLogExpanded,
+    PressLogCreate,
+    PressLogExpanded,
+    PressDistanceLogCreate,
+    PressDistanceReading,
+    PressDistanceLogAggregate,
+)
+
+from app.crud.oven import (
+    get_active_oven_batch_ids_for_machines,
+    create_temperature_logs,
+    create_humidity_logs,
+    create_log as create_oven_log,
+    create_logs as create_oven_logs,
+)
+
+from app.crud.press import (
+    get_active_press_batch_ids_for_machines,
+    create_press_distance_logs,
+    create_log as create_press_log,
+    create_logs as create_press_logs,
+)
+
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Number of buffered readings that triggers a flush of the WebSocket ingestion buffer
+INGEST_BATCH_SIZE: int = config("WS_INGEST_BATCH_SIZE", default=500, cast=int)
+# Seconds the socket may stay idle before buffered readings are flushed
+INGEST_FLUSH_INTERVAL: float = config(
+    "WS_INGEST_FLUSH_INTERVAL", default=0.05, cast=float
+)
+
+INGEST_FRAME_ADAPTER = TypeAdapter(IngestFrame)
+
+# Errors of the Nack frames when a subscription is rejected or storing fails. The
+# details are logged, not sent, since they may hold SQL and parameters
+SUBSCRIPTION_ERROR: str = "Invalid topic or throttle"
+STORAGE_ERROR: str = "Storage failed, resend the frame"
+
+# Validators of the frames accepted on the WebSocket, keyed by message identifier
+INGEST_ADAPTERS: dict[MessageIdentifiers, TypeAdapter] = {
+    MessageIdentifiers.CurrentTemp: TypeAdapter(list[TemperatureReading]),
+    MessageIdentifiers.Humidity: TypeAdapter(list[HumidityReading]),
+    MessageIdentifiers.CurrentDistance: TypeAdapter(list[PressDistanceReading]),
+    MessageIdentifiers.OvenLog: TypeAdapter(list[OvenLogCreate]),
+    MessageIdentifiers.PressLog: TypeAdapter(list[PressLogCreate]),
+}
+
+
+def _group_per_machine(readings: list) -> dict[int, list]:
+    """
+    Groups readings per machine, in chronological order. Naive and timezone-aware
+    timestamps may be mixed, they are compared in naive UTC.
+
+    Args:
+        readings (list): The timestamped readings.
+
+    Returns:
+        dict[int, list]: The readings keyed by machine identifier.
+    """
+
+    readings_per_machine: dict[int, list] = {}
+    for reading in sorted(
+        readings, key=lambda reading: as_naive_utc(reading.created_at)
+    ):
+        readings_per_machine.setdefault(reading.machine_id, []).append(reading)
+
+    return readings_per_machine
+
+
+async def ingest_temperature_readings(
+    db: AsyncSession, readings: list[TemperatureReading], buffered: bool = True
+) -> list[TemperatureLogAggregate]:
+    """
+    Stores a batch of temperature readings for one or more ovens. The active batch is
+    looked up once per machine, all readings are inserted in a single transaction and
+    one aggregated frame is pushed per machine.
+
+    Args:
+        db (AsyncSession): The database session.
+        readings (list[TemperatureReading]): The timestamped temperature readings.
+        buffered (bool): Whether the readings may go through the write-behind buffer,
+            see create_temperature_logs.
+
+    Returns:
+        list[TemperatureLogAggregate]: The aggregated readings per machine.
+    """
+
+    readings_per_machine = _group_per_machine(readings)
+
+    # Get the active batch of every machine at once
+    active_batch_ids: dict[int, int] = await get_active_oven_batch_ids_for_machines(
+        db, list(readings_per_machine)
+    )
+
+    await create_temperature_logs(
+        db,
+        [
+            TemperatureLogCreate(
+                temperature=reading.temperature,
+                machine_id=reading.machine_id,
+                batch_id=active_batch_ids.get(reading.machine_id),
+                created_at=reading.created_at,
+            )
+            for reading in readings
+        ],
+        buffered=buffered,
+    )
+
+    aggregates: list[TemperatureLogAggregate] = []
+    for machine_id, machine_readings in readings_per_machine.items():
+        temperatures: list[float] = [
+            reading.temperature for reading in machine_readings
+        ]
+        latest_reading: TemperatureReading = machine_readings[-1]
+
+        aggregate = TemperatureLogAggregate(
+            temperature=latest_reading.temperature,
+            created_at=latest_reading.created_at,
+            machine_id=machine_id,
+            batch_id=active_batch_ids.get(machine_id),
+            count=len(temperatures),
+            min_temperature=min(temperatures),
+            max_temperature=max(temperatures),
+            mean_temperature=sum(temperatures) / len(temperatures),
+        )
+        aggregates.append(aggregate)
+
+        # Push a single frame per machine instead of one per reading
+        await WebSocketManager.send_personal_message(
+            aggregate.dict(), machine_id, MessageIdentifiers.CurrentTemp
+        )
+
+    return aggregates
+
+
+async def ingest_humidity_readings(
+    db: AsyncSession, readings: list[HumidityReading], buffered: bool = True
+) -> list[HumidityLogAggregate]:
+    """
+    Stores a batch of humidity readings for one or more ovens. The active batch is
+    looked up once per machine, all readings are inserted in a single transaction and
+    one aggregated frame is pushed per machine.
+
+    Args:
+        db (AsyncSession): The database session.
+        readings (list[HumidityReading]): The timestamped humidity readings.
+        buffered (bool): Whether the readings may go through the write-behind buffer,
+            see create_humidity_logs.
+
+    Returns:
+        list[HumidityLogAggregate]: The aggregated readings per machine.
+    """
+
+    readings_per_machine = _group_per_machine(readings)
+
+    # Get the active batch of every machine at once
+    active_batch_ids: dict[int, int] = await get_active_oven_batch_ids_for_machines(
+        db, list(readings_per_machine)
+    )
+
+    await create_humidity_logs(
+        db,
+        [
+            HumidityLogCreate(
+                humidity=reading.humidity,
+                machine_id=reading.machine_id,
+                batch_id=active_batch_ids.get(reading.machine_id),
+                created_at=reading.created_at,
+            )
+            for reading in readings
+        ],
+        buffered=buffered,
+    )
+
+    aggregates: list[HumidityLogAggregate] = []
+    for machine_id, machine_readings in readings_per_machine.items():
+        humidities: list[float] = [reading.humidity for reading in machine_readings]
+        latest_reading: HumidityReading = machine_readings[-1]
+
+        aggregate = HumidityLogAggregate(
+            humidity=latest_reading.humidity,
+            created_at=latest_reading.created_at,
+            machine_id=machine_id,
+            batch_id=active_batch_ids.get(machine_id),
+            count=len(humidities),
+            min_humidity=min(humidities),
+            max_humidity=max(humidities),
+            mean_humidity=sum(humidities) / len(humidities),
+        )
+        aggregates.append(aggregate)
+
+        # Push a single frame per machine instead of one per reading
+        await WebSocketManager.send_personal_message(
+            aggregate.dict(), machine_id, MessageIdentifiers.Humidity
+        )
+
+    return aggregates
+
+
+async def ingest_press_distance_readings(
+    db: AsyncSession, readings: list[PressDistanceReading], buffered: bool = True
+) -> list[PressDistanceLogAggregate]:
+    """
+    Stores a batch of press positions for one or more presses. The active batch is
+    looked up once per machine, all positions are inserted in a single transaction and
+    one aggregated frame is pushed per machine.
+
+    Args:
+        db (AsyncSession): The database session.
+        readings (list[PressDistanceReading]): The timestamped press positions.
+        buffered (bool): Whether the readings may go through the write-behind buffer,
+            see create_press_distance_logs.
+
+    Returns:
+        list[PressDistanceLogAggregate]: The aggregated positions per machine.
+    """
+
+    readings_per_machine = _group_per_machine(readings)
+
+    # Get the active batch of every machine at once
+    active_batch_ids: dict[int, int] = await get_active_press_batch_ids_for_machines(
+        db, list(readings_per_machine)
+    )
+
+    await create_press_distance_logs(
+        db,
+        [
+            PressDistanceLogCreate(
+                distance=reading.distance,
+                machine_id=reading.machine_id,
+                batch_id=active_batch_ids.get(reading.machine_id),
+                created_at=reading.created_at,
+            )
+            for reading in readings
+        ],
+        buffered=buffered,
+    )
+
+    aggregates: list[PressDistanceLogAggregate] = []
+    for machine_id, machine_readings in readings_per_machine.items():
+        distances: list[float] = [reading.distance for reading in machine_readings]
+        latest_reading: PressDistanceReading = machine_readings[-1]
+
+        aggregate = PressDistanceLogAggregate(
+            distance=latest_reading.distance,
+            created_at=latest_reading.created_at,
+            machine_id=machine_id,
+            batch_id=active_batch_ids.get(machine_id),
+            count=len(distances),
+            min_distance=min(distances),
+            max_distance=max(distances),
+        )
+        aggregates.append(aggregate)
+
+        # Push a single frame per machine instead of one per position
+        await WebSocketManager.send_personal_message(
+            aggregate.dict(), machine_id, MessageIdentifiers.CurrentDistance
+        )
+
+    return aggregates
+
+
+async def ingest_oven_log(db: AsyncSession, new_log: OvenLogCreate) -> OvenLogExpanded:
+    """
+    Stores an oven log, stops the active batch in the same transaction when the log
+    finishes it and pushes the log to the clients of the machine.
+
+    Args:
+        db (AsyncSession): The database session.
+        new_log (OvenLogCreate): The log details.
+
+    Returns:
+        OvenLogExpanded: The created log.
+    """
+
+    log = await create_oven_log(
+        db, new_log, stop_batch=new_log.type == OvenLogType.PHASE_FINISHED
+    )
+
+    return await push_oven_log(log)
+
+
+async def ingest_oven_logs(
+    db: AsyncSession, new_logs: list[OvenLogCreate]
+) -> list[OvenLogExpanded]:
+    """
+    Stores oven logs in a single transaction, stopping the active batch of a machine in
+    that transaction when a log finishes it, and pushes the logs to the clients of their
+    machines.
+
+    Args:
+        db (AsyncSession): The database session.
+        new_logs (list[OvenLogCreate]): The log details, in order.
+
+    Returns:
+        list[OvenLogExpanded]: The created logs.
+    """
+
+    logs: list[OvenLogORM] = await create_oven_logs(
+        db, [(log, log.type == OvenLogType.PHASE_FINISHED) for log in new_logs]
+    )
+
+    return [await push_oven_log(log) for log in logs]
+
+
+async def push_oven_log(log: OvenLogORM) -> OvenLogExpanded:
+    """
+    Pushes a stored oven log to the clients of the machine.
+
+    Args:
+        log (OvenLogORM): The stored log.
+
+    Returns:
+        OvenLogExpanded: The log, with its category and description.
+    """
+
+    created_log = OvenLogExpanded(
+        id=log.id,
+        created_at=log.created_at,
+        machine_id=log.machine_id,
+        type=log.type.category,
+        description=log.type.description,
+        batch_id=log.batch_id,
+    )
+
+    created_log_dict: dict = {
+        "id": created_log.id,
+        "created_at": created_log.created_at,
+        "machine_id": created_log.machine_id,
+        "type": created_log.type.value,
+        "description": created_log.description.value,
+        "batch_id": created_log.batch_id,
+    }
+
+    await WebSocketManager.send_personal_message(
+        created_log_dict, log.machine_id, MessageIdentifiers.OvenLog
+    )
+
+    return created_log
+
+
+async def ingest_press_log(
+    db: AsyncSession, new_log: PressLogCreate
+) -> PressLogExpanded:
+    """
+    Stores a press log, stops the active batch in the same transaction when the log
+    finishes it and pushes the log to the clients of the machine.
+
+    Args:
+        db (AsyncSession): The database session.
+        new_log (PressLogCreate): The log details.
+
+    Returns:
+        PressLogExpanded: The created log.
+    """
+
+    log = await create_press_log(
+        db, new_log, stop_batch=new_log.type == PressLogType.PHASE_FINISHED
+    )
+
+    return await push_press_log(log)
+
+
+async def ingest_press_logs(
+    db: AsyncSession, new_logs: list[PressLogCreate]
+) -> list[PressLogExpanded]:
+    """
+    Stores press logs in a single transaction, stopping the active batch of a machine
+    in that transaction when a log finishes it, and pushes the logs to the clients of
+    their machines.
+
+    Args:
+        db (AsyncSession): The database session.
+        new_logs (list[PressLogCreate]): The log details, in order.
+
+    Returns:
+        list[PressLogExpanded]: The created logs.
+    """
+
+    logs: list[PressLogORM] = await create_press_logs(
+        db, [(log, log.type == PressLogType.PHASE_FINISHED) for log in new_logs]
+    )
+
+    return [await push_press_log(log) for log in logs]
+
+
+async def push_press_log(log: PressLogORM) -> PressLogExpanded:
+    """
+    Pushes a stored press log to the clients of the machine.
+
+    Args:
+        log (PressLogORM): The stored log.
+
+    Returns:
+        PressLogExpanded: The log, with its category and description.
+    """
+
+    created_log = PressLogExpanded(
+        id=log.id,
+        created_at=log.created_at,
+        machine_id=log.machine_id,
+        type=log.type.category,
+        description=log.type.description,
+        batch_id=log.batch_id,
+    )
+
+    created_log_dict: dict = {
+        "id": created_log.id,
+        "created_at": created_log.created_at,
+        "machine_id": created_log.machine_id,
+        "type": created_log.type.value,
+        "description": created_log.description.value,
+        "batch_id": created_log.batch_id,
+    }
+
+    await WebSocketManager.send_personal_message(
+        created_log_dict, log.machine_id, MessageIdentifiers.PressLog
+    )
+
+    return created_log
+
+
+# Stores the readings of each identifier, in one transaction per identifier
+READING_INGESTERS = {
+    MessageIdentifiers.CurrentTemp: ingest_temperature_readings,
+    MessageIdentifiers.Humidity: ingest_humidity_readings,
+    MessageIdentifiers.CurrentDistance: ingest_press_distance_readings,
+}
+
+# Identifiers of the frames that change the topic subscriptions of the connection
+SUBSCRIPTION_IDENTIFIERS: frozenset[str] = frozenset(
+    {MessageIdentifiers.Subscribe.value, MessageIdentifiers.Unsubscribe.value}
+)
+
+# Stores the logs of a frame in one transaction, in order since a log may stop a batch
+LOG_INGESTERS = {
+    MessageIdentifiers.OvenLog: ingest_oven_logs,
+    MessageIdentifiers.PressLog: ingest_press_logs,
+}
+
+
+def get_throttle(options: dict) -> Throttle | None:
+    """
+    Args:
+        options (dict): The options of a subscription, with the optional max_hz and
+            deadband.
+
+    Returns:
+        Throttle | None: The throttle, or None if the subscription is not throttled.
+
+    Raises:
+        ValueError: If an option is invalid.
+    """
+
+    max_hz, deadband = options.get("max_hz"), options.get("deadband")
+    if max_hz is None and deadband is None:
+        return None
+
+    return Throttle(
+        float(max_hz) if max_hz is not None else None,
+        float(deadband) if deadband is not None else None,
+    )
+
+
+class IngestionSession:
+    """
+    Reads the frames a machine streams over its WebSocket and stores them in batches.
+
+    Every frame has the shape {"identifier": ..., "seq": ..., "message": ...}, where the
+    message is one reading or log, or a list of them, as sent to the clients. The
+    machine_id defaults to the client identifier and created_at to the time of receipt.
+    Frames are JSON text, or MessagePack binary frames with the same shape.
+    Valid frames are buffered until INGEST_BATCH_SIZE readings are pending or the socket
+    is idle for INGEST_FLUSH_INTERVAL seconds, then stored and acknowledged with an Ack
+    frame carrying the highest stored seq. Rejected frames are answered with a Nack.
+    Frames without a seq are ignored, as every frame was before.
+
+    Any client may also send {"identifier": "Subscribe" or "Unsubscribe", "message":
+    {"topics": [...]}} to change its topic subscriptions, see app.utils.topics. A Subscribe
+    message may add "max_hz" and "deadband" to throttle the readings of its topics, e.g.
+    2 Hz for a tablet while the HMI receives every reading. Both are answered with a
+    Subscriptions frame listing the current subscriptions, or a Nack if a topic is
+    invalid.
+    """
+
+    def __init__(self, connection: ClientConnection):
+        self.connection = connection
+        client_id: str = connection.client_id
+        self.machine_id: int | None = int(client_id) if client_id.isdigit() else None
+        # Validated frames awaiting a flush, as (seq, identifier, items)
+        self.pending: list[tuple[int, MessageIdentifiers, list]] = []
+        self.pending_count: int = 0
+
+    async def run(self) -> None:
+        """
+        Receives frames until the WebSocket disconnects, flushing the buffer whenever
+        it is full or the socket goes idle. The buffer is flushed once more on disconnect.
+        """
+        websocket = self.connection.websocket
+
+        try:
+            while True:
+                if not self.pending:
+                    await self.receive(await self._receive_data(websocket))
+                    continue
+
+                try:
+                    data: str | bytes = await asyncio.wait_for(
+                        self._receive_data(websocket), timeout=INGEST_FLUSH_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    await self.flush()
+                    continue
+
+                await self.receive(data)
+        finally:
+            await self.flush()
+
+    @staticmethod
+    async def _receive_data(websocket: WebSocket) -> str | bytes:
+        """
+        Receives the next text or binary frame.
+
+        Args:
+            websocket (WebSocket): The WebSocket connection.
+
+        Returns:
+            str | bytes: The JSON text, or the MessagePack bytes.
+
+        Raises:
+            WebSocketDisconnect: If the client disconnected.
+        """
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+
+        text: str | None = message.get("text")
+        return text if text is not None else message.get("bytes", b"")
+
+    async def receive(self, data: str | bytes) -> None:
+        """
+        Parses and validates a frame and adds it to the buffer.
+
+        Args:
+            data (str | bytes): The received frame, JSON text or MessagePack bytes.
+        """
+
+        try:
+            if isinstance(data, str):
+                frame: IngestFrame = INGEST_FRAME_ADAPTER.validate_json(data)
+            else:
+                frame = INGEST_FRAME_ADAPTER.validate_python(decode_frame(data))
+        except (ValidationError, ValueError):
+            return
+
+        if frame.identifier in SUBSCRIPTION_IDENTIFIERS:
+            self.update_subscriptions(frame)
+            return
+
+        if frame.seq is None:
+            return
+
+        try:
+            identifier = MessageIdentifiers(frame.identifier)
+            adapter: TypeAdapter = INGEST_ADAPTERS[identifier]
+        except (ValueError, KeyError):
+            self._send(
+                MessageIdentifiers.Nack,
+                {
+                    "seq": frame.seq,
+                    "error": f"Unsupported identifier {frame.identifier}",
+                },
+            )
+            return
+
+        items: list[dict] = (
+            frame.message if isinstance(frame.message, list) else [frame.message]
+        )
+        received_at: datetime = datetime.now(tz=timezone.utc)
+        for item in items:
+            item.setdefault("machine_id", self.machine_id)
+            item.setdefault("created_at", received_at)
+            item.setdefault("batch_id", None)
+
+        try:
+            validated: list = adapter.validate_python(items)
+        except ValidationError as e:
+            self._send(
+                MessageIdentifiers.Nack,
+                {"seq": frame.seq, "error": f"{e.error_count()} invalid field(s)"},
+            )
+            return
+
+        self.pending.append((frame.seq, identifier, validated))
+        self.pending_count += len(validated)
+
+        if self.pending_count >= INGEST_BATCH_SIZE:
+            await self.flush()
+
+    def update_subscriptions(self, frame: IngestFrame) -> None:
+        """
+        Subscribes the connection to the topics of a Subscribe frame, or unsubscribes it
+        from those of an Unsubscribe frame.
+
+        Args:
+            frame (IngestFrame): The frame, with the message {"topics": [...]} and for a
+                Subscribe frame the optional max_hz and deadband of the throttle.
+        """
+
+        topics = (
+            frame.message.get("topics") if isinstance(frame.message, dict) else None
+        )
+        if not isinstance(topics, list) or not all(isinstance(t, str) for t in topics):
+            self._send(
+                MessageIdentifiers.Nack,
+                {"seq": frame.seq, "error": "Expected a list of topics"},
+            )
+            return
+
+        try:
+            if frame.identifier == MessageIdentifiers.Subscribe.value:
+                WebSocketManager.subscribe(
+                    self.connection, topics, get_throttle(frame.message)
+                )
+            else:
+                WebSocketManager.unsubscribe(self.connection, topics)
+        except (TypeError, ValueError) as e:
+            logger.info(
+                "Rejected subscription client_id=%s error=%s",
+                self.connection.client_id,
+                e,
+            )
+            self._send(
+                MessageIdentifiers.Nack, {"seq": frame.seq, "error": SUBSCRIPTION_ERROR}
+            )
+            return
+
+        self._send(
+            MessageIdentifiers.Subscriptions,
+            {"seq": frame.seq, "topics": sorted(self.connection.topics)},
+        )
+
+    async def flush(self) -> None:
+        """
+        Stores the buffered frames in arrival order and acknowledges them. Consecutive
+        readings are stored together, and readings are always stored before a later log,
+        so that a log finishing a batch does not detach the readings that preceded it.
+        Each group of readings and the logs of each frame are committed on their own,
+        so a frame is either stored whole or not at all. If storing fails, the frames
+        already committed are still acknowledged and only the others are answered with
+        a Nack to be resent.
+        """
+
+        pending, self.pending, self.pending_count = self.pending, [], 0
+        if not pending:
+            return
+
+        # Indexes in pending of the committed frames
+        stored: list[int] = []
+        failed: bool = False
+
+        try:
+            async with AsyncSessionLocal() as db:
+                readings: dict[MessageIdentifiers, list[int]] = {}
+
+                for index, (_, identifier, items) in enumerate(pending):
+                    if identifier in READING_INGESTERS:
+                        readings.setdefault(identifier, []).append(index)
+                        continue
+
+                    await self._store_readings(db, pending, readings, stored)
+                    readings = {}
+                    await LOG_INGESTERS[identifier](db, items)
+                    stored.append(index)
+
+                await self._store_readings(db, pending, readings, stored)
+        except Exception:
+            logger.exception(
+                "Failed to store ingested frames client_id=%s frames=%d stored=%d",
+                self.connection.client_id,
+                len(pending),
+                len(stored),
+            )
+            failed = True
+
+        if stored:
+            self._send(
+                MessageIdentifiers.Ack,
+                {
+                    "seq": max(pending[index][0] for index in stored),
+                    "count": sum(len(pending[index][2]) for index in stored),
+                },
+            )
+
+        if not failed:
+            return
+
+        committed: set[int] = set(stored)
+        for index, (seq, _, _) in enumerate(pending):
+            if index not in committed:
+                self._send(
+                    MessageIdentifiers.Nack, {"seq": seq, "error": STORAGE_ERROR}
+                )
+
+    @staticmethod
+    async def _store_readings(
+        db: AsyncSession,
+        pending: list[tuple[int, MessageIdentifiers, list]],
+        readings: dict[MessageIdentifiers, list[int]],
+        stored: list[int],
+    ) -> None:
+        """
+        Stores the buffered readings, one transaction per identifier.
+
+        Args:
+            db (AsyncSession): The database session.
+            pending (list[tuple[int, MessageIdentifiers, list]]): The buffered frames.
+            readings (dict[MessageIdentifiers, list[int]]): The indexes in pending of the
+                reading frames, keyed by identifier.
+            stored (list[int]): The indexes of the committed frames, extended with the
+                frames of every identifier once its transaction is committed.
+        """
+        for identifier, indexes in readings.items():
+            # The frames are acknowledged once stored, so bypass the write-behind buffer
+            await READING_INGESTERS[identifier](
+                db,
+                [item for index in indexes for item in pending[index][2]],
+                buffered=False,
+            )
+            stored.extend(indexes)
+
+    def _send(self, identifier: MessageIdentifiers, message: dict) -> None:
+        """
+        Queues a frame for this connection only.
+
+        Args:
+            identifier (MessageIdentifiers): The message identifier.
+            message (dict): The message to send.
+        """
+        self.connection.enqueue(Frame.envelope(identifier, message))
@@ -0,0 +1,67 @@
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+from decouple import config
+
+# Level of the application loggers, e.g. DEBUG, INFO or WARNING
+LOG_LEVEL: str = config("LOG_LEVEL", default="INFO").upper()
+# Format of the log records, as key=value pairs after the message
+LOG_FORMAT: str = config(
+    "LOG_FORMAT", default="%(asctime)s level=%(levelname)s logger=%(name)s %(message)s"
+)
+
+
+class LogListener:
+    """
+    Writes the records of the application loggers (app.*) from a background thread.
+    The loggers only put the records on a queue, so logging on the event loop never
+    waits on a synchronous write to stderr. Records below LOG_LEVEL are discarded
+    before they are formatted.
+    """
+
+    def __init__(self, level: str = LOG_LEVEL, fmt: str = LOG_FORMAT):
+        self.level = level
+        self.fmt = fmt
+        self._listener: QueueListener | None = None
+        self._handler: QueueHandler | None = None
+
+    def start(self) -> None:
+        """
+        Routes the application loggers through the queue and starts the writer thread.
+        """
+        if self._listener is not None:
+            return
+
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        stream = logging.StreamHandler(sys.stderr)
+        stream.setFormatter(logging.Formatter(self.fmt))
+
+        self._handler = QueueHandler(records)
+        self._listener = QueueListener(records, stream)
+
+        app_logger = logging.getLogger("app")
+        app_logger.setLevel(self.level)
+        app_logger.addHandler(self._handler)
+        app_logger.propagate = False
+
+        self._listener.start()
+
+    def stop(self) -> None:
+        """
+        Writes the queued records and stops the writer thread.
+        """
+        if self._listener is None:
+            return
+
+        app_logger = logging.getLogger("app")
+        app_logger.removeHandler(self._handler)
+        app_logger.propagate = True
+
+        self._listener.stop()
+        self._listener, self._handler = None, None
+
+
+# Create a global instance of the log listener
+log_listener = LogListener()
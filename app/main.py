@@ -1,18 +1,66 @@
 import uvicorn
-from fastapi import FastAPI, WebSocket
+from uuid import uuid4
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, WebSocket, status
 from fastapi.exceptions import RequestValidationError, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.requests import Request
 from fastapi.responses import JSONResponse
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response
 from mangum import Mangum
+from prometheus_client import REGISTRY
 from sqlalchemy.exc import IntegrityError, NoResultFound
-from app.database import initialise_database
-from app.routers import oven, machines, press
+from app.database import async_engine, engine, initialise_database
+from app.ingestion import IngestionSession, get_throttle
+from app.routers import oven, machines, press, logs
 from app.utils.http_messages import HTTPMessages
-from app.websocket import manager as WebSocketManager
+from app.utils.responses import ORJSONResponse
+from app.utils.topics import validate_topic
+from app.websocket import Throttle, manager as WebSocketManager
+from app.write_behind import write_behind
+from app.maintenance import maintenance
+from app.logging_config import log_listener
+from app.metrics import (
+    METRICS_ENABLED,
+    ConnectionCollector,
+    MetricsMiddleware,
+    get_metrics,
+    instrument_engine,
+)
+from app.profiling import (
+    SQL_PROFILING,
+    ProfilingMiddleware,
+    profile_engine,
+    sql_profiler,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Starts the log listener, the WebSocket broker, the write-behind buffer and the
+    partition maintenance job for the lifetime of the application. The buffered rows are
+    flushed on shutdown.
+
+    Args:
+        app (FastAPI): The application.
+    """
 
-app = FastAPI()
+    log_listener.start()
+    await WebSocketManager.start()
+    await write_behind.start()
+    await maintenance.start()
+    try:
+        yield
+    finally:
+        await maintenance.stop()
+        await write_behind.stop()
+        await WebSocketManager.stop()
+        log_listener.stop()
+
+
+# Render the responses with orjson, the list endpoints also skip the response_model
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 handler = Mangum(app)
 
 origins: list[str] = [
@@ -23,21 +71,111 @@ origins: list[str] = [
 ]
 
 
+if METRICS_ENABLED:
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
+    REGISTRY.register(ConnectionCollector(lambda: WebSocketManager.active_connections))
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> Response:
+        """
+        Exposes the metrics in the Prometheus text format.
+        """
+        content, media_type = get_metrics()
+        return Response(content, media_type=media_type)
+
+
+if SQL_PROFILING:
+    profile_engine(engine)
+    profile_engine(async_engine.sync_engine)
+    app.add_middleware(ProfilingMiddleware)
+
+    @app.get("/debug/sql", include_in_schema=False)
+    async def sql_profile(route: str | None = None, limit: int = 20) -> ORJSONResponse:
+        """
+        Reports the query budget of each route and the statements of the recent requests.
+
+        Args:
+            route (str | None): Only report the requests of this route template, e.g.
+                /oven/start/{machine_id}.
+            limit (int): The maximum number of recent requests reported.
+        """
+        return ORJSONResponse(sql_profiler.report(route, limit))
+
+
 @app.websocket("/ws/{client_id}")
-async def websocket_endpoint(websocket: WebSocket, client_id: str) -> None:
+async def websocket_endpoint(
+    websocket: WebSocket,
+    client_id: str,
+    max_hz: float | None = None,
+    deadband: float | None = None,
+) -> None:
     """
-    WebSocket endpoint for the application.
+    WebSocket endpoint for the application. Machines may stream readings and logs
+    over the socket, see IngestionSession for the frame protocol.
 
     Args:
         websocket (WebSocket): The WebSocket connection.
         client_id (str): The client identifier.
+        max_hz (float | None): The maximum number of readings per second and topic sent
+            to the client, coalesced to the latest reading.
+        deadband (float | None): The change below which a reading is not sent.
+
+    """
+
+    try:
+        throttle: Throttle | None = get_throttle(
+            {"max_hz": max_hz, "deadband": deadband}
+        )
+    except ValueError:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    connection = await WebSocketManager.connect(websocket, client_id, throttle=throttle)
+    try:
+        # Store the readings and logs the machine streams over the socket
+        await IngestionSession(connection).run()
+    except Exception:
+        await WebSocketManager.disconnect(client_id, websocket)
+
+
+@app.websocket("/ws")
+async def subscriber_endpoint(
+    websocket: WebSocket,
+    topics: str | None = None,
+    max_hz: float | None = None,
+    deadband: float | None = None,
+) -> None:
+    """
+    WebSocket endpoint for clients that choose the frames they receive by topic, e.g.
+    machine:3:temp or machine:*:log, see app.utils.topics. The client sends Subscribe and
+    Unsubscribe frames to change its subscriptions, see IngestionSession.
+
+    Args:
+        websocket (WebSocket): The WebSocket connection.
+        topics (str | None): The comma-separated topics to subscribe to on connect.
+        max_hz (float | None): The maximum number of readings per second and topic sent
+            for these topics, coalesced to the latest reading.
+        deadband (float | None): The change below which a reading is not sent.
 
     """
 
-    await WebSocketManager.connect(websocket, client_id)
+    client_id: str = f"subscriber_{uuid4().hex}"
+    initial: list[str] = [t for t in (topics or "").split(",") if t]
+    try:
+        for topic in initial:
+            validate_topic(topic)
+        throttle: Throttle | None = get_throttle(
+            {"max_hz": max_hz, "deadband": deadband}
+        )
+    except ValueError:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    connection = await WebSocketManager.connect(websocket, client_id, initial, throttle)
     try:
-        while True:
-            await websocket.receive_text()
+        await IngestionSession(connection).run()
     except Exception:
         await WebSocketManager.disconnect(client_id, websocket)
 
@@ -62,7 +200,7 @@ async def validation_exception_handler(
         status_code=422,
         content=dict(
             success=False,
-            msg=HTTPMessages.VALIDATION_ERROR,
+            msg=HTTPMessages.VALIDATION_ERROR.value,
             data=[],
         ),
     )
@@ -114,7 +252,7 @@ async def integrity_error_handler(
         status_code=400,
         content=dict(
             success=False,
-            msg=HTTPMessages.DATA_INTEGRITY_ERROR,
+            msg=HTTPMessages.DATA_INTEGRITY_ERROR.value,
             data=[],
         ),
     )
@@ -181,6 +319,7 @@ async def general_exception_handler(request: Request, exc: Exception) -> JSONRes
 app.include_router(oven.router)
 app.include_router(machines.router)
 app.include_router(press.router)
+app.include_router(logs.router)
 
 
 @app.get("/", include_in_schema=False)
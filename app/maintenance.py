@@ -0,0 +1,353 @@
+"""
+Maintains the monthly partitions of the log tables, see
+migrations/20261017-log-partitioning.sql. Tables that are not partitioned are skipped.
+
+Every run creates the partitions of the coming months, moves the rows that landed in
+the default partition (e.g. backfilled history) into partitions of their own, and
+drops or archives the partitions older than the retention window. Dropping a month is
+a catalog operation instead of a DELETE of all its rows.
+
+The application runs the job every MAINTENANCE_INTERVAL seconds. It can also be run
+once from the command line:
+
+Usage:
+    python -m app.maintenance
+"""
+
+import asyncio
+import json
+import logging
+from decouple import config
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.database import engine
+from app.utils.copy_enums import LogTable
+from app.utils.maintenance_enums import RetentionMode
+
+from datetime import date, datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Number of months ahead of the current one that have a partition
+PARTITION_PREMAKE_MONTHS: int = config("PARTITION_PREMAKE_MONTHS", default=3, cast=int)
+# Number of complete months kept before the current one, 0 keeps every month
+LOG_RETENTION_MONTHS: int = config("LOG_RETENTION_MONTHS", default=0, cast=int)
+LOG_RETENTION_MODE: RetentionMode = config(
+    "LOG_RETENTION_MODE", default=RetentionMode.DROP.value, cast=RetentionMode
+)
+# Schema the archived partitions are moved to
+LOG_ARCHIVE_SCHEMA: str = config("LOG_ARCHIVE_SCHEMA", default="archive")
+# Seconds between two runs of the job in the application, 0 disables it
+MAINTENANCE_INTERVAL: float = config("MAINTENANCE_INTERVAL", default=3600.0, cast=float)
+
+
+def add_months(month: date, months: int) -> date:
+    """
+    Args:
+        month (date): The first day of a month.
+        months (int): The number of months to add, may be negative.
+
+    Returns:
+        date: The first day of the resulting month.
+    """
+
+    index: int = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def get_partition_name(log_table: LogTable, month: date) -> str:
+    """
+    Args:
+        log_table (LogTable): The log table.
+        month (date): The first day of the month.
+
+    Returns:
+        str: The name of the partition of the month, e.g. temperature_logs_p2026_10.
+    """
+
+    return f"{log_table.value}_p{month:%Y_%m}"
+
+
+def is_partitioned(connection: Connection, log_table: LogTable) -> bool:
+    """
+    Args:
+        connection (Connection): The database connection.
+        log_table (LogTable): The log table.
+
+    Returns:
+        bool: True if the table is partitioned.
+    """
+
+    return bool(
+        connection.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass(:table))"
+            ),
+            {"table": log_table.value},
+        ).scalar()
+    )
+
+
+def get_partitions(connection: Connection, log_table: LogTable) -> dict[date, str]:
+    """
+    Lists the monthly partitions of a table.
+
+    Args:
+        connection (Connection): The database connection.
+        log_table (LogTable): The log table.
+
+    Returns:
+        dict[date, str]: The partition names keyed by the first day of their month.
+    """
+
+    names = connection.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table)"
+        ),
+        {"table": log_table.value},
+    ).scalars()
+
+    partitions: dict[date, str] = {}
+    prefix: str = f"{log_table.value}_p"
+    for name in names:
+        if name.startswith(prefix):
+            month = datetime.strptime(name[len(prefix) :], "%Y_%m").date()
+            partitions[month] = name
+
+    return partitions
+
+
+def create_partition(connection: Connection, log_table: LogTable, month: date) -> str:
+    """
+    Creates the partition of a month, moving the rows of that month out of the default
+    partition, which must not hold rows of a partition being attached. The partition
+    gets the indexes and foreign keys of the table when it is attached.
+
+    Args:
+        connection (Connection): The database connection.
+        log_table (LogTable): The log table.
+        month (date): The first day of the month.
+
+    Returns:
+        str: The name of the partition.
+    """
+
+    name: str = get_partition_name(log_table, month)
+    bounds: dict[str, date] = {"start": month, "end": add_months(month, 1)}
+
+    connection.execute(
+        text(f"CREATE TABLE {name} (LIKE {log_table.value} INCLUDING DEFAULTS)")
+    )
+    connection.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {log_table.value}_default "
+            "WHERE created_at >= :start AND created_at < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    connection.execute(
+        text(
+            f"ALTER TABLE {log_table.value} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+        )
+    )
+
+    return name
+
+
+def ensure_partitions(
+    connection: Connection, log_table: LogTable, premake_months: int
+) -> list[str]:
+    """
+    Creates the partitions up to premake_months ahead, and the partitions of the months
+    with rows in the default partition.
+
+    Args:
+        connection (Connection): The database connection.
+        log_table (LogTable): The log table.
+        premake_months (int): The number of months ahead that need a partition.
+
+    Returns:
+        list[str]: The names of the created partitions.
+    """
+
+    current_month: date = datetime.now(tz=timezone.utc).date().replace(day=1)
+    months: set[date] = {
+        add_months(current_month, offset) for offset in range(premake_months + 1)
+    }
+
+    has_default: bool = connection.execute(
+        text("SELECT to_regclass(:default) IS NOT NULL"),
+        {"default": f"{log_table.value}_default"},
+    ).scalar()
+    if has_default:
+        months.update(
+            connection.execute(
+                text(
+                    "SELECT DISTINCT date_trunc('month', created_at)::date "
+                    f"FROM {log_table.value}_default WHERE created_at IS NOT NULL"
+                )
+            ).scalars()
+        )
+
+    existing: dict[date, str] = get_partitions(connection, log_table)
+
+    return [
+        create_partition(connection, log_table, month)
+        for month in sorted(months)
+        if month not in existing
+    ]
+
+
+def apply_retention(
+    connection: Connection,
+    log_table: LogTable,
+    retention_months: int,
+    mode: RetentionMode,
+    archive_schema: str = LOG_ARCHIVE_SCHEMA,
+) -> list[str]:
+    """
+    Drops or archives the partitions of the months before the retention window.
+
+    Args:
+        connection (Connection): The database connection.
+        log_table (LogTable): The log table.
+        retention_months (int): The number of complete months to keep, 0 keeps every month.
+        mode (RetentionMode): Whether the expired partitions are dropped or archived.
+        archive_schema (str): The schema the archived partitions are moved to.
+
+    Returns:
+        list[str]: The names of the dropped or archived partitions.
+    """
+
+    if retention_months <= 0:
+        return []
+
+    current_month: date = datetime.now(tz=timezone.utc).date().replace(day=1)
+    cutoff: date = add_months(current_month, -retention_months)
+
+    expired: list[str] = [
+        name
+        for month, name in sorted(get_partitions(connection, log_table).items())
+        if month < cutoff
+    ]
+
+    if expired and mode == RetentionMode.ARCHIVE:
+        connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}"))
+
+    for name in expired:
+        if mode == RetentionMode.ARCHIVE:
+            connection.execute(
+                text(f"ALTER TABLE {log_table.value} DETACH PARTITION {name}")
+            )
+            connection.execute(text(f"ALTER TABLE {name} SET SCHEMA {archive_schema}"))
+        else:
+            connection.execute(text(f"DROP TABLE {name}"))
+
+    return expired
+
+
+def run_maintenance(
+    premake_months: int = PARTITION_PREMAKE_MONTHS,
+    retention_months: int = LOG_RETENTION_MONTHS,
+    mode: RetentionMode = LOG_RETENTION_MODE,
+) -> dict[str, dict[str, list[str]]]:
+    """
+    Maintains the partitions of every partitioned log table, in one transaction. Only one
+    process runs the job at a time, the others skip it.
+
+    Args:
+        premake_months (int): The number of months ahead that need a partition.
+        retention_months (int): The number of complete months to keep, 0 keeps every month.
+        mode (RetentionMode): Whether the expired partitions are dropped or archived.
+
+    Returns:
+        dict[str, dict[str, list[str]]]: The created and expired (dropped or archived)
+            partitions per table.
+    """
+
+    if engine.dialect.name != "postgresql":
+        return {}
+
+    report: dict[str, dict[str, list[str]]] = {}
+
+    with engine.begin() as connection:
+        locked: bool = connection.execute(
+            text("SELECT pg_try_advisory_xact_lock(hashtext('app.maintenance'))")
+        ).scalar()
+        if not locked:
+            return report
+
+        for log_table in LogTable:
+            if not is_partitioned(connection, log_table):
+                continue
+
+            report[log_table.value] = {
+                "created": ensure_partitions(connection, log_table, premake_months),
+                "expired": apply_retention(
+                    connection, log_table, retention_months, mode
+                ),
+            }
+
+    return report
+
+
+class MaintenanceJob:
+    """
+    Runs the partition maintenance in the background every interval seconds.
+    """
+
+    def __init__(self, interval: float = MAINTENANCE_INTERVAL):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """
+        Starts the background task, unless the job is disabled or the database is not
+        PostgreSQL.
+        """
+        if (
+            self.interval > 0
+            and engine.dialect.name == "postgresql"
+            and self._task is None
+        ):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops the background task.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """
+        Runs the maintenance in a worker thread, then waits for the next run.
+        """
+        while True:
+            try:
+                report = await asyncio.to_thread(run_maintenance)
+                if any(any(changes.values()) for changes in report.values()):
+                    logger.info("Partition maintenance report=%s", report)
+            except Exception:
+                logger.exception("Partition maintenance failed")
+
+            await asyncio.sleep(self.interval)
+
+
+# Create a global instance of the maintenance job
+maintenance = MaintenanceJob()
+
+
+if __name__ == "__main__":
+    print(json.dumps(run_maintenance(), indent=2))
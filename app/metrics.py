@@ -0,0 +1,233 @@
+"""
+Prometheus metrics of the application, exposed in the text format on /metrics.
+
+HTTP requests are timed per route by MetricsMiddleware, which also counts the database
+queries each request runs and the time spent in them, from the cursor events of the
+engines. The WebSocket connections are counted and their queue depths read when the
+metrics are scraped, so the send path only updates the frame counters and the send
+latency histogram.
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable
+
+from decouple import config
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Collect the metrics and serve them on /metrics
+METRICS_ENABLED: bool = config("METRICS_ENABLED", default=True, cast=bool)
+
+# Label of the requests that matched no route, so unknown paths do not add series
+UNMATCHED_ROUTE: str = "<unmatched>"
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Duration of the HTTP requests.",
+    ["method", "route", "status"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Number of database queries run by an HTTP request.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time an HTTP request spent in database queries.",
+    ["method", "route"],
+)
+FRAMES_SENT = Counter(
+    "websocket_frames_sent_total",
+    "Frames sent to WebSocket clients.",
+    ["encoding"],
+)
+FRAMES_DROPPED = Counter(
+    "websocket_frames_dropped_total",
+    "Frames dropped because the send queue of a WebSocket client was full.",
+    ["policy"],
+)
+SEND_DURATION = Histogram(
+    "websocket_send_duration_seconds",
+    "Duration of a send to a WebSocket client.",
+    ["kind"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1, 5),
+)
+
+
+class QueryStats:
+    """
+    The database queries run while handling one request.
+    """
+
+    __slots__ = ("count", "duration")
+
+    def __init__(self):
+        self.count: int = 0
+        self.duration: float = 0.0
+
+
+# Statistics of the request being handled, shared with the tasks it starts
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def get_client_label(client_id: str) -> str:
+    """
+    Args:
+        client_id (str): The client identifier.
+
+    Returns:
+        str: The label of the client in the metrics. Topic subscribers get a random
+            identifier per connection, so they share one label.
+    """
+    return "subscriber" if client_id.startswith("subscriber_") else client_id
+
+
+def get_client_kind(client_id: str) -> str:
+    """
+    Args:
+        client_id (str): The client identifier.
+
+    Returns:
+        str: The kind of the client, subscriber, gui or machine. Unlike the identifier
+            it is chosen by the server, so it bounds the series of a metric.
+    """
+
+    if client_id.startswith("subscriber_"):
+        return "subscriber"
+    if client_id.startswith("gui_"):
+        return "gui"
+
+    return "machine"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if query_stats.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats: QueryStats | None = query_stats.get()
+    if stats is not None and conn.info.get("query_start"):
+        stats.count += 1
+        stats.duration += time.perf_counter() - conn.info["query_start"].pop()
+
+
+def _handle_error(exception_context) -> None:
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Counts and times the queries an engine runs on behalf of a request.
+
+    Args:
+        engine (Engine): The engine, the sync_engine of an async engine.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """
+    Times the HTTP requests per route, with the number of database queries they run
+    and the time spent in them.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = query_stats.set(stats)
+        status: list[int] = [500]
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        started: float = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration: float = time.perf_counter() - started
+            query_stats.reset(token)
+
+            route = scope.get("route")
+            labels: tuple[str, str] = (
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+            )
+            REQUEST_DURATION.labels(*labels, str(status[0])).observe(duration)
+            REQUEST_DB_QUERIES.labels(*labels).observe(stats.count)
+            REQUEST_DB_DURATION.labels(*labels).observe(stats.duration)
+
+
+class ConnectionCollector(Collector):
+    """
+    Reads the WebSocket connections and their send queues when the metrics are scraped.
+    """
+
+    def __init__(self, get_connections: Callable[[], dict[str, list[Any]]]):
+        self.get_connections = get_connections
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        connections = GaugeMetricFamily(
+            "websocket_connections",
+            "Open WebSocket connections.",
+            labels=["client"],
+        )
+        queue_depth = GaugeMetricFamily(
+            "websocket_queue_depth",
+            "Frames queued for WebSocket clients, the maximum over the connections.",
+            labels=["client"],
+        )
+        subscriptions = GaugeMetricFamily(
+            "websocket_subscriptions",
+            "Topic subscriptions of the WebSocket connections.",
+            labels=["client"],
+        )
+
+        per_client: dict[str, list[int]] = {}
+        for client_id, client_connections in list(self.get_connections().items()):
+            totals = per_client.setdefault(get_client_label(client_id), [0, 0, 0])
+            for connection in client_connections:
+                totals[0] += 1
+                totals[1] = max(totals[1], connection.queue.qsize())
+                totals[2] += len(connection.topics)
+
+        for client, (count, depth, topics) in per_client.items():
+            connections.add_metric([client], count)
+            queue_depth.add_metric([client], depth)
+            subscriptions.add_metric([client], topics)
+
+        yield connections
+        yield queue_depth
+        yield subscriptions
+
+
+def get_metrics() -> tuple[bytes, str]:
+    """
+    Returns:
+        tuple[bytes, str]: The metrics in the Prometheus text format, and its content type.
+    """
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -1,19 +1,27 @@
 from app.models.temperature_logs import TemperatureLog
 from app.models.humidity_logs import HumidityLog
+from app.models.temperature_rollups import TemperatureRollup
+from app.models.humidity_rollups import HumidityRollup
 from app.models.oven_logs import OvenLog
 from app.models.oven_batches import OvenBatch
+from app.models.oven_batch_summaries import OvenBatchSummary
 from app.models.machines import Machine
 from app.models.press_batches import PressBatch
 from app.models.press_logs import PressLog
+from app.models.press_distance_logs import PressDistanceLog
 from app.models.temperature_profiles import TemperatureProfile
 
 __all__ = [
     "TemperatureLog",
     "HumidityLog",
+    "TemperatureRollup",
+    "HumidityRollup",
     "OvenLog",
     "OvenBatch",
+    "OvenBatchSummary",
     "Machine",
     "PressBatch",
     "PressLog",
+    "PressDistanceLog",
     "TemperatureProfile",
 ]
@@ -1,5 +1,7 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, ForeignKey, Index
+from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models.utc_datetime import UTCDateTime
 
 from datetime import datetime, timezone
 
@@ -20,9 +22,16 @@ class HumidityLog(Base):
     """
 
     __tablename__ = "humidity_logs"
+    __table_args__ = (
+        Index("ix_humidity_logs_machine_id_created_at", "machine_id", "created_at"),
+        Index("ix_humidity_logs_batch_id_created_at", "batch_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True)
     humidity = Column(Float, nullable=False)
-    created_at = Column(DateTime, default=lambda: datetime.now(tz=timezone.utc))
+    created_at = Column(UTCDateTime, default=lambda: datetime.now(tz=timezone.utc))
     machine_id = Column(Integer, ForeignKey("machines.id"))
     batch_id = Column(Integer, ForeignKey("oven_batches.id"))
+
+    machine = relationship("Machine", back_populates="humidity_logs")
+    oven_batch = relationship("OvenBatch", back_populates="humidity_logs")
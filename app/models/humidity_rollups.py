@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, Enum
+from app.database import Base
+from app.models.utc_datetime import UTCDateTime
+from app.utils.resolution_enum import BucketResolution
+
+
+class HumidityRollup(Base):
+    """
+    Represents the humidity_rollups table, the humidity logs of each machine
+    pre-aggregated per second, minute and hour. Maintained on insert by app.crud.rollups.
+
+    Attributes:
+        machine_id (int): The machine identifier.
+        resolution (BucketResolution): The resolution of the bucket.
+        bucket_start (datetime): The start of the bucket.
+        min_humidity (float): The lowest humidity in the bucket.
+        max_humidity (float): The highest humidity in the bucket.
+        sum_humidity (float): The sum of the humidity readings in the bucket.
+        count (int): The number of humidity logs in the bucket.
+
+    Table Name:
+        humidity_rollups
+    """
+
+    __tablename__ = "humidity_rollups"
+
+    machine_id = Column(
+        Integer, ForeignKey("machines.id", ondelete="CASCADE"), primary_key=True
+    )
+    resolution = Column(
+        Enum(BucketResolution, name="bucket_resolution_enum"), primary_key=True
+    )
+    bucket_start = Column(UTCDateTime, primary_key=True)
+
+    min_humidity = Column(Float, nullable=False)
+    max_humidity = Column(Float, nullable=False)
+    sum_humidity = Column(Float, nullable=False)
+    count = Column(Integer, nullable=False)
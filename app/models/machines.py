@@ -42,6 +42,8 @@ class Machine(Base):
 
     oven_logs = relationship("OvenLog", back_populates="machine")
     press_logs = relationship("PressLog", back_populates="machine")
+    press_distance_logs = relationship("PressDistanceLog", back_populates="machine")
 
     oven_batches = relationship("OvenBatch", back_populates="machine")
     temperature_logs = relationship("TemperatureLog", back_populates="machine")
+    humidity_logs = relationship("HumidityLog", back_populates="machine")
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+
+class OvenBatchSummary(Base):
+    """
+    Represents the oven_batch_summaries table, computed once when a batch completes.
+
+    Attributes:
+        batch_id (int): The primary key of the table, the oven batch identifier.
+        profile_id (int | None): The temperature profile active when the batch completed.
+        desired_temp (float | None): The desired temperature of the profile.
+        max_temp (float | None): The maximum temperature of the profile.
+        band_tolerance (float): The allowed deviation from the desired temperature.
+        reading_count (int): The number of temperature readings in the batch.
+        peak_temperature (float | None): The highest temperature reading.
+        mean_temperature (float | None): The mean temperature reading.
+        time_in_band_sec (float | None): The time spent within the band around the desired temperature.
+        time_over_max_sec (float | None): The time spent above the maximum temperature.
+        peak_overshoot (float | None): The largest excess of a reading over the maximum temperature.
+        duration_sec (float): The duration of the batch.
+
+    Table Name:
+        oven_batch_summaries
+    """
+
+    __tablename__ = "oven_batch_summaries"
+
+    batch_id = Column(
+        Integer, ForeignKey("oven_batches.id", ondelete="CASCADE"), primary_key=True
+    )
+    profile_id = Column(
+        Integer, ForeignKey("temperature_profiles.id", ondelete="SET NULL")
+    )
+
+    desired_temp = Column(Float)
+    max_temp = Column(Float)
+    band_tolerance = Column(Float, nullable=False)
+
+    reading_count = Column(Integer, nullable=False)
+    peak_temperature = Column(Float)
+    mean_temperature = Column(Float)
+    time_in_band_sec = Column(Float)
+    time_over_max_sec = Column(Float)
+    peak_overshoot = Column(Float)
+    duration_sec = Column(Float, nullable=False)
+
+    oven_batch = relationship("OvenBatch", back_populates="summary")
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, Integer, Enum, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models.utc_datetime import UTCDateTime
 from app.utils.state_enum import BatchState
 
 
@@ -20,13 +21,35 @@ class OvenBatch(Base):
     """
 
     __tablename__ = "oven_batches"
+    __table_args__ = (
+        Index("ix_oven_batches_machine_id_state", "machine_id", "state"),
+        Index("ix_oven_batches_machine_id_start_time", "machine_id", "start_time"),
+        # At most one active batch per machine, even under concurrent start commands
+        Index(
+            "ux_oven_batches_machine_id_active",
+            "machine_id",
+            unique=True,
+            postgresql_where=text("state = 'ACTIVE'"),
+            sqlite_where=text("state = 'ACTIVE'"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
-    start_time = Column(DateTime, nullable=False)
-    stop_time = Column(DateTime)
+    start_time = Column(UTCDateTime, nullable=False)
+    stop_time = Column(UTCDateTime)
     state = Column(Enum(BatchState, name="batch_state_enum"), nullable=False)
     machine_id = Column(Integer, ForeignKey("machines.id"))
 
     oven_logs = relationship("OvenLog", back_populates="oven_batch")
     temperature_logs = relationship("TemperatureLog", back_populates="oven_batch")
+    humidity_logs = relationship("HumidityLog", back_populates="oven_batch")
     machine = relationship("Machine", back_populates="oven_batches")
+
+    # Loaded with the batch, so that batch listings never touch the temperature logs
+    summary = relationship(
+        "OvenBatchSummary",
+        back_populates="oven_batch",
+        uselist=False,
+        lazy="selectin",
+        passive_deletes=True,
+    )
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.database import Base
+from app.models.utc_datetime import UTCDateTime
 from app.utils.logs_enums import OvenLogType
 
 
@@ -21,12 +22,16 @@ class OvenLog(Base):
     """
 
     __tablename__ = "oven_logs"
+    __table_args__ = (
+        Index("ix_oven_logs_machine_id_created_at", "machine_id", "created_at"),
+        Index("ix_oven_logs_batch_id_created_at", "batch_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True)
     batch_id = Column(Integer, ForeignKey("oven_batches.id"), nullable=True)
     machine_id = Column(Integer, ForeignKey("machines.id"), nullable=False)
     type = Column(Enum(OvenLogType, name="oven_log_type_enum"), nullable=False)
-    created_at = Column(DateTime, default=lambda: datetime.now(tz=timezone.utc))
+    created_at = Column(UTCDateTime, default=lambda: datetime.now(tz=timezone.utc))
 
     oven_batch = relationship("OvenBatch", back_populates="oven_logs")
     machine = relationship("Machine", back_populates="oven_logs")
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, ForeignKey, Enum, Index, text
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models.utc_datetime import UTCDateTime
 from app.utils.state_enum import BatchState
 
 
@@ -20,10 +21,23 @@ class PressBatch(Base):
     """
 
     __tablename__ = "press_batches"
+    __table_args__ = (
+        Index("ix_press_batches_machine_id_state", "machine_id", "state"),
+        Index("ix_press_batches_machine_id_start_time", "machine_id", "start_time"),
+        # At most one active batch per machine, even under concurrent start commands
+        Index(
+            "ux_press_batches_machine_id_active",
+            "machine_id",
+            unique=True,
+            postgresql_where=text("state = 'ACTIVE'"),
+            sqlite_where=text("state = 'ACTIVE'"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
-    start_time = Column(DateTime, nullable=False)
-    stop_time = Column(DateTime)
+    start_time = Column(UTCDateTime, nullable=False)
+    stop_time = Column(UTCDateTime)
     state = Column(Enum(BatchState, name="batch_state_enum"), nullable=False)
     machine_id = Column(Integer, ForeignKey("machines.id"))
     press_logs = relationship("PressLog", back_populates="press_batch")
+    press_distance_logs = relationship("PressDistanceLog", back_populates="press_batch")
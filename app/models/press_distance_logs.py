@@ -0,0 +1,38 @@
+from sqlalchemy import BigInteger, Column, Integer, REAL, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from app.database import Base
+from app.models.utc_datetime import UTCDateTime
+
+
+class PressDistanceLog(Base):
+    """
+    Represents the press_distance_logs table, the position time series of the press.
+    Rows are kept narrow (a 4-byte distance) since a stroke is sampled at high frequency.
+
+    Attributes:
+        id (int): The primary key of the table.
+        distance (float): The position of the press.
+        created_at (datetime): The timestamp when the position was measured.
+        machine_id (int): The machine id.
+        batch_id (int | None): The press batch id.
+
+    Table Name:
+        press_distance_logs
+    """
+
+    __tablename__ = "press_distance_logs"
+    __table_args__ = (
+        Index(
+            "ix_press_distance_logs_machine_id_created_at", "machine_id", "created_at"
+        ),
+        Index("ix_press_distance_logs_batch_id_created_at", "batch_id", "created_at"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    distance = Column(REAL, nullable=False)
+    created_at = Column(UTCDateTime, nullable=False)
+    machine_id = Column(Integer, ForeignKey("machines.id"), nullable=False)
+    batch_id = Column(Integer, ForeignKey("press_batches.id"))
+
+    machine = relationship("Machine", back_populates="press_distance_logs")
+    press_batch = relationship("PressBatch", back_populates="press_distance_logs")
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, ForeignKey, Enum, Index
 from app.database import Base
+from app.models.utc_datetime import UTCDateTime
 from sqlalchemy.orm import relationship
 
 from datetime import datetime, timezone
@@ -22,12 +23,16 @@ class PressLog(Base):
     """
 
     __tablename__ = "press_logs"
+    __table_args__ = (
+        Index("ix_press_logs_machine_id_created_at", "machine_id", "created_at"),
+        Index("ix_press_logs_batch_id_created_at", "batch_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True)
     batch_id = Column(Integer, ForeignKey("press_batches.id"), nullable=True)
     machine_id = Column(Integer, ForeignKey("machines.id"), nullable=False)
     type = Column(Enum(PressLogType, name="press_log_type_enum"), nullable=False)
-    created_at = Column(DateTime, default=lambda: datetime.now(tz=timezone.utc))
+    created_at = Column(UTCDateTime, default=lambda: datetime.now(tz=timezone.utc))
 
     press_batch = relationship("PressBatch", back_populates="press_logs")
     machine = relationship("Machine", back_populates="press_logs")
@@ -1,6 +1,7 @@
 from app.database import Base
+from app.models.utc_datetime import UTCDateTime
 
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 
@@ -19,10 +20,14 @@ class TemperatureLog(Base):
     """
 
     __tablename__ = "temperature_logs"
+    __table_args__ = (
+        Index("ix_temperature_logs_machine_id_created_at", "machine_id", "created_at"),
+        Index("ix_temperature_logs_batch_id_created_at", "batch_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     temperature = Column(Float, nullable=False)
-    created_at = Column(DateTime, default=lambda: datetime.now(tz=timezone.utc))
+    created_at = Column(UTCDateTime, default=lambda: datetime.now(tz=timezone.utc))
     machine_id = Column(Integer, ForeignKey("machines.id"))
     batch_id = Column(Integer, ForeignKey("oven_batches.id"))
 
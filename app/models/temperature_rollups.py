@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, Enum
+from app.database import Base
+from app.models.utc_datetime import UTCDateTime
+from app.utils.resolution_enum import BucketResolution
+
+
+class TemperatureRollup(Base):
+    """
+    Represents the temperature_rollups table, the temperature logs of each machine
+    pre-aggregated per second, minute and hour. Maintained on insert by app.crud.rollups.
+
+    Attributes:
+        machine_id (int): The machine identifier.
+        resolution (BucketResolution): The resolution of the bucket.
+        bucket_start (datetime): The start of the bucket.
+        min_temperature (float): The lowest temperature in the bucket.
+        max_temperature (float): The highest temperature in the bucket.
+        sum_temperature (float): The sum of the temperatures in the bucket.
+        count (int): The number of temperature logs in the bucket.
+
+    Table Name:
+        temperature_rollups
+    """
+
+    __tablename__ = "temperature_rollups"
+
+    machine_id = Column(
+        Integer, ForeignKey("machines.id", ondelete="CASCADE"), primary_key=True
+    )
+    resolution = Column(
+        Enum(BucketResolution, name="bucket_resolution_enum"), primary_key=True
+    )
+    bucket_start = Column(UTCDateTime, primary_key=True)
+
+    min_temperature = Column(Float, nullable=False)
+    max_temperature = Column(Float, nullable=False)
+    sum_temperature = Column(Float, nullable=False)
+    count = Column(Integer, nullable=False)
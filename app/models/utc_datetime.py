@@ -0,0 +1,39 @@
+from sqlalchemy import DateTime
+from sqlalchemy.types import TypeDecorator
+
+from datetime import datetime, timezone
+
+
+def as_naive_utc(value: datetime) -> datetime:
+    """
+    Converts a timestamp to naive UTC, the form in which timestamps are stored.
+
+    Args:
+        value (datetime): The timestamp, naive timestamps are assumed to be in UTC.
+
+    Returns:
+        datetime: The naive UTC timestamp.
+    """
+
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return value
+
+
+class UTCDateTime(TypeDecorator):
+    """
+    Represents a timestamp stored in UTC in a column without time zone.
+
+    Timezone-aware values are converted to UTC and made naive before they are bound,
+    since asyncpg rejects aware values for TIMESTAMP WITHOUT TIME ZONE columns.
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value: datetime | None, dialect) -> datetime | None:
+        if value is not None:
+            value = as_naive_utc(value)
+
+        return value
@@ -0,0 +1,298 @@
+"""
+Opt-in SQL profiling of the HTTP requests (SQL_PROFILING).
+
+ProfilingMiddleware records every statement a request runs, with its duration and row
+count, from the cursor events of the engines. The totals are returned in a
+Server-Timing header, so they show in the network panel of the browser, and the recent
+requests and the query budget of each route are served on /debug/sql.
+
+A statement run SQL_REPEAT_THRESHOLD times or more in one request, e.g. a lookup per
+item of a list (the N+1 pattern), is flagged in the profile, in the header and in the
+log. Statements are compared with their bind parameters collapsed, so the same query
+for different values or IN lists of different lengths counts as a repeat.
+"""
+
+import logging
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from decouple import config
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Record the statements of every request, and serve /debug/sql
+SQL_PROFILING: bool = config("SQL_PROFILING", default=False, cast=bool)
+# Number of runs of one statement in a request flagged as a repeated statement
+SQL_REPEAT_THRESHOLD: int = config("SQL_REPEAT_THRESHOLD", default=3, cast=int)
+# Number of recent request profiles kept for /debug/sql
+SQL_PROFILE_HISTORY: int = config("SQL_PROFILE_HISTORY", default=200, cast=int)
+
+# Bind parameter of asyncpg with the cast SQLAlchemy renders ($1::INTEGER), or of
+# psycopg2 (%(name)s)
+BIND_PARAMETER: str = (
+    r"(?:\$\d+(?:::\w+(?: WITH(?:OUT)? TIME ZONE)?(?:\[\])?)?|%\(\w+\)s)"
+)
+# A bind parameter, or a list of them
+BIND_PARAMETERS = re.compile(rf"{BIND_PARAMETER}(?:\s*,\s*{BIND_PARAMETER})*")
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Args:
+        statement (str): The SQL statement as sent to the driver.
+
+    Returns:
+        str: The statement on one line, with every bind parameter or list of bind
+            parameters replaced by ?, including the cast of an asyncpg parameter.
+    """
+    return BIND_PARAMETERS.sub("?", WHITESPACE.sub(" ", statement).strip())
+
+
+class RequestProfile:
+    """
+    The statements run while handling one request.
+    """
+
+    __slots__ = ("method", "route", "path", "started_at", "duration", "statements")
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.route: str | None = None
+        self.path = path
+        self.started_at: float = time.time()
+        self.duration: float = 0.0
+        # (statement, duration in seconds, row count) in execution order
+        self.statements: list[tuple[str, float, int]] = []
+
+    @property
+    def db_duration(self) -> float:
+        """
+        Returns:
+            float: The time spent in the statements, in seconds.
+        """
+        return sum(duration for _, duration, _ in self.statements)
+
+    def get_repeated(self, threshold: int = SQL_REPEAT_THRESHOLD) -> dict[str, int]:
+        """
+        Args:
+            threshold (int): The number of runs from which a statement is flagged.
+
+        Returns:
+            dict[str, int]: The normalized statements run at least threshold times, with
+                their number of runs.
+        """
+
+        counts: dict[str, int] = {}
+        for statement, _, _ in self.statements:
+            normalized: str = normalize_statement(statement)
+            counts[normalized] = counts.get(normalized, 0) + 1
+
+        return {
+            statement: count
+            for statement, count in counts.items()
+            if count >= threshold
+        }
+
+    def server_timing(self, repeated: dict[str, int]) -> str:
+        """
+        Args:
+            repeated (dict[str, int]): The repeated statements, see get_repeated.
+
+        Returns:
+            str: The value of the Server-Timing header.
+        """
+
+        timings: list[str] = [
+            f'db;dur={self.db_duration * 1000:.2f};desc="{len(self.statements)} queries"'
+        ]
+        if repeated:
+            timings.append(
+                f'db-repeated;desc="{len(repeated)} statements run {max(repeated.values())}x"'
+            )
+
+        return ", ".join(timings)
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            dict: The profile, as served on /debug/sql.
+        """
+        return {
+            "method": self.method,
+            "route": self.route,
+            "path": self.path,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 3),
+            "db_duration_ms": round(self.db_duration * 1000, 3),
+            "query_count": len(self.statements),
+            "repeated": self.get_repeated(),
+            "statements": [
+                {
+                    "statement": statement,
+                    "duration_ms": round(duration * 1000, 3),
+                    "rows": rows,
+                }
+                for statement, duration, rows in self.statements
+            ],
+        }
+
+
+# Profile of the request being handled, shared with the tasks it starts
+request_profile: ContextVar[RequestProfile | None] = ContextVar(
+    "request_profile", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if request_profile.get() is not None:
+        conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile: RequestProfile | None = request_profile.get()
+    if profile is None or not conn.info.get("profile_start"):
+        return
+
+    duration: float = time.perf_counter() - conn.info["profile_start"].pop()
+    rows: int = cursor.rowcount
+    if executemany and rows < 0:
+        rows = len(parameters)
+
+    profile.statements.append((statement, duration, rows))
+
+
+def _handle_error(exception_context) -> None:
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("profile_start"):
+        connection.info["profile_start"].pop()
+
+
+def profile_engine(engine: Engine) -> None:
+    """
+    Records the statements an engine runs on behalf of a profiled request.
+
+    Args:
+        engine (Engine): The engine, the sync_engine of an async engine.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class SQLProfiler:
+    """
+    Keeps the profiles of the recent requests and the query budget of each route.
+    """
+
+    def __init__(self, history: int = SQL_PROFILE_HISTORY):
+        self.profiles: deque[RequestProfile] = deque(maxlen=history)
+        # Requests, total and maximum queries, and maximum database time per route
+        self.routes: dict[str, dict[str, float]] = {}
+
+    def record(self, profile: RequestProfile) -> None:
+        """
+        Stores the profile of a finished request.
+
+        Args:
+            profile (RequestProfile): The profile.
+        """
+
+        self.profiles.append(profile)
+
+        budget = self.routes.setdefault(
+            f"{profile.method} {profile.route}",
+            {"requests": 0, "queries": 0, "max_queries": 0, "max_db_ms": 0.0},
+        )
+        budget["requests"] += 1
+        budget["queries"] += len(profile.statements)
+        budget["max_queries"] = max(budget["max_queries"], len(profile.statements))
+        budget["max_db_ms"] = max(budget["max_db_ms"], profile.db_duration * 1000)
+
+    def report(self, route: str | None = None, limit: int = 20) -> dict:
+        """
+        Args:
+            route (str | None): Only report the requests of this route template.
+            limit (int): The maximum number of recent requests reported.
+
+        Returns:
+            dict: The query budget per route and the most recent request profiles.
+        """
+
+        profiles: list[RequestProfile] = [
+            profile
+            for profile in reversed(self.profiles)
+            if route is None or profile.route == route
+        ][:limit]
+
+        return {
+            "routes": {
+                key: {
+                    "requests": budget["requests"],
+                    "mean_queries": round(budget["queries"] / budget["requests"], 2),
+                    "max_queries": budget["max_queries"],
+                    "max_db_ms": round(budget["max_db_ms"], 3),
+                }
+                for key, budget in sorted(self.routes.items())
+            },
+            "requests": [profile.to_dict() for profile in profiles],
+        }
+
+
+class ProfilingMiddleware:
+    """
+    Profiles the SQL statements of every HTTP request, see SQLProfiler.
+    """
+
+    def __init__(self, app: ASGIApp, profiler: SQLProfiler | None = None):
+        self.app = app
+        self.profiler = profiler or sql_profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith("/debug/sql"):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        token = request_profile.set(profile)
+        started: float = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # The statements run while the body is streamed are only in /debug/sql
+                headers = MutableHeaders(scope=message)
+                timing: str = profile.server_timing(profile.get_repeated())
+                headers.append(
+                    "Server-Timing",
+                    f"{timing}, app;dur={(time.perf_counter() - started) * 1000:.2f}",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_profile.reset(token)
+            profile.duration = time.perf_counter() - started
+            profile.route = getattr(scope.get("route"), "path", None)
+
+            repeated: dict[str, int] = profile.get_repeated()
+            for statement, count in repeated.items():
+                logger.warning(
+                    "Repeated statement method=%s route=%s count=%d statement=%s",
+                    profile.method,
+                    profile.route,
+                    count,
+                    statement,
+                )
+
+            self.profiler.record(profile)
+
+
+# Create a global instance of the SQL profiler
+sql_profiler = SQLProfiler()
@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from app.utils.http_messages import HTTPMessages
+from app.utils.copy_enums import CopyFormat, LogTable
+
+from app.schemas import (
+    Response,
+    LogImportResult,
+)
+
+from app.bulk_copy import import_stream, is_copy_supported, stream_export
+
+from datetime import datetime
+
+router = APIRouter()
+
+# Media type of the exported data per COPY format
+EXPORT_MEDIA_TYPES: dict[CopyFormat, str] = {
+    CopyFormat.CSV: "text/csv",
+    CopyFormat.BINARY: "application/octet-stream",
+}
+
+
+@router.get("/logs/export/{table}", response_model=None, tags=["Logs - Bulk"])
+async def export_logs_route(
+    table: LogTable,
+    format: CopyFormat = CopyFormat.CSV,
+    machine_id: int | None = None,
+    batch_id: int | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> StreamingResponse | Response:
+    """
+    Streams the logs of a table with COPY ... TO STDOUT, oldest first. The logs are sent
+    as they are read, so exporting a large table does not load it into memory.
+
+    Args:
+        table (LogTable): The log table.
+        format (CopyFormat): The format of the data, csv (with a header) or binary.
+        machine_id (int | None): Only export the logs of this machine.
+        batch_id (int | None): Only export the logs of this batch.
+        since (datetime | None): Only export logs created from this time onwards.
+        until (datetime | None): Only export logs created before this time.
+
+    Returns:
+        StreamingResponse | Response: The exported logs, or the error response.
+    """
+
+    if not is_copy_supported():
+        return Response(success=False, msg=HTTPMessages.COPY_NOT_SUPPORTED, data=[])
+
+    return StreamingResponse(
+        stream_export(table, format, machine_id, batch_id, since, until),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{table.value}.{format.value}"'
+        },
+    )
+
+
+@router.post("/logs/import/{table}", response_model=Response, tags=["Logs - Bulk"])
+async def import_logs_route(
+    table: LogTable,
+    request: Request,
+    format: CopyFormat = CopyFormat.CSV,
+) -> Response:
+    """
+    Imports logs into a table with COPY ... FROM STDIN, from the raw request body. The body
+    has the columns of an export, so an export can be imported as is. The body is passed
+    on as it arrives and the import is a single transaction.
+
+    Args:
+        table (LogTable): The log table.
+        request (Request): The request, whose body holds the data.
+        format (CopyFormat): The format of the data, csv (with a header) or binary.
+
+    Returns:
+        Response: The response containing the number of imported rows.
+    """
+
+    if not is_copy_supported():
+        return Response(success=False, msg=HTTPMessages.COPY_NOT_SUPPORTED, data=[])
+
+    try:
+        rows: int = await import_stream(request.stream(), table, format)
+    except Exception:
+        return Response(success=False, msg=HTTPMessages.LOGS_IMPORT_FAILED, data=[])
+
+    return Response(
+        success=True,
+        msg=HTTPMessages.LOGS_IMPORTED,
+        data=[LogImportResult(table=table, format=format, rows=rows)],
+    )
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dependencies import get_db
 from app.utils.http_messages import HTTPMessages
@@ -26,22 +26,22 @@ router = APIRouter()
 
 
 @router.post("/machines", response_model=Response, tags=["Machines"])
-def create_machine_route(
+async def create_machine_route(
     machine: MachineCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Creates a machine.
 
     Args:
         machine (MachineCreate): The machine to be created.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the created machine.
     """
 
-    new_machine: MachineCreate = create_machine(db, machine)
+    new_machine: MachineCreate = await create_machine(db, machine)
 
     return Response(
         success=True,
@@ -51,22 +51,22 @@ def create_machine_route(
 
 
 @router.get("/machine/{machine_id}", response_model=Response, tags=["Machines"])
-def get_machine_route(
+async def get_machine_route(
     machine_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Retrieves a machine.
 
     Args:
         machine_id (int): The machine ID.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the retrieved machine.
     """
 
-    machine: Machine = get_machine(db, machine_id)
+    machine: Machine = await get_machine(db, machine_id)
 
     return Response(
         success=True,
@@ -76,20 +76,20 @@ def get_machine_route(
 
 
 @router.get("/machines", response_model=Response, tags=["Machines"])
-def get_machines_route(
-    db: Session = Depends(get_db),
+async def get_machines_route(
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Retrieves all the machines.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the list of machines.
     """
 
-    machines: list[Machine] = get_machines(db, limit=None)
+    machines: list[Machine] = await get_machines(db, limit=None)
 
     return Response(
         success=True,
@@ -99,10 +99,10 @@ def get_machines_route(
 
 
 @router.put("/machine/{machine_id}", response_model=Response, tags=["Machines"])
-def update_machine_route(
+async def update_machine_route(
     machine_id: int,
     machine: MachineUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Updates a machine.
@@ -110,13 +110,13 @@ def update_machine_route(
     Args:
         machine_id (int): The machine ID.
         machine (MachineUpdate): The machine details to be updated.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the updated machine.
     """
 
-    updated_machine: Machine = update_machine(db, machine_id, machine)
+    updated_machine: Machine = await update_machine(db, machine_id, machine)
 
     return Response(
         success=True,
@@ -126,22 +126,22 @@ def update_machine_route(
 
 
 @router.delete("/machine/{machine_id}", response_model=Response, tags=["Machines"])
-def delete_machine_route(
+async def delete_machine_route(
     machine_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Deletes a machine.
 
     Args:
         machine_id (int): The machine ID.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the deleted machine.
     """
 
-    deleted_machine: Machine = delete_machine(db, machine_id)
+    deleted_machine: Machine = await delete_machine(db, machine_id)
 
     return Response(
         success=True,
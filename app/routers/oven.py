@@ -1,20 +1,34 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+import logging
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.websocket import manager as WebSocketManager
 from app.dependencies import get_db
 from app.utils.http_messages import HTTPMessages
+from app.utils.responses import ORJSONResponse, build_response, dump_rows
 from app.utils.message_identifiers import MessageIdentifiers
 from app.utils.state_enum import BatchState
 from app.utils.logs_enums import OvenLogType
+from app.utils.resolution_enum import BucketResolution
+from app.utils.stream_enums import StreamFormat
+from app.utils.streaming import STREAM_MEDIA_TYPES, encode_stream
 
 from app.schemas import (
     Response,
-    OvenBatchCreate,
-    OvenBatch,
+    PaginatedResponse,
+    OvenBatchWithSummary,
     TemperatureLogBase,
     TemperatureLogCreate,
     TemperatureLog,
+    TemperatureReading,
+    TemperatureLogAggregate,
+    TemperatureBucket,
+    HumidityLogBase,
+    HumidityLog,
+    HumidityReading,
+    HumidityLogAggregate,
+    HumidityBucket,
     OvenLogCreate,
     OvenLog,
     OvenLogExpanded,
@@ -25,14 +39,27 @@ from app.schemas import (
 )
 
 from app.crud.oven import (
-    create_oven_batch,
+    start_oven_batch,
+    create_log as create_oven_log,
     get_latest_oven_batch_for_machine,
     get_oven_batches_for_machine,
     stop_active_oven_batch,
     create_temperature_log,
     get_temperature_logs_for_batch,
     get_temperature_logs_for_machine,
-    create_log,
+    get_temperature_buckets_for_batch,
+    get_temperature_buckets_for_machine,
+    get_downsampled_temperature_logs_for_batch,
+    get_downsampled_temperature_logs_for_machine,
+    stream_temperature_logs_for_batch,
+    stream_temperature_logs_for_machine,
+    TEMPERATURE_LOG_COLUMNS,
+    get_humidity_logs_for_batch,
+    get_humidity_logs_for_machine,
+    get_humidity_buckets_for_batch,
+    get_humidity_buckets_for_machine,
+    get_downsampled_humidity_logs_for_batch,
+    get_downsampled_humidity_logs_for_machine,
     get_logs_for_machine,
     create_temperature_profile,
     get_temperature_profiles_for_machine,
@@ -40,13 +67,24 @@ from app.crud.oven import (
     get_active_temperature_profile_for_machine,
 )
 
+from app.ingestion import (
+    ingest_temperature_readings,
+    ingest_humidity_readings,
+    ingest_oven_log,
+    push_oven_log,
+)
+
+from app.crud.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, get_next_cursor
+from app.crud.timeseries import DEFAULT_BUCKETS, MAX_BUCKETS
+
 from app.crud.machines import (
     set_machine_active_temperature_profile,
 )
 
-from datetime import datetime, timezone
+from datetime import datetime
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 GROUP_1_ID: int = 8
 
@@ -54,14 +92,14 @@ GROUP_1_ID: int = 8
 @router.get("/oven/request_start/{machine_id}", response_model=Response, tags=["Oven"])
 async def request_start_oven(
     machine_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Requests to start the oven.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the oven status.
@@ -82,14 +120,14 @@ async def request_start_oven(
 @router.get("/oven/request_stop/{machine_id}", response_model=Response, tags=["Oven"])
 async def request_stop_oven(
     machine_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Requests to stop the oven.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the oven status.
@@ -110,40 +148,32 @@ async def request_stop_oven(
 @router.get("/oven/start/{machine_id}", response_model=Response, tags=["Oven"])
 async def start_oven(
     machine_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Starts the oven.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the oven status.
     """
 
-    stop_active_oven_batch(db, machine_id)
-
-    # Create oven batch
-    new_oven_batch = OvenBatchCreate(
-        start_time=datetime.now(tz=timezone.utc),
-        state=BatchState.ACTIVE,
-        machine_id=machine_id,
-    )
-
-    oven_batch: OvenBatchCreate = create_oven_batch(db, new_oven_batch)
+    # Stop the active oven batch, create the new one and log the start at once
+    oven_batch, log = await start_oven_batch(db, machine_id, OvenLogType.BAKE_BATCH)
 
     # MQTT
     try:
-        print("MQTT message sent to start oven.")
+        logger.info("MQTT message sent to start oven.")
         # Publish a message to the oven's MQTT topic to start the oven.
         # This is a placeholder for the actual implementation.
     except Exception:
         # Create log entry
         # Placeholder for the actual implementation.
 
-        stop_active_oven_batch(db, machine_id)
+        await stop_active_oven_batch(db, machine_id)
 
         return Response(success=False, msg=HTTPMessages.OVEN_START_FAILED, data=[])
 
@@ -160,8 +190,8 @@ async def start_oven(
             success=False, msg=HTTPMessages.WEBSOCKET_FAILURE_OVEN_COMMAND, data=[]
         )
 
-    # Create log entry
-    await create_log_route(machine_id, OvenLogType.BAKE_BATCH, None, db)
+    # Push the log entry
+    await push_oven_log(log)
 
     return Response(success=True, msg=HTTPMessages.OVEN_STARTED, data=[oven_batch])
 
@@ -169,14 +199,14 @@ async def start_oven(
 @router.get("/oven/stop/{machine_id}", response_model=Response, tags=["Oven"])
 async def stop_oven(
     machine_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Stops the oven.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the oven status.
@@ -184,7 +214,7 @@ async def stop_oven(
 
     # MQTT
     try:
-        print("MQTT message sent to stop oven.")
+        logger.info("MQTT message sent to stop oven.")
         # Publish a message to the oven's MQTT topic to stop the oven.
         # This is a placeholder for the actual implementation.
     except Exception:
@@ -193,8 +223,12 @@ async def stop_oven(
 
         return Response(success=False, msg=HTTPMessages.OVEN_STOP_FAILED, data=[])
 
-    # Stop the active oven batch
-    stop_active_oven_batch(db, machine_id)
+    # Stop the active oven batch and log the stop at once
+    log = await create_oven_log(
+        db,
+        OvenLogCreate(machine_id=machine_id, type=OvenLogType.STOP_BAKE, batch_id=None),
+        stop_batch=True,
+    )
 
     # Websocket
     try:
@@ -209,55 +243,79 @@ async def stop_oven(
             success=False, msg=HTTPMessages.WEBSOCKET_FAILURE_OVEN_COMMAND, data=[]
         )
 
-    # Create log entry
-    await create_log_route(machine_id, OvenLogType.STOP_BAKE, None, db)
+    # Push the log entry
+    await push_oven_log(log)
 
     return Response(success=True, msg=HTTPMessages.OVEN_STOPPED, data=[])
 
 
 @router.get("/oven/status/{machine_id}", response_model=Response, tags=["Oven"])
-def get_oven_status_route(
+async def get_oven_status_route(
     machine_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Retrieves the oven status.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the oven status.
     """
 
-    oven_batch: OvenBatch | None = get_latest_oven_batch_for_machine(db, machine_id)
+    oven_batch: OvenBatchWithSummary | None = await get_latest_oven_batch_for_machine(
+        db, machine_id
+    )
 
     return Response(
         success=True, msg=HTTPMessages.OVEN_STATUS_RETRIEVED, data=[oven_batch]
     )
 
 
-@router.get("/oven/batches/{machine_id}", response_model=Response, tags=["Oven"])
-def get_oven_batches_route(
+@router.get(
+    "/oven/batches/{machine_id}", response_model=PaginatedResponse, tags=["Oven"]
+)
+async def get_oven_batches_route(
     machine_id: int,
-    db: Session = Depends(get_db),
-) -> Response:
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+) -> PaginatedResponse:
     """
     Retrieves the oven batches for a machine.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        since (datetime | None): Only include batches started from this time onwards.
+        until (datetime | None): Only include batches started before this time.
+        after_id (int | None): The cursor returned as next_cursor by the previous page.
+        limit (int): The page size.
+        db (AsyncSession): The database session.
 
     Returns:
-        Response: The response containing the oven batches.
+        PaginatedResponse: The response containing the oven batches.
     """
 
-    oven_batches: list[OvenBatch] | None = get_oven_batches_for_machine(db, machine_id)
+    oven_batches: list[OvenBatchWithSummary] | None = (
+        await get_oven_batches_for_machine(
+            db,
+            machine_id,
+            since=since,
+            until=until,
+            after_id=after_id,
+            limit=limit,
+        )
+    )
 
-    return Response(
-        success=True, msg=HTTPMessages.OVEN_STATUS_RETRIEVED, data=oven_batches
+    return PaginatedResponse(
+        success=True,
+        msg=HTTPMessages.OVEN_STATUS_RETRIEVED,
+        data=oven_batches,
+        next_cursor=get_next_cursor(oven_batches, limit),
     )
 
 
@@ -269,7 +327,7 @@ def get_oven_batches_route(
 async def create_temperature_log_route(
     machine_id: int,
     temperature: float,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Creates a temperature log for the oven.
@@ -277,14 +335,16 @@ async def create_temperature_log_route(
     Args:
         machine_id (int): The machine identifier.
         temperature (float): The temperature value.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the log details.
     """
 
     # Get the machines latest batch
-    latest_batch: OvenBatch = get_latest_oven_batch_for_machine(db, machine_id)
+    latest_batch: OvenBatchWithSummary = await get_latest_oven_batch_for_machine(
+        db, machine_id
+    )
 
     # Check if a batch is active
     if latest_batch is None:
@@ -301,7 +361,7 @@ async def create_temperature_log_route(
         batch_id=batch_id,
     )
 
-    temperature_log: TemperatureLogBase = create_temperature_log(
+    temperature_log: TemperatureLogBase = await create_temperature_log(
         db, new_temperature_log
     )
 
@@ -324,61 +384,667 @@ async def create_temperature_log_route(
     )
 
 
+@router.post(
+    "/oven/logs/temperature",
+    response_model=Response,
+    tags=["Oven - Temperature"],
+)
+async def create_temperature_logs_route(
+    readings: list[TemperatureReading],
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Creates temperature logs for one or more ovens from a batch of timestamped readings.
+    The active batch is looked up once per machine, all readings are inserted in a single
+    transaction and one aggregated frame is pushed per machine.
+
+    Args:
+        readings (list[TemperatureReading]): The timestamped temperature readings.
+        db (AsyncSession): The database session.
+
+    Returns:
+        Response: The response containing the aggregated readings per machine.
+    """
+
+    aggregates: list[TemperatureLogAggregate] = await ingest_temperature_readings(
+        db, readings
+    )
+
+    return Response(
+        success=True,
+        msg=HTTPMessages.TEMPERATURE_LOGS_CREATED,
+        data=aggregates,
+    )
+
+
 @router.get(
     "/oven/logs/temperature/{machine_id}",
-    response_model=Response,
+    response_model=PaginatedResponse,
     tags=["Oven - Temperature"],
 )
-def get_temperature_logs_for_machine_route(
+async def get_temperature_logs_for_machine_route(
     machine_id: int,
-    db: Session = Depends(get_db),
-) -> Response:
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+) -> ORJSONResponse:
     """
     Retrieves the temperature logs for the oven based on the machine identifier.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        after_id (int | None): The cursor returned as next_cursor by the previous page.
+        limit (int): The page size.
+        db (AsyncSession): The database session.
 
     Returns:
-        Response: The response containing the temperature logs.
+        ORJSONResponse: The response containing the temperature logs.
     """
 
-    temperature_logs: list[TemperatureLog] = get_temperature_logs_for_machine(
-        db, machine_id
+    temperature_logs: list[TemperatureLog] = await get_temperature_logs_for_machine(
+        db,
+        machine_id,
+        since=since,
+        until=until,
+        after_id=after_id,
+        limit=limit,
     )
 
-    return Response(
-        success=True, msg=HTTPMessages.TEMPERATURE_LOGS_RETRIEVED, data=temperature_logs
+    return build_response(
+        HTTPMessages.TEMPERATURE_LOGS_RETRIEVED,
+        dump_rows(temperature_logs, TemperatureLog),
+        next_cursor=get_next_cursor(temperature_logs, limit),
     )
 
 
 @router.get(
     "/oven/logs/temperature/batch/{batch_id}",
-    response_model=Response,
+    response_model=PaginatedResponse,
     tags=["Oven - Temperature"],
 )
-def get_temperature_logs_for_batch_route(
+async def get_temperature_logs_for_batch_route(
     batch_id: int,
-    db: Session = Depends(get_db),
-) -> Response:
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+) -> ORJSONResponse:
     """
     Retrieves the temperature logs for the oven based on the batch identifier.
 
     Args:
         batch_id (int): The batch identifier.
-        db (Session): The database session.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        after_id (int | None): The cursor returned as next_cursor by the previous page.
+        limit (int): The page size.
+        db (AsyncSession): The database session.
+
+    Returns:
+        ORJSONResponse: The response containing the temperature logs.
+    """
+
+    temperature_logs: list[TemperatureLog] = await get_temperature_logs_for_batch(
+        db,
+        batch_id,
+        since=since,
+        until=until,
+        after_id=after_id,
+        limit=limit,
+    )
+
+    return build_response(
+        HTTPMessages.TEMPERATURE_LOGS_RETRIEVED,
+        dump_rows(temperature_logs, TemperatureLog),
+        next_cursor=get_next_cursor(temperature_logs, limit),
+    )
+
+
+@router.get(
+    "/oven/logs/temperature/{machine_id}/buckets",
+    response_model=Response,
+    tags=["Oven - Temperature"],
+)
+async def get_temperature_buckets_for_machine_route(
+    machine_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    resolution: BucketResolution | None = None,
+    buckets: int | None = Query(None, ge=1, le=MAX_BUCKETS),
+    db: AsyncSession = Depends(get_db),
+) -> ORJSONResponse | Response:
+    """
+    Retrieves the temperature logs for the oven based on the machine identifier, aggregated
+    into time buckets with the min, max, mean and count of each bucket.
+
+    Args:
+        machine_id (int): The machine identifier.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        resolution (BucketResolution | None): Aggregate per second, minute, hour or day.
+        buckets (int | None): Aggregate into this many equal-width buckets instead.
+        db (AsyncSession): The database session.
+
+    Returns:
+        ORJSONResponse | Response: The response containing the temperature buckets.
+    """
+
+    if resolution is not None and buckets is not None:
+        return Response(
+            success=False, msg=HTTPMessages.INVALID_BUCKET_PARAMETERS, data=[]
+        )
+
+    if resolution is None and buckets is None:
+        buckets = DEFAULT_BUCKETS
+
+    rows = await get_temperature_buckets_for_machine(
+        db,
+        machine_id,
+        since=since,
+        until=until,
+        resolution=resolution,
+        buckets=buckets,
+    )
+
+    return build_response(
+        HTTPMessages.TEMPERATURE_BUCKETS_RETRIEVED, dump_rows(rows, TemperatureBucket)
+    )
+
+
+@router.get(
+    "/oven/logs/temperature/batch/{batch_id}/buckets",
+    response_model=Response,
+    tags=["Oven - Temperature"],
+)
+async def get_temperature_buckets_for_batch_route(
+    batch_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    resolution: BucketResolution | None = None,
+    buckets: int | None = Query(None, ge=1, le=MAX_BUCKETS),
+    db: AsyncSession = Depends(get_db),
+) -> ORJSONResponse | Response:
+    """
+    Retrieves the temperature logs for the oven based on the batch identifier, aggregated
+    into time buckets with the min, max, mean and count of each bucket.
+
+    Args:
+        batch_id (int): The batch identifier.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        resolution (BucketResolution | None): Aggregate per second, minute, hour or day.
+        buckets (int | None): Aggregate into this many equal-width buckets instead.
+        db (AsyncSession): The database session.
+
+    Returns:
+        ORJSONResponse | Response: The response containing the temperature buckets.
+    """
+
+    if resolution is not None and buckets is not None:
+        return Response(
+            success=False, msg=HTTPMessages.INVALID_BUCKET_PARAMETERS, data=[]
+        )
+
+    if resolution is None and buckets is None:
+        buckets = DEFAULT_BUCKETS
+
+    rows = await get_temperature_buckets_for_batch(
+        db,
+        batch_id,
+        since=since,
+        until=until,
+        resolution=resolution,
+        buckets=buckets,
+    )
+
+    return build_response(
+        HTTPMessages.TEMPERATURE_BUCKETS_RETRIEVED, dump_rows(rows, TemperatureBucket)
+    )
+
+
+@router.get(
+    "/oven/logs/temperature/{machine_id}/downsampled",
+    response_model=Response,
+    tags=["Oven - Temperature"],
+)
+async def get_downsampled_temperature_logs_for_machine_route(
+    machine_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    points: int = Query(DEFAULT_BUCKETS, ge=3, le=MAX_BUCKETS),
+    db: AsyncSession = Depends(get_db),
+) -> ORJSONResponse:
+    """
+    Retrieves the temperature logs for the oven based on the machine identifier, downsampled
+    to at most the given number of points while keeping the shape of the series.
+
+    Args:
+        machine_id (int): The machine identifier.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        points (int): The maximum number of logs to return.
+        db (AsyncSession): The database session.
+
+    Returns:
+        ORJSONResponse: The response containing the temperature logs, oldest first.
+    """
+
+    rows = await get_downsampled_temperature_logs_for_machine(
+        db, machine_id, points, since=since, until=until
+    )
+
+    return build_response(
+        HTTPMessages.TEMPERATURE_LOGS_RETRIEVED, dump_rows(rows, TemperatureLogBase)
+    )
+
+
+@router.get(
+    "/oven/logs/temperature/batch/{batch_id}/downsampled",
+    response_model=Response,
+    tags=["Oven - Temperature"],
+)
+async def get_downsampled_temperature_logs_for_batch_route(
+    batch_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    points: int = Query(DEFAULT_BUCKETS, ge=3, le=MAX_BUCKETS),
+    db: AsyncSession = Depends(get_db),
+) -> ORJSONResponse:
+    """
+    Retrieves the temperature logs for the oven based on the batch identifier, downsampled
+    to at most the given number of points while keeping the shape of the series.
+
+    Args:
+        batch_id (int): The batch identifier.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        points (int): The maximum number of logs to return.
+        db (AsyncSession): The database session.
 
     Returns:
-        Response: The response containing the temperature logs.
+        ORJSONResponse: The response containing the temperature logs, oldest first.
     """
 
-    temperature_logs: list[TemperatureLog] = get_temperature_logs_for_batch(
-        db, batch_id
+    rows = await get_downsampled_temperature_logs_for_batch(
+        db, batch_id, points, since=since, until=until
+    )
+
+    return build_response(
+        HTTPMessages.TEMPERATURE_LOGS_RETRIEVED, dump_rows(rows, TemperatureLogBase)
+    )
+
+
+@router.get(
+    "/oven/logs/temperature/{machine_id}/stream",
+    response_model=None,
+    tags=["Oven - Temperature"],
+)
+async def stream_temperature_logs_for_machine_route(
+    machine_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    format: StreamFormat = StreamFormat.NDJSON,
+) -> StreamingResponse:
+    """
+    Streams the temperature logs within a time window based on the machine identifier,
+    oldest first, as NDJSON or CSV. The logs are read from a server-side cursor and sent
+    as they are read, so the whole history can be exported in constant memory.
+
+    Args:
+        machine_id (int): The machine identifier.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        format (StreamFormat): The format of the response.
+
+    Returns:
+        StreamingResponse: The streamed temperature logs.
+    """
+
+    partitions = stream_temperature_logs_for_machine(
+        machine_id, since=since, until=until
+    )
+
+    return StreamingResponse(
+        encode_stream(
+            partitions, [column.key for column in TEMPERATURE_LOG_COLUMNS], format
+        ),
+        media_type=STREAM_MEDIA_TYPES[format],
+    )
+
+
+@router.get(
+    "/oven/logs/temperature/batch/{batch_id}/stream",
+    response_model=None,
+    tags=["Oven - Temperature"],
+)
+async def stream_temperature_logs_for_batch_route(
+    batch_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    format: StreamFormat = StreamFormat.NDJSON,
+) -> StreamingResponse:
+    """
+    Streams the temperature logs within a time window based on the batch identifier,
+    oldest first, as NDJSON or CSV. The logs are read from a server-side cursor and sent
+    as they are read, so the whole history can be exported in constant memory.
+
+    Args:
+        batch_id (int): The batch identifier.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        format (StreamFormat): The format of the response.
+
+    Returns:
+        StreamingResponse: The streamed temperature logs.
+    """
+
+    partitions = stream_temperature_logs_for_batch(batch_id, since=since, until=until)
+
+    return StreamingResponse(
+        encode_stream(
+            partitions, [column.key for column in TEMPERATURE_LOG_COLUMNS], format
+        ),
+        media_type=STREAM_MEDIA_TYPES[format],
+    )
+
+
+@router.post(
+    "/oven/logs/humidity",
+    response_model=Response,
+    tags=["Oven - Humidity"],
+)
+async def create_humidity_logs_route(
+    readings: list[HumidityReading],
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Creates humidity logs for one or more ovens from a batch of timestamped readings.
+    The active batch is looked up once per machine, all readings are inserted in a single
+    transaction and one aggregated frame is pushed per machine.
+
+    Args:
+        readings (list[HumidityReading]): The timestamped humidity readings.
+        db (AsyncSession): The database session.
+
+    Returns:
+        Response: The response containing the aggregated readings per machine.
+    """
+
+    aggregates: list[HumidityLogAggregate] = await ingest_humidity_readings(
+        db, readings
     )
 
     return Response(
-        success=True, msg=HTTPMessages.TEMPERATURE_LOGS_RETRIEVED, data=temperature_logs
+        success=True,
+        msg=HTTPMessages.HUMIDITY_LOGS_CREATED,
+        data=aggregates,
+    )
+
+
+@router.get(
+    "/oven/logs/humidity/{machine_id}",
+    response_model=PaginatedResponse,
+    tags=["Oven - Humidity"],
+)
+async def get_humidity_logs_for_machine_route(
+    machine_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+) -> ORJSONResponse:
+    """
+    Retrieves the humidity logs for the oven based on the machine identifier.
+
+    Args:
+        machine_id (int): The machine identifier.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        after_id (int | None): The cursor returned as next_cursor by the previous page.
+        limit (int): The page size.
+        db (AsyncSession): The database session.
+
+    Returns:
+        ORJSONResponse: The response containing the humidity logs.
+    """
+
+    humidity_logs: list[HumidityLog] = await get_humidity_logs_for_machine(
+        db,
+        machine_id,
+        since=since,
+        until=until,
+        after_id=after_id,
+        limit=limit,
+    )
+
+    return build_response(
+        HTTPMessages.HUMIDITY_LOGS_RETRIEVED,
+        dump_rows(humidity_logs, HumidityLog),
+        next_cursor=get_next_cursor(humidity_logs, limit),
+    )
+
+
+@router.get(
+    "/oven/logs/humidity/batch/{batch_id}",
+    response_model=PaginatedResponse,
+    tags=["Oven - Humidity"],
+)
+async def get_humidity_logs_for_batch_route(
+    batch_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+) -> ORJSONResponse:
+    """
+    Retrieves the humidity logs for the oven based on the batch identifier.
+
+    Args:
+        batch_id (int): The batch identifier.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        after_id (int | None): The cursor returned as next_cursor by the previous page.
+        limit (int): The page size.
+        db (AsyncSession): The database session.
+
+    Returns:
+        ORJSONResponse: The response containing the humidity logs.
+    """
+
+    humidity_logs: list[HumidityLog] = await get_humidity_logs_for_batch(
+        db,
+        batch_id,
+        since=since,
+        until=until,
+        after_id=after_id,
+        limit=limit,
+    )
+
+    return build_response(
+        HTTPMessages.HUMIDITY_LOGS_RETRIEVED,
+        dump_rows(humidity_logs, HumidityLog),
+        next_cursor=get_next_cursor(humidity_logs, limit),
+    )
+
+
+@router.get(
+    "/oven/logs/humidity/{machine_id}/buckets",
+    response_model=Response,
+    tags=["Oven - Humidity"],
+)
+async def get_humidity_buckets_for_machine_route(
+    machine_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    resolution: BucketResolution | None = None,
+    buckets: int | None = Query(None, ge=1, le=MAX_BUCKETS),
+    db: AsyncSession = Depends(get_db),
+) -> ORJSONResponse | Response:
+    """
+    Retrieves the humidity logs for the oven based on the machine identifier, aggregated
+    into time buckets with the min, max, mean and count of each bucket.
+
+    Args:
+        machine_id (int): The machine identifier.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        resolution (BucketResolution | None): Aggregate per second, minute, hour or day.
+        buckets (int | None): Aggregate into this many equal-width buckets instead.
+        db (AsyncSession): The database session.
+
+    Returns:
+        ORJSONResponse | Response: The response containing the humidity buckets.
+    """
+
+    if resolution is not None and buckets is not None:
+        return Response(
+            success=False, msg=HTTPMessages.INVALID_BUCKET_PARAMETERS, data=[]
+        )
+
+    if resolution is None and buckets is None:
+        buckets = DEFAULT_BUCKETS
+
+    rows = await get_humidity_buckets_for_machine(
+        db,
+        machine_id,
+        since=since,
+        until=until,
+        resolution=resolution,
+        buckets=buckets,
+    )
+
+    return build_response(
+        HTTPMessages.HUMIDITY_BUCKETS_RETRIEVED, dump_rows(rows, HumidityBucket)
+    )
+
+
+@router.get(
+    "/oven/logs/humidity/batch/{batch_id}/buckets",
+    response_model=Response,
+    tags=["Oven - Humidity"],
+)
+async def get_humidity_buckets_for_batch_route(
+    batch_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    resolution: BucketResolution | None = None,
+    buckets: int | None = Query(None, ge=1, le=MAX_BUCKETS),
+    db: AsyncSession = Depends(get_db),
+) -> ORJSONResponse | Response:
+    """
+    Retrieves the humidity logs for the oven based on the batch identifier, aggregated
+    into time buckets with the min, max, mean and count of each bucket.
+
+    Args:
+        batch_id (int): The batch identifier.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        resolution (BucketResolution | None): Aggregate per second, minute, hour or day.
+        buckets (int | None): Aggregate into this many equal-width buckets instead.
+        db (AsyncSession): The database session.
+
+    Returns:
+        ORJSONResponse | Response: The response containing the humidity buckets.
+    """
+
+    if resolution is not None and buckets is not None:
+        return Response(
+            success=False, msg=HTTPMessages.INVALID_BUCKET_PARAMETERS, data=[]
+        )
+
+    if resolution is None and buckets is None:
+        buckets = DEFAULT_BUCKETS
+
+    rows = await get_humidity_buckets_for_batch(
+        db,
+        batch_id,
+        since=since,
+        until=until,
+        resolution=resolution,
+        buckets=buckets,
+    )
+
+    return build_response(
+        HTTPMessages.HUMIDITY_BUCKETS_RETRIEVED, dump_rows(rows, HumidityBucket)
+    )
+
+
+@router.get(
+    "/oven/logs/humidity/{machine_id}/downsampled",
+    response_model=Response,
+    tags=["Oven - Humidity"],
+)
+async def get_downsampled_humidity_logs_for_machine_route(
+    machine_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    points: int = Query(DEFAULT_BUCKETS, ge=3, le=MAX_BUCKETS),
+    db: AsyncSession = Depends(get_db),
+) -> ORJSONResponse:
+    """
+    Retrieves the humidity logs for the oven based on the machine identifier, downsampled
+    to at most the given number of points while keeping the shape of the series.
+
+    Args:
+        machine_id (int): The machine identifier.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        points (int): The maximum number of logs to return.
+        db (AsyncSession): The database session.
+
+    Returns:
+        ORJSONResponse: The response containing the humidity logs, oldest first.
+    """
+
+    rows = await get_downsampled_humidity_logs_for_machine(
+        db, machine_id, points, since=since, until=until
+    )
+
+    return build_response(
+        HTTPMessages.HUMIDITY_LOGS_RETRIEVED, dump_rows(rows, HumidityLogBase)
+    )
+
+
+@router.get(
+    "/oven/logs/humidity/batch/{batch_id}/downsampled",
+    response_model=Response,
+    tags=["Oven - Humidity"],
+)
+async def get_downsampled_humidity_logs_for_batch_route(
+    batch_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    points: int = Query(DEFAULT_BUCKETS, ge=3, le=MAX_BUCKETS),
+    db: AsyncSession = Depends(get_db),
+) -> ORJSONResponse:
+    """
+    Retrieves the humidity logs for the oven based on the batch identifier, downsampled
+    to at most the given number of points while keeping the shape of the series.
+
+    Args:
+        batch_id (int): The batch identifier.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        points (int): The maximum number of logs to return.
+        db (AsyncSession): The database session.
+
+    Returns:
+        ORJSONResponse: The response containing the humidity logs, oldest first.
+    """
+
+    rows = await get_downsampled_humidity_logs_for_batch(
+        db, batch_id, points, since=since, until=until
+    )
+
+    return build_response(
+        HTTPMessages.HUMIDITY_LOGS_RETRIEVED, dump_rows(rows, HumidityLogBase)
     )
 
 
@@ -387,7 +1053,7 @@ async def create_log_route(
     machine_id: int,
     type: OvenLogType,
     batch_id: int | None = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Creates a log for the oven.
@@ -396,7 +1062,7 @@ async def create_log_route(
         machine_id (int): The machine identifier.
         type (OvenLogType): The type of log.
         batch_id (int | None): The batch identifier.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the log details.
@@ -408,78 +1074,73 @@ async def create_log_route(
         batch_id=batch_id,
     )
 
-    log: OvenLog = create_log(db, new_log)
-
-    created_log = OvenLogExpanded(
-        id=log.id,
-        created_at=log.created_at,
-        machine_id=log.machine_id,
-        type=log.type.category,
-        description=log.type.description,
-        batch_id=log.batch_id,
-    )
-
-    created_log_dict: dict = {
-        "id": created_log.id,
-        "created_at": created_log.created_at,
-        "machine_id": created_log.machine_id,
-        "type": created_log.type.value,
-        "description": created_log.description.value,
-        "batch_id": created_log.batch_id,
-    }
-
-    if log.type == OvenLogType.PHASE_FINISHED:
-        stop_active_oven_batch(db, machine_id)
-
-    await WebSocketManager.send_personal_message(
-        created_log_dict, machine_id, MessageIdentifiers.OvenLog
-    )
+    created_log: OvenLogExpanded = await ingest_oven_log(db, new_log)
 
     return Response(success=True, msg=HTTPMessages.OVEN_LOG_CREATED, data=[created_log])
 
 
-@router.get("/oven/logs/{machine_id}", response_model=Response, tags=["Oven - Log"])
-def get_logs_for_machine_route(
+@router.get(
+    "/oven/logs/{machine_id}", response_model=PaginatedResponse, tags=["Oven - Log"]
+)
+async def get_logs_for_machine_route(
     machine_id: int,
-    db: Session = Depends(get_db),
-) -> Response:
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+) -> ORJSONResponse:
     """
     Retrieves the logs for the oven based on the machine identifier.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        after_id (int | None): The cursor returned as next_cursor by the previous page.
+        limit (int): The page size.
+        db (AsyncSession): The database session.
 
     Returns:
-        Response: The response containing the logs.
+        ORJSONResponse: The response containing the logs.
     """
 
-    logs: list[OvenLog] = get_logs_for_machine(db, machine_id)
+    logs: list[OvenLog] = await get_logs_for_machine(
+        db,
+        machine_id,
+        since=since,
+        until=until,
+        after_id=after_id,
+        limit=limit,
+    )
 
-    expanded_logs = [
-        OvenLogExpanded(
-            id=log.id,
-            created_at=log.created_at,
-            machine_id=log.machine_id,
-            type=log.type.category,
-            description=log.type.description,
-            batch_id=log.batch_id,
-        )
+    # The fields of OvenLogExpanded
+    expanded_logs: list[dict] = [
+        {
+            "id": log.id,
+            "batch_id": log.batch_id,
+            "created_at": log.created_at,
+            "machine_id": log.machine_id,
+            "type": log.type.category,
+            "description": log.type.description,
+        }
         for log in logs
     ]
 
-    return Response(
-        success=True, msg=HTTPMessages.OVEN_LOGS_RETRIEVED, data=expanded_logs
+    return build_response(
+        HTTPMessages.OVEN_LOGS_RETRIEVED,
+        expanded_logs,
+        next_cursor=get_next_cursor(logs, limit),
     )
 
 
 @router.post(
     "/oven/profile/{machine_id}", response_model=Response, tags=["Oven - Profile"]
 )
-def create_temperature_profile_route(
+async def create_temperature_profile_route(
     machine_id: int,
     temperature_profile: TemperatureProfileBase,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Creates a temperature profile for the oven.
@@ -487,7 +1148,7 @@ def create_temperature_profile_route(
     Args:
         machine_id (int): The machine identifier.
         temperature_profile (TemperatureProfileBase): The temperature profile.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the temperature profile.
@@ -502,7 +1163,7 @@ def create_temperature_profile_route(
         machine_id=machine_id,
     )
 
-    temperature_profile: TemperatureProfileCreate = create_temperature_profile(
+    temperature_profile: TemperatureProfileCreate = await create_temperature_profile(
         db, new_temperature_profile
     )
 
@@ -516,23 +1177,23 @@ def create_temperature_profile_route(
 @router.get(
     "/oven/profiles/{machine_id}", response_model=Response, tags=["Oven - Profile"]
 )
-def get_temperature_profiles_for_machine_route(
+async def get_temperature_profiles_for_machine_route(
     machine_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Retrieves the temperature profiles for the oven based on the machine identifier.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the temperature profiles.
     """
 
     temperature_profiles: list[TemperatureProfile] = (
-        get_temperature_profiles_for_machine(db, machine_id)
+        await get_temperature_profiles_for_machine(db, machine_id)
     )
 
     return Response(
@@ -545,22 +1206,22 @@ def get_temperature_profiles_for_machine_route(
 @router.delete(
     "/oven/profile/{profile_id}", response_model=Response, tags=["Oven - Profile"]
 )
-def delete_temperature_profile_route(
+async def delete_temperature_profile_route(
     profile_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Deletes a temperature profile for the oven.
 
     Args:
         profile_id (int): The profile identifier.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the temperature profile.
     """
 
-    delete_temperature_profile(db, profile_id)
+    await delete_temperature_profile(db, profile_id)
 
     return Response(
         success=True,
@@ -577,7 +1238,7 @@ def delete_temperature_profile_route(
 async def set_machine_active_temperature_profile_route(
     machine_id: int,
     profile_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Sets the active temperature profile for a machine.
@@ -585,13 +1246,13 @@ async def set_machine_active_temperature_profile_route(
     Args:
         machine_id (int): The machine ID.
         profile_id (int): The profile ID.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the updated machine.
     """
 
-    updated_machine_orm = set_machine_active_temperature_profile(
+    updated_machine_orm = await set_machine_active_temperature_profile(
         db, machine_id, profile_id
     )
 
@@ -623,23 +1284,23 @@ async def set_machine_active_temperature_profile_route(
     response_model=Response,
     tags=["Oven - Profile Active"],
 )
-def get_active_temperature_profile_for_machine_route(
+async def get_active_temperature_profile_for_machine_route(
     machine_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Retrieves the active temperature profile for the oven based on the machine identifier.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the temperature profile.
     """
 
     temperature_profile: TemperatureProfile | None = (
-        get_active_temperature_profile_for_machine(db, machine_id)
+        await get_active_temperature_profile_for_machine(db, machine_id)
     )
 
     if temperature_profile is None:
@@ -1,35 +1,53 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+import logging
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.websocket import manager as WebSocketManager
 from app.dependencies import get_db
 from app.utils.http_messages import HTTPMessages
+from app.utils.responses import ORJSONResponse, build_response, dump_rows
 from app.utils.message_identifiers import MessageIdentifiers
 from app.utils.logs_enums import PressLogType
 
 from app.schemas import (
     Response,
-    PressBatchCreate,
+    PaginatedResponse,
     PressBatch,
     PressLogCreate,
     PressLog,
     PressLogExpanded,
+    PressDistanceLogBase,
+    PressDistanceLog,
+    PressDistanceReading,
+    PressDistanceLogAggregate,
 )
 
 from app.crud.press import (
-    create_press_batch,
+    start_press_batch,
+    create_log as create_press_log,
     get_latest_press_batch_for_machine,
     get_press_batches_for_machine,
     stop_active_press_batch,
-    create_log,
     get_logs_for_machine,
+    get_press_distance_logs_for_machine,
+    get_press_distance_logs_for_batch,
+    get_downsampled_press_distance_logs_for_machine,
+    get_downsampled_press_distance_logs_for_batch,
 )
 
-from app.utils.state_enum import BatchState
+from app.ingestion import (
+    ingest_press_distance_readings,
+    ingest_press_log,
+    push_press_log,
+)
+
+from app.crud.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, get_next_cursor
+from app.crud.timeseries import DEFAULT_BUCKETS, MAX_BUCKETS
 
-from datetime import datetime, timezone
+from datetime import datetime
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 GROUP_1_ID: int = 8
 
@@ -39,14 +57,14 @@ GROUP_1_ID: int = 8
 )
 async def request_start_press(
     machine_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Requests to start the press.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the press status.
@@ -67,14 +85,14 @@ async def request_start_press(
 @router.get("/press/request_stop/{machine_id}", response_model=Response, tags=["Press"])
 async def request_stop_press(
     machine_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Requests to stop the press.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the press status.
@@ -95,38 +113,31 @@ async def request_stop_press(
 @router.get("/press/start/{machine_id}", response_model=Response, tags=["Press"])
 async def start_press(
     machine_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Starts the press.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the press status.
     """
-    stop_active_press_batch(db, machine_id)
-
-    # Create press batch
-    new_press_batch = PressBatchCreate(
-        start_time=datetime.now(tz=timezone.utc),
-        state=BatchState.ACTIVE,
-        machine_id=machine_id,
-    )
-    press_batch: PressBatchCreate = create_press_batch(db, new_press_batch)
+    # Stop the active press batch, create the new one and log the start at once
+    press_batch, log = await start_press_batch(db, machine_id, PressLogType.PRESS_BATCH)
 
     # MQTT
     try:
-        print("MQTT message sent to start press.")
+        logger.info("MQTT message sent to start press.")
         # Publish a message to the press's MQTT topic to start the press.
         # This is a placeholder for the actual implementation.
     except Exception:
         # Create log entry
         # Placeholder for the actual implementation.
 
-        stop_active_press_batch(db, machine_id)
+        await stop_active_press_batch(db, machine_id)
 
         return Response(success=False, msg=HTTPMessages.PRESS_START_FAILED, data=[])
 
@@ -143,8 +154,8 @@ async def start_press(
             success=False, msg=HTTPMessages.WEBSOCKET_FAILURE_PRESS_COMMAND, data=[]
         )
 
-    # Create log entry
-    await create_log_route(machine_id, PressLogType.PRESS_BATCH, None, db)
+    # Push the log entry
+    await push_press_log(log)
 
     return Response(success=True, msg=HTTPMessages.PRESS_STARTED, data=[press_batch])
 
@@ -152,14 +163,14 @@ async def start_press(
 @router.get("/press/stop/{machine_id}", response_model=Response, tags=["Press"])
 async def stop_press(
     machine_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Stops the press.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the press status.
@@ -167,7 +178,7 @@ async def stop_press(
 
     # MQTT
     try:
-        print("MQTT message sent to stop press.")
+        logger.info("MQTT message sent to stop press.")
         # Publish a message to the press's MQTT topic to stop the press.
         # This is a placeholder for the actual implementation.
     except Exception:
@@ -176,8 +187,14 @@ async def stop_press(
 
         return Response(success=False, msg=HTTPMessages.PRESS_STOP_FAILED, data=[])
 
-    # Stop the active press batch
-    stop_active_press_batch(db, machine_id)
+    # Stop the active press batch and log the stop at once
+    log = await create_press_log(
+        db,
+        PressLogCreate(
+            machine_id=machine_id, type=PressLogType.STOP_PRESS, batch_id=None
+        ),
+        stop_batch=True,
+    )
 
     # Websocket
     try:
@@ -192,57 +209,77 @@ async def stop_press(
             success=False, msg=HTTPMessages.WEBSOCKET_FAILURE_PRESS_COMMAND, data=[]
         )
 
-    # Create log entry
-    await create_log_route(machine_id, PressLogType.STOP_PRESS, None, db)
+    # Push the log entry
+    await push_press_log(log)
 
     return Response(success=True, msg=HTTPMessages.PRESS_STOPPED, data=[])
 
 
 @router.get("/press/status/{machine_id}", response_model=Response, tags=["Press"])
-def get_press_status_route(
+async def get_press_status_route(
     machine_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Retrieves the press status.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the press status.
     """
 
-    press_batch: PressBatch | None = get_latest_press_batch_for_machine(db, machine_id)
+    press_batch: PressBatch | None = await get_latest_press_batch_for_machine(
+        db, machine_id
+    )
 
     return Response(
         success=True, msg=HTTPMessages.PRESS_STATUS_RETRIEVED, data=[press_batch]
     )
 
 
-@router.get("/press/batches/{machine_id}", response_model=Response, tags=["Press"])
-def get_press_batches_route(
+@router.get(
+    "/press/batches/{machine_id}", response_model=PaginatedResponse, tags=["Press"]
+)
+async def get_press_batches_route(
     machine_id: int,
-    db: Session = Depends(get_db),
-) -> Response:
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+) -> PaginatedResponse:
     """
     Retrieves the press batches for a machine.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        since (datetime | None): Only include batches started from this time onwards.
+        until (datetime | None): Only include batches started before this time.
+        after_id (int | None): The cursor returned as next_cursor by the previous page.
+        limit (int): The page size.
+        db (AsyncSession): The database session.
 
     Returns:
-        Response: The response containing the press batches.
+        PaginatedResponse: The response containing the press batches.
     """
 
-    press_batches: list[PressBatch] | None = get_press_batches_for_machine(
-        db, machine_id
+    press_batches: list[PressBatch] | None = await get_press_batches_for_machine(
+        db,
+        machine_id,
+        since=since,
+        until=until,
+        after_id=after_id,
+        limit=limit,
     )
 
-    return Response(
-        success=True, msg=HTTPMessages.PRESS_STATUS_RETRIEVED, data=press_batches
+    return PaginatedResponse(
+        success=True,
+        msg=HTTPMessages.PRESS_STATUS_RETRIEVED,
+        data=press_batches,
+        next_cursor=get_next_cursor(press_batches, limit),
     )
 
 
@@ -251,7 +288,7 @@ async def create_log_route(
     machine_id: int,
     type: PressLogType,
     batch_id: int | None = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Creates a log for the press.
@@ -260,7 +297,7 @@ async def create_log_route(
         machine_id (int): The machine identifier.
         type (OvenLogType): The type of log.
         batch_id (int | None): The batch identifier.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the log details.
@@ -272,70 +309,261 @@ async def create_log_route(
         batch_id=batch_id,
     )
 
-    log: PressLog = create_log(db, new_log)
+    created_log: PressLogExpanded = await ingest_press_log(db, new_log)
 
-    created_log = PressLogExpanded(
-        id=log.id,
-        created_at=log.created_at,
-        machine_id=log.machine_id,
-        type=log.type.category,
-        description=log.type.description,
-        batch_id=log.batch_id,
+    return Response(
+        success=True, msg=HTTPMessages.PRESS_LOG_CREATED, data=[created_log]
     )
 
-    created_log_dict: dict = {
-        "id": created_log.id,
-        "created_at": created_log.created_at,
-        "machine_id": created_log.machine_id,
-        "type": created_log.type.value,
-        "description": created_log.description.value,
-        "batch_id": created_log.batch_id,
-    }
 
-    if log.type == PressLogType.PHASE_FINISHED:
-        stop_active_press_batch(db, machine_id)
+@router.get(
+    "/press/logs/{machine_id}", response_model=PaginatedResponse, tags=["Press - Log"]
+)
+async def get_logs_for_machine_route(
+    machine_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+) -> ORJSONResponse:
+    """
+    Retrieves the logs for the press based on the machine identifier.
 
-    await WebSocketManager.send_personal_message(
-        created_log_dict, machine_id, MessageIdentifiers.PressLog
+    Args:
+        machine_id (int): The machine identifier.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        after_id (int | None): The cursor returned as next_cursor by the previous page.
+        limit (int): The page size.
+        db (AsyncSession): The database session.
+
+    Returns:
+        ORJSONResponse: The response containing the logs.
+    """
+
+    logs: list[PressLog] = await get_logs_for_machine(
+        db,
+        machine_id,
+        since=since,
+        until=until,
+        after_id=after_id,
+        limit=limit,
+    )
+
+    # The fields of PressLogExpanded
+    expanded_logs: list[dict] = [
+        {
+            "id": log.id,
+            "batch_id": log.batch_id,
+            "created_at": log.created_at,
+            "machine_id": log.machine_id,
+            "type": log.type.category,
+            "description": log.type.description,
+        }
+        for log in logs
+    ]
+
+    return build_response(
+        HTTPMessages.PRESS_LOGS_RETRIEVED,
+        expanded_logs,
+        next_cursor=get_next_cursor(logs, limit),
+    )
+
+
+@router.post("/press/logs/distance", response_model=Response, tags=["Press - Distance"])
+async def create_press_distance_logs_route(
+    readings: list[PressDistanceReading],
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Creates press distance logs for one or more presses from a batch of timestamped
+    positions, e.g. the position curve of a stroke. The active batch is looked up once
+    per machine, all positions are inserted in a single transaction and one aggregated
+    frame is pushed per machine.
+
+    Args:
+        readings (list[PressDistanceReading]): The timestamped press positions.
+        db (AsyncSession): The database session.
+
+    Returns:
+        Response: The response containing the aggregated positions per machine.
+    """
+
+    aggregates: list[PressDistanceLogAggregate] = await ingest_press_distance_readings(
+        db, readings
     )
 
     return Response(
-        success=True, msg=HTTPMessages.PRESS_LOG_CREATED, data=[created_log]
+        success=True,
+        msg=HTTPMessages.PRESS_DISTANCE_LOGS_CREATED,
+        data=aggregates,
     )
 
 
-@router.get("/press/logs/{machine_id}", response_model=Response, tags=["Press - Log"])
-def get_logs_for_machine_route(
+@router.get(
+    "/press/logs/distance/{machine_id}",
+    response_model=PaginatedResponse,
+    tags=["Press - Distance"],
+)
+async def get_press_distance_logs_for_machine_route(
     machine_id: int,
-    db: Session = Depends(get_db),
-) -> Response:
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+) -> ORJSONResponse:
     """
-    Retrieves the logs for the press based on the machine identifier.
+    Retrieves the press distance logs within a time window based on the machine identifier.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        after_id (int | None): The cursor returned as next_cursor by the previous page.
+        limit (int): The page size.
+        db (AsyncSession): The database session.
 
     Returns:
-        Response: The response containing the logs.
+        ORJSONResponse: The response containing the press distance logs.
     """
 
-    logs: list[PressLog] = get_logs_for_machine(db, machine_id)
+    press_distance_logs: list[PressDistanceLog] = (
+        await get_press_distance_logs_for_machine(
+            db,
+            machine_id,
+            since=since,
+            until=until,
+            after_id=after_id,
+            limit=limit,
+        )
+    )
 
-    expanded_logs = [
-        PressLogExpanded(
-            id=log.id,
-            created_at=log.created_at,
-            machine_id=log.machine_id,
-            type=log.type.category,
-            description=log.type.description,
-            batch_id=log.batch_id,
+    return build_response(
+        HTTPMessages.PRESS_DISTANCE_LOGS_RETRIEVED,
+        dump_rows(press_distance_logs, PressDistanceLog),
+        next_cursor=get_next_cursor(press_distance_logs, limit),
+    )
+
+
+@router.get(
+    "/press/logs/distance/batch/{batch_id}",
+    response_model=PaginatedResponse,
+    tags=["Press - Distance"],
+)
+async def get_press_distance_logs_for_batch_route(
+    batch_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+) -> ORJSONResponse:
+    """
+    Retrieves the press distance logs within a time window based on the batch identifier.
+
+    Args:
+        batch_id (int): The batch identifier.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        after_id (int | None): The cursor returned as next_cursor by the previous page.
+        limit (int): The page size.
+        db (AsyncSession): The database session.
+
+    Returns:
+        ORJSONResponse: The response containing the press distance logs.
+    """
+
+    press_distance_logs: list[PressDistanceLog] = (
+        await get_press_distance_logs_for_batch(
+            db,
+            batch_id,
+            since=since,
+            until=until,
+            after_id=after_id,
+            limit=limit,
         )
-        for log in logs
-    ]
+    )
 
-    return Response(
-        success=True, msg=HTTPMessages.PRESS_LOGS_RETRIEVED, data=expanded_logs
+    return build_response(
+        HTTPMessages.PRESS_DISTANCE_LOGS_RETRIEVED,
+        dump_rows(press_distance_logs, PressDistanceLog),
+        next_cursor=get_next_cursor(press_distance_logs, limit),
+    )
+
+
+@router.get(
+    "/press/logs/distance/{machine_id}/downsampled",
+    response_model=Response,
+    tags=["Press - Distance"],
+)
+async def get_downsampled_press_distance_logs_for_machine_route(
+    machine_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    points: int = Query(DEFAULT_BUCKETS, ge=3, le=MAX_BUCKETS),
+    db: AsyncSession = Depends(get_db),
+) -> ORJSONResponse:
+    """
+    Retrieves the press distance logs based on the machine identifier, downsampled to at
+    most the given number of points while keeping the shape of the curve.
+
+    Args:
+        machine_id (int): The machine identifier.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        points (int): The maximum number of logs to return.
+        db (AsyncSession): The database session.
+
+    Returns:
+        ORJSONResponse: The response containing the press distance logs, oldest first.
+    """
+
+    rows = await get_downsampled_press_distance_logs_for_machine(
+        db, machine_id, points, since=since, until=until
+    )
+
+    return build_response(
+        HTTPMessages.PRESS_DISTANCE_LOGS_RETRIEVED,
+        dump_rows(rows, PressDistanceLogBase),
+    )
+
+
+@router.get(
+    "/press/logs/distance/batch/{batch_id}/downsampled",
+    response_model=Response,
+    tags=["Press - Distance"],
+)
+async def get_downsampled_press_distance_logs_for_batch_route(
+    batch_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    points: int = Query(DEFAULT_BUCKETS, ge=3, le=MAX_BUCKETS),
+    db: AsyncSession = Depends(get_db),
+) -> ORJSONResponse:
+    """
+    Retrieves the press distance logs based on the batch identifier, downsampled to at
+    most the given number of points while keeping the shape of the curve.
+
+    Args:
+        batch_id (int): The batch identifier.
+        since (datetime | None): Only include logs created from this time onwards.
+        until (datetime | None): Only include logs created before this time.
+        points (int): The maximum number of logs to return.
+        db (AsyncSession): The database session.
+
+    Returns:
+        ORJSONResponse: The response containing the press distance logs, oldest first.
+    """
+
+    rows = await get_downsampled_press_distance_logs_for_batch(
+        db, batch_id, points, since=since, until=until
+    )
+
+    return build_response(
+        HTTPMessages.PRESS_DISTANCE_LOGS_RETRIEVED,
+        dump_rows(rows, PressDistanceLogBase),
     )
 
 
@@ -344,14 +572,14 @@ def get_logs_for_machine_route(
 )
 async def press_confirm_inserted(
     machine_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Confirms that the pulp has been inserted into the press.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the press confirmation status.
@@ -359,7 +587,7 @@ async def press_confirm_inserted(
 
     # MQTT
     try:
-        print("MQTT message sent to confirm insert press.")
+        logger.info("MQTT message sent to confirm insert press.")
         # Publish a message to the press's MQTT topic to start the press.
         # This is a placeholder for the actual implementation.
     except Exception:
@@ -391,14 +619,14 @@ async def press_confirm_inserted(
 @router.get("/press/open/{machine_id}", response_model=Response, tags=["Press"])
 async def open_press(
     machine_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Opens the press.
 
     Args:
         machine_id (int): The machine identifier.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Response: The response containing the press status.
@@ -406,7 +634,7 @@ async def open_press(
 
     # MQTT
     try:
-        print("MQTT message sent to open press.")
+        logger.info("MQTT message sent to open press.")
         # Publish a message to the press's MQTT topic to open the press.
         # This is a placeholder for the actual implementation.
     except Exception:
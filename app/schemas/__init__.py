@@ -1,5 +1,6 @@
 from app.schemas.response import (
     Response,
+    PaginatedResponse,
 )
 
 from app.schemas.machine import (
@@ -13,12 +14,27 @@ from app.schemas.oven_batch import (
     OvenBatchBase,
     OvenBatchCreate,
     OvenBatch,
+    OvenBatchWithSummary,
 )
 
+from app.schemas.oven_batch_summary import OvenBatchSummary
+
 from app.schemas.temperature_log import (
     TemperatureLogBase,
     TemperatureLogCreate,
     TemperatureLog,
+    TemperatureReading,
+    TemperatureLogAggregate,
+    TemperatureBucket,
+)
+
+from app.schemas.humidity_log import (
+    HumidityLogBase,
+    HumidityLogCreate,
+    HumidityLog,
+    HumidityReading,
+    HumidityLogAggregate,
+    HumidityBucket,
 )
 
 from app.schemas.oven_logs import (
@@ -40,14 +56,24 @@ from app.schemas.press_logs import (
     PressLog,
     PressLogExpanded,
 )
+from app.schemas.press_distance_log import (
+    PressDistanceLogBase,
+    PressDistanceLogCreate,
+    PressDistanceLog,
+    PressDistanceReading,
+    PressDistanceLogAggregate,
+)
 from app.schemas.press_batch import (
     PressBatchBase,
     PressBatch,
     PressBatchCreate,
 )
+from app.schemas.ingest_frame import IngestFrame
+from app.schemas.log_import import LogImportResult
 
 __all__ = [
     "Response",
+    "PaginatedResponse",
     "MachineBase",
     "Machine",
     "MachineCreate",
@@ -55,9 +81,20 @@ __all__ = [
     "OvenBatchBase",
     "OvenBatchCreate",
     "OvenBatch",
+    "OvenBatchWithSummary",
+    "OvenBatchSummary",
     "TemperatureLogBase",
     "TemperatureLogCreate",
     "TemperatureLog",
+    "TemperatureReading",
+    "TemperatureLogAggregate",
+    "TemperatureBucket",
+    "HumidityLogBase",
+    "HumidityLogCreate",
+    "HumidityLog",
+    "HumidityReading",
+    "HumidityLogAggregate",
+    "HumidityBucket",
     "OvenLogBase",
     "OvenLogCreate",
     "OvenLog",
@@ -69,7 +106,14 @@ __all__ = [
     "PressLogCreate",
     "PressLog",
     "PressLogExpanded",
+    "PressDistanceLogBase",
+    "PressDistanceLogCreate",
+    "PressDistanceLog",
+    "PressDistanceReading",
+    "PressDistanceLogAggregate",
     "PressBatchBase",
     "PressBatch",
     "PressBatchCreate",
+    "IngestFrame",
+    "LogImportResult",
 ]
@@ -0,0 +1,119 @@
+from pydantic import BaseModel
+
+from datetime import datetime
+
+
+class HumidityLogBase(BaseModel):
+    """
+    Represents the humidity logs schema.
+
+    Attributes:
+        humidity (float): The humidity value.
+        created_at (datetime): The timestamp when the log was created
+        machine_id (int): The machine ID.
+        batch_id (int | None): The batch ID
+
+    """
+
+    humidity: float
+    created_at: datetime
+    machine_id: int
+    batch_id: int | None
+
+    class Config:
+        from_attributes = True
+
+
+class HumidityLogCreate(BaseModel):
+    """
+    Represents the humidity logs schema for creation.
+
+    Attributes:
+        humidity (float): The humidity value.
+        machine_id (int): The machine ID.
+        batch_id (int | None): The batch ID.
+        created_at (datetime | None): The timestamp of the reading. Defaults to now.
+
+    """
+
+    humidity: float
+    machine_id: int
+    batch_id: int | None
+    created_at: datetime | None = None
+
+
+class HumidityReading(BaseModel):
+    """
+    Represents a single timestamped humidity reading for batched ingestion.
+
+    Attributes:
+        machine_id (int): The machine ID.
+        humidity (float): The humidity value.
+        created_at (datetime): The timestamp when the reading was taken.
+
+    """
+
+    machine_id: int
+    humidity: float
+    created_at: datetime
+
+
+class HumidityLogAggregate(HumidityLogBase):
+    """
+    Represents the aggregate of a batch of humidity readings for one machine.
+    The inherited fields describe the most recent reading in the batch.
+
+    Attributes:
+        count (int): The number of readings in the batch.
+        min_humidity (float): The lowest humidity in the batch.
+        max_humidity (float): The highest humidity in the batch.
+        mean_humidity (float): The mean humidity of the batch.
+
+    Inherits:
+        HumidityLogBase
+    """
+
+    count: int
+    min_humidity: float
+    max_humidity: float
+    mean_humidity: float
+
+
+class HumidityLog(HumidityLogBase):
+    """
+    Represents the humidity logs schema for response.
+
+    Attributes:
+        id (int): The primary key of the table.
+
+    Inherits:
+        HumidityLogBase
+    """
+
+    id: int
+
+    class Config:
+        from_attributes = True
+
+
+class HumidityBucket(BaseModel):
+    """
+    Represents the aggregate of the humidity readings in one time bucket.
+
+    Attributes:
+        bucket_start (datetime): The start of the bucket.
+        min_humidity (float): The lowest humidity in the bucket.
+        max_humidity (float): The highest humidity in the bucket.
+        mean_humidity (float): The mean humidity of the bucket.
+        count (int): The number of readings in the bucket.
+
+    """
+
+    bucket_start: datetime
+    min_humidity: float
+    max_humidity: float
+    mean_humidity: float
+    count: int
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+
+class IngestFrame(BaseModel):
+    """
+    Represents a frame streamed by a machine over its WebSocket.
+
+    Attributes:
+        identifier (str): The message identifier, e.g. CurrentTemp or OvenLog.
+        seq (int | None): The sequence number acknowledged once the frame is stored.
+        message (dict | list[dict]): One reading or log, or a list of them.
+
+    """
+
+    identifier: str
+    seq: int | None = None
+    message: dict | list[dict]
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+
+from app.utils.copy_enums import CopyFormat, LogTable
+
+
+class LogImportResult(BaseModel):
+    """
+    Represents the result of a bulk log import.
+
+    Attributes:
+        table (LogTable): The table the logs were imported into.
+        format (CopyFormat): The format of the imported data.
+        rows (int): The number of imported rows.
+
+    """
+
+    table: LogTable
+    format: CopyFormat
+    rows: int
@@ -2,6 +2,7 @@ from pydantic import BaseModel
 
 from datetime import datetime
 from app.utils.state_enum import BatchState
+from app.schemas.oven_batch_summary import OvenBatchSummary
 
 
 class OvenBatchBase(BaseModel):
@@ -47,3 +48,18 @@ class OvenBatch(OvenBatchBase):
 
     class Config:
         from_attributes = True
+
+
+class OvenBatchWithSummary(OvenBatch):
+    """
+    Represents the schema for the oven batches with their summary. Kept apart from
+    OvenBatch, which press batches also match in the Response.data union.
+
+    Attributes:
+        summary (OvenBatchSummary | None): The summary, once the batch is completed.
+
+    Inherits:
+        OvenBatch
+    """
+
+    summary: OvenBatchSummary | None
@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+
+
+class OvenBatchSummary(BaseModel):
+    """
+    Represents the summary of a completed oven batch.
+
+    Attributes:
+        batch_id (int): The batch identifier.
+        profile_id (int | None): The temperature profile active when the batch completed.
+        desired_temp (float | None): The desired temperature of the profile.
+        max_temp (float | None): The maximum temperature of the profile.
+        band_tolerance (float): The allowed deviation from the desired temperature.
+        reading_count (int): The number of temperature readings in the batch.
+        peak_temperature (float | None): The highest temperature reading.
+        mean_temperature (float | None): The mean temperature reading.
+        time_in_band_sec (float | None): The time spent within the band around the desired temperature.
+        time_over_max_sec (float | None): The time spent above the maximum temperature.
+        peak_overshoot (float | None): The largest excess of a reading over the maximum temperature.
+        duration_sec (float): The duration of the batch.
+    """
+
+    batch_id: int
+    profile_id: int | None
+    desired_temp: float | None
+    max_temp: float | None
+    band_tolerance: float
+    reading_count: int
+    peak_temperature: float | None
+    mean_temperature: float | None
+    time_in_band_sec: float | None
+    time_over_max_sec: float | None
+    peak_overshoot: float | None
+    duration_sec: float
+
+    class Config:
+        from_attributes = True
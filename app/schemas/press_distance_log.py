@@ -0,0 +1,94 @@
+from pydantic import BaseModel
+
+from datetime import datetime
+
+
+class PressDistanceLogBase(BaseModel):
+    """
+    Represents the press distance logs schema.
+
+    Attributes:
+        distance (float): The position of the press.
+        created_at (datetime): The timestamp when the position was measured.
+        machine_id (int): The machine ID.
+        batch_id (int | None): The press batch ID.
+
+    """
+
+    distance: float
+    created_at: datetime
+    machine_id: int
+    batch_id: int | None
+
+    class Config:
+        from_attributes = True
+
+
+class PressDistanceLogCreate(BaseModel):
+    """
+    Represents the press distance logs schema for creation.
+
+    Attributes:
+        distance (float): The position of the press.
+        machine_id (int): The machine ID.
+        batch_id (int | None): The press batch ID.
+        created_at (datetime): The timestamp when the position was measured.
+
+    """
+
+    distance: float
+    machine_id: int
+    batch_id: int | None
+    created_at: datetime
+
+
+class PressDistanceReading(BaseModel):
+    """
+    Represents a single timestamped press position for batched ingestion.
+
+    Attributes:
+        machine_id (int): The machine ID.
+        distance (float): The position of the press.
+        created_at (datetime): The timestamp when the position was measured.
+
+    """
+
+    machine_id: int
+    distance: float
+    created_at: datetime
+
+
+class PressDistanceLogAggregate(PressDistanceLogBase):
+    """
+    Represents the aggregate of a batch of press positions for one machine.
+    The inherited fields describe the most recent position in the batch.
+
+    Attributes:
+        count (int): The number of positions in the batch.
+        min_distance (float): The lowest position in the batch.
+        max_distance (float): The highest position in the batch.
+
+    Inherits:
+        PressDistanceLogBase
+    """
+
+    count: int
+    min_distance: float
+    max_distance: float
+
+
+class PressDistanceLog(PressDistanceLogBase):
+    """
+    Represents the press distance logs schema for response.
+
+    Attributes:
+        id (int): The primary key of the table.
+
+    Inherits:
+        PressDistanceLogBase
+    """
+
+    id: int
+
+    class Config:
+        from_attributes = True
@@ -12,11 +12,20 @@ from app.schemas.oven_batch import (
     OvenBatchBase,
     OvenBatchCreate,
     OvenBatch,
+    OvenBatchWithSummary,
 )
 from app.schemas.temperature_log import (
     TemperatureLogBase,
     TemperatureLogCreate,
     TemperatureLog,
+    TemperatureLogAggregate,
+    TemperatureBucket,
+)
+from app.schemas.humidity_log import (
+    HumidityLogBase,
+    HumidityLog,
+    HumidityLogAggregate,
+    HumidityBucket,
 )
 from app.schemas.oven_logs import (
     OvenLogBase,
@@ -35,11 +44,17 @@ from app.schemas.press_logs import (
     PressLog,
     PressLogExpanded,
 )
+from app.schemas.press_distance_log import (
+    PressDistanceLogBase,
+    PressDistanceLog,
+    PressDistanceLogAggregate,
+)
 from app.schemas.press_batch import (
     PressBatchBase,
     PressBatch,
     PressBatchCreate,
 )
+from app.schemas.log_import import LogImportResult
 
 
 class Response(BaseModel):
@@ -65,9 +80,16 @@ class Response(BaseModel):
         list[OvenBatchBase],
         list[OvenBatchCreate],
         list[OvenBatch],
+        list[OvenBatchWithSummary],
         list[TemperatureLogBase],
         list[TemperatureLogCreate],
         list[TemperatureLog],
+        list[TemperatureLogAggregate],
+        list[TemperatureBucket],
+        list[HumidityLogBase],
+        list[HumidityLog],
+        list[HumidityLogAggregate],
+        list[HumidityBucket],
         list[OvenLogBase],
         list[OvenLogCreate],
         list[OvenLog],
@@ -79,11 +101,30 @@ class Response(BaseModel):
         list[PressLogCreate],
         list[PressLog],
         list[PressLogExpanded],
+        list[PressDistanceLogBase],
+        list[PressDistanceLog],
+        list[PressDistanceLogAggregate],
         list[PressBatchBase],
         list[PressBatch],
         list[PressBatchCreate],
+        list[LogImportResult],
         bool,
         list[bool],
         None,
         list[None],
     ]
+
+
+class PaginatedResponse(Response):
+    """
+    Represents the response data for a paginated API request.
+
+    Attributes:
+        next_cursor (int | None): The cursor to pass as after_id to retrieve the next page.
+            None when there are no more pages.
+
+    Inherits:
+        Response
+    """
+
+    next_cursor: int | None = None
@@ -32,12 +32,51 @@ class TemperatureLogCreate(BaseModel):
         temperature (float): The temperature value.
         machine_id (int): The machine ID.
         batch_id (int | None): The batch ID.
+        created_at (datetime | None): The timestamp of the reading. Defaults to now.
 
     """
 
     temperature: float
     machine_id: int
     batch_id: int | None
+    created_at: datetime | None = None
+
+
+class TemperatureReading(BaseModel):
+    """
+    Represents a single timestamped temperature reading for batched ingestion.
+
+    Attributes:
+        machine_id (int): The machine ID.
+        temperature (float): The temperature value.
+        created_at (datetime): The timestamp when the reading was taken.
+
+    """
+
+    machine_id: int
+    temperature: float
+    created_at: datetime
+
+
+class TemperatureLogAggregate(TemperatureLogBase):
+    """
+    Represents the aggregate of a batch of temperature readings for one machine.
+    The inherited fields describe the most recent reading in the batch.
+
+    Attributes:
+        count (int): The number of readings in the batch.
+        min_temperature (float): The lowest temperature in the batch.
+        max_temperature (float): The highest temperature in the batch.
+        mean_temperature (float): The mean temperature of the batch.
+
+    Inherits:
+        TemperatureLogBase
+    """
+
+    count: int
+    min_temperature: float
+    max_temperature: float
+    mean_temperature: float
 
 
 class TemperatureLog(TemperatureLogBase):
@@ -57,3 +96,26 @@ class TemperatureLog(TemperatureLogBase):
 
     class Config:
         from_attributes = True
+
+
+class TemperatureBucket(BaseModel):
+    """
+    Represents the aggregate of the temperature readings in one time bucket.
+
+    Attributes:
+        bucket_start (datetime): The start of the bucket.
+        min_temperature (float): The lowest temperature in the bucket.
+        max_temperature (float): The highest temperature in the bucket.
+        mean_temperature (float): The mean temperature of the bucket.
+        count (int): The number of readings in the bucket.
+
+    """
+
+    bucket_start: datetime
+    min_temperature: float
+    max_temperature: float
+    mean_temperature: float
+    count: int
+
+    class Config:
+        from_attributes = True
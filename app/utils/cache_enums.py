@@ -0,0 +1,17 @@
+from enum import Enum
+
+
+class LiveStateKey(Enum):
+    """
+    Represents the kinds of per-machine state held in the live state cache.
+    """
+
+    # The latest oven batch of the machine, active or not
+    OVEN_BATCH = "OVEN_BATCH"
+    # The latest press batch of the machine, active or not
+    PRESS_BATCH = "PRESS_BATCH"
+    # The active temperature profile of the machine
+    ACTIVE_PROFILE = "ACTIVE_PROFILE"
+
+    def __str__(self) -> str:
+        return self.value
@@ -0,0 +1,30 @@
+from enum import Enum
+
+
+class LogTable(Enum):
+    """
+    Represents the log tables that can be bulk imported and exported.
+    """
+
+    TEMPERATURE_LOGS = "temperature_logs"
+    HUMIDITY_LOGS = "humidity_logs"
+    OVEN_LOGS = "oven_logs"
+    PRESS_LOGS = "press_logs"
+    PRESS_DISTANCE_LOGS = "press_distance_logs"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class CopyFormat(Enum):
+    """
+    Represents the PostgreSQL COPY formats used for bulk import and export.
+    """
+
+    # Comma separated values with a header row
+    CSV = "csv"
+    # PostgreSQL binary COPY format, only readable by COPY itself
+    BINARY = "binary"
+
+    def __str__(self) -> str:
+        return self.value
@@ -0,0 +1,66 @@
+from typing import Callable, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+def lttb(
+    points: Sequence[T],
+    threshold: int,
+    x: Callable[[T], float] = lambda point: point[0],
+    y: Callable[[T], float] = lambda point: point[1],
+) -> list[T]:
+    """
+    Downsamples a series with the Largest-Triangle-Three-Buckets algorithm, which keeps
+    the visual shape of the series (peaks and troughs) with far fewer points.
+
+    Args:
+        points (Sequence[T]): The points of the series, ordered by x.
+        threshold (int): The maximum number of points to keep.
+        x (Callable[[T], float]): Returns the x value of a point.
+        y (Callable[[T], float]): Returns the y value of a point.
+
+    Returns:
+        list[T]: The selected points, including the first and the last point.
+    """
+
+    if threshold >= len(points) or threshold < 3:
+        return list(points)
+
+    sampled: list[T] = [points[0]]
+
+    # The first and last points are always kept, the rest is split in equal buckets
+    bucket_size: float = (len(points) - 2) / (threshold - 2)
+    selected: int = 0
+
+    for bucket in range(threshold - 2):
+        start: int = int(bucket * bucket_size) + 1
+        end: int = int((bucket + 1) * bucket_size) + 1
+
+        # Average point of the next bucket, the last point for the last bucket
+        next_start: int = end
+        next_end: int = min(int((bucket + 2) * bucket_size) + 1, len(points))
+        next_points = points[next_start:next_end] or points[-1:]
+        average_x: float = sum(x(p) for p in next_points) / len(next_points)
+        average_y: float = sum(y(p) for p in next_points) / len(next_points)
+
+        # Keep the point forming the largest triangle with the previous selection
+        selected_x: float = x(points[selected])
+        selected_y: float = y(points[selected])
+        largest_area: float = -1.0
+        largest_index: int = start
+
+        for index in range(start, end):
+            area: float = abs(
+                (selected_x - average_x) * (y(points[index]) - selected_y)
+                - (selected_x - x(points[index])) * (average_y - selected_y)
+            )
+            if area > largest_area:
+                largest_area = area
+                largest_index = index
+
+        sampled.append(points[largest_index])
+        selected = largest_index
+
+    sampled.append(points[-1])
+
+    return sampled
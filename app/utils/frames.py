@@ -0,0 +1,116 @@
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+
+import msgpack
+import orjson
+
+from app.utils.json_utils import JSON_OPTIONS
+from app.utils.message_identifiers import MessageIdentifiers
+from app.utils.websocket_enums import FrameEncoding
+
+
+def _msgpack_default(obj: Any) -> Any:
+    """
+    Converts the values MessagePack has no type for, the same way as in JSON frames.
+
+    Args:
+        obj (Any): The value.
+
+    Returns:
+        Any: The converted value.
+    """
+
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+
+    raise TypeError(f"Cannot serialize {type(obj).__name__} to MessagePack.")
+
+
+class Frame:
+    """
+    A WebSocket frame. The payload is serialized at most once per encoding and the result
+    is cached, so a frame fanned out to many connections is encoded once, not once per
+    connection.
+
+    A frame relayed by the broker as JSON text keeps that text and only parses it when a
+    connection needs another encoding.
+    """
+
+    __slots__ = ("_payload", "_encoded")
+
+    def __init__(self, payload: dict | None = None, text: str | None = None):
+        self._payload = payload
+        self._encoded: dict[FrameEncoding, str | bytes] = {}
+        if text is not None:
+            self._encoded[FrameEncoding.JSON] = text
+
+    @classmethod
+    def envelope(cls, identifier: MessageIdentifiers, message: Any) -> "Frame":
+        """
+        Args:
+            identifier (MessageIdentifiers): The message identifier.
+            message (Any): The message.
+
+        Returns:
+            Frame: The frame {"identifier": ..., "message": ...}.
+        """
+        return cls({"identifier": identifier.value, "message": message})
+
+    @property
+    def payload(self) -> dict:
+        """
+        Returns:
+            dict: The content of the frame.
+        """
+        if self._payload is None:
+            self._payload = orjson.loads(self._encoded[FrameEncoding.JSON])
+
+        return self._payload
+
+    def encode(self, encoding: FrameEncoding = FrameEncoding.JSON) -> str | bytes:
+        """
+        Args:
+            encoding (FrameEncoding): The encoding.
+
+        Returns:
+            str | bytes: The JSON text, or the MessagePack bytes.
+        """
+
+        encoded: str | bytes | None = self._encoded.get(encoding)
+
+        if encoded is None:
+            if encoding == FrameEncoding.MSGPACK:
+                encoded = msgpack.packb(
+                    self.payload, default=_msgpack_default, datetime=False
+                )
+            else:
+                encoded = orjson.dumps(self.payload, option=JSON_OPTIONS).decode()
+            self._encoded[encoding] = encoded
+
+        return encoded
+
+
+def decode_frame(data: str | bytes) -> Any:
+    """
+    Decodes a frame received from a client, JSON text or MessagePack bytes.
+
+    Args:
+        data (str | bytes): The received frame.
+
+    Returns:
+        Any: The decoded frame.
+
+    Raises:
+        ValueError: If the frame cannot be decoded.
+    """
+
+    if isinstance(data, str):
+        return orjson.loads(data)
+
+    try:
+        return msgpack.unpackb(data)
+    except Exception as e:
+        raise ValueError(f"Invalid MessagePack frame: {e}") from e
@@ -10,7 +10,13 @@ class HTTPMessages(Enum):
     DATA_INTEGRITY_ERROR = "Data integrity error."
     INTERNAL_SERVER_ERROR = "Internal server error."
     TEMPERATURE_LOG_CREATED = "Temperature log created successfully."
+    TEMPERATURE_LOGS_CREATED = "Temperature logs created successfully."
     TEMPERATURE_LOGS_RETRIEVED = "Temperature logs retrieved successfully."
+    TEMPERATURE_BUCKETS_RETRIEVED = "Temperature buckets retrieved successfully."
+    HUMIDITY_LOGS_CREATED = "Humidity logs created successfully."
+    HUMIDITY_LOGS_RETRIEVED = "Humidity logs retrieved successfully."
+    HUMIDITY_BUCKETS_RETRIEVED = "Humidity buckets retrieved successfully."
+    INVALID_BUCKET_PARAMETERS = "Specify either a resolution or a number of buckets."
     # Websocket
     WEBSOCKET_FAILURE_OVEN_COMMAND = (
         "Failed to send the oven command over the websocket."
@@ -65,6 +71,13 @@ class HTTPMessages(Enum):
     # Press Logs
     PRESS_LOG_CREATED = "Press log created successfully."
     PRESS_LOGS_RETRIEVED = "Press logs retrieved successfully."
+    PRESS_DISTANCE_LOGS_CREATED = "Press distance logs created successfully."
+    PRESS_DISTANCE_LOGS_RETRIEVED = "Press distance logs retrieved successfully."
+
+    # Bulk import and export
+    LOGS_IMPORTED = "Logs imported successfully."
+    LOGS_IMPORT_FAILED = "Failed to import the logs."
+    COPY_NOT_SUPPORTED = "Bulk import and export require a PostgreSQL database."
 
     def __str__(self) -> str:
         return self.value
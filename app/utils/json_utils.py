@@ -1,7 +1,10 @@
-import json
-from datetime import datetime
+import orjson
 from typing import Any
 
+# Datetimes are written in ISO format. Dict keys that are not strings are converted to
+# strings, as the json module does.
+JSON_OPTIONS: int = orjson.OPT_NON_STR_KEYS
+
 
 def json_serialize(data: Any) -> str:
     """
@@ -14,11 +17,4 @@ def json_serialize(data: Any) -> str:
         str: A JSON-formatted string.
     """
 
-    class CustomEncoder(json.JSONEncoder):
-        def default(self, obj):
-            if isinstance(obj, datetime):
-                return obj.isoformat()  # Convert datetime objects to ISO format
-            # Add more custom serialization rules here if needed
-            return json.JSONEncoder.default(self, obj)
-
-    return json.dumps(data, cls=CustomEncoder)
+    return orjson.dumps(data, option=JSON_OPTIONS).decode()
@@ -0,0 +1,15 @@
+from enum import Enum
+
+
+class RetentionMode(Enum):
+    """
+    Represents what happens to the log partitions older than the retention window.
+    """
+
+    # Drop the partition and its rows
+    DROP = "DROP"
+    # Detach the partition and move it to the archive schema
+    ARCHIVE = "ARCHIVE"
+
+    def __str__(self) -> str:
+        return self.value
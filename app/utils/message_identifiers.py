@@ -44,5 +44,37 @@ class MessageIdentifiers(Enum):
     MachineConnected = "MachineConnected"
     MachineDisconnected = "MachineDisconnected"
 
+    # Ingestion
+    Ack = "Ack"
+    Nack = "Nack"
+
+    # Subscriptions
+    Subscribe = "Subscribe"
+    Unsubscribe = "Unsubscribe"
+    Subscriptions = "Subscriptions"
+
     def __str__(self) -> str:
         return self.value
+
+    @property
+    def topic(self) -> str:
+        """
+        Returns:
+            str: The kind of topic the frames of the identifier are published on, e.g. temp.
+        """
+        return MESSAGE_TOPICS.get(self, "command")
+
+
+# Kind of topic per identifier, commands and settings for the machine are published on command
+MESSAGE_TOPICS: dict[MessageIdentifiers, str] = {
+    MessageIdentifiers.CurrentTemp: "temp",
+    MessageIdentifiers.Humidity: "humidity",
+    MessageIdentifiers.CurrentDistance: "distance",
+    MessageIdentifiers.OvenLog: "log",
+    MessageIdentifiers.PressLog: "log",
+    MessageIdentifiers.BakePhase: "phase",
+    MessageIdentifiers.PressPhase: "phase",
+    MessageIdentifiers.ActiveProfile: "profile",
+    MessageIdentifiers.MachineConnected: "connection",
+    MessageIdentifiers.MachineDisconnected: "connection",
+}
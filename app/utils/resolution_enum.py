@@ -0,0 +1,27 @@
+from enum import Enum
+
+
+class BucketResolution(Enum):
+    """
+    Represents the time resolutions that readings can be aggregated to.
+    Each value is a valid date_trunc field in PostgreSQL.
+    """
+
+    SECOND = "second"
+    MINUTE = "minute"
+    HOUR = "hour"
+    DAY = "day"
+
+    def __str__(self) -> str:
+        return self.value
+
+    @property
+    def seconds(self) -> int:
+        """Maps the enum to the length of its bucket in seconds."""
+        mapping = {
+            BucketResolution.SECOND: 1,
+            BucketResolution.MINUTE: 60,
+            BucketResolution.HOUR: 3600,
+            BucketResolution.DAY: 86400,
+        }
+        return mapping[self]
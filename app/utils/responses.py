@@ -0,0 +1,57 @@
+from collections.abc import Iterable
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.utils.http_messages import HTTPMessages
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    A JSON response rendered with orjson, with the timestamps written like Pydantic
+    writes them: aware UTC timestamps end in Z, and the naive UTC timestamps read from
+    the database have no offset.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def dump_rows(rows: Iterable, schema: type[BaseModel]) -> list[dict]:
+    """
+    Reads the fields of a schema from ORM objects or result rows, without validating
+    them. The rows come from the database with the types of the schema, so they do not
+    need to go through Pydantic.
+
+    Args:
+        rows (Iterable): The ORM objects or result rows.
+        schema (type[BaseModel]): The schema whose fields are read, in order.
+
+    Returns:
+        list[dict]: The field values of each row.
+    """
+
+    fields: tuple[str, ...] = tuple(schema.model_fields)
+
+    return [{field: getattr(row, field) for field in fields} for row in rows]
+
+
+def build_response(msg: HTTPMessages, data: list[dict], **fields) -> ORJSONResponse:
+    """
+    Builds a successful response with the shape of Response, rendered directly with
+    orjson. Returning a response object skips the validation and serialization of the
+    response_model of the route, which has to try every list type of the Response.data
+    union in turn. The route keeps its response_model for the documentation.
+
+    Args:
+        msg (HTTPMessages): The HTTP message of the response.
+        data (list[dict]): The data of the response, e.g. from dump_rows.
+        **fields: The additional fields of the response, e.g. next_cursor.
+
+    Returns:
+        ORJSONResponse: The response.
+    """
+
+    return ORJSONResponse({"success": True, "msg": msg, "data": data, **fields})
@@ -0,0 +1,15 @@
+from enum import Enum
+
+
+class StreamFormat(Enum):
+    """
+    Represents the formats of the streamed history responses.
+    """
+
+    # One JSON object per line
+    NDJSON = "ndjson"
+    # Comma separated values with a header row
+    CSV = "csv"
+
+    def __str__(self) -> str:
+        return self.value
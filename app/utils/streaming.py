@@ -0,0 +1,86 @@
+import csv
+import io
+from collections.abc import AsyncIterator
+from sqlalchemy import Row
+
+from app.utils.json_utils import json_serialize
+from app.utils.stream_enums import StreamFormat
+
+# Media type of the streamed responses per format
+STREAM_MEDIA_TYPES: dict[StreamFormat, str] = {
+    StreamFormat.NDJSON: "application/x-ndjson",
+    StreamFormat.CSV: "text/csv",
+}
+
+
+async def encode_ndjson(partitions: AsyncIterator[list[Row]]) -> AsyncIterator[bytes]:
+    """
+    Encodes streamed rows as NDJSON, one chunk per partition of rows.
+
+    Args:
+        partitions (AsyncIterator[list[Row]]): The rows, in partitions.
+
+    Returns:
+        AsyncIterator[bytes]: One JSON object per row and line.
+    """
+
+    async for rows in partitions:
+        yield "".join(
+            json_serialize(dict(row._mapping)) + "\n" for row in rows
+        ).encode()
+
+
+async def encode_csv(
+    partitions: AsyncIterator[list[Row]], columns: list[str]
+) -> AsyncIterator[bytes]:
+    """
+    Encodes streamed rows as CSV with a header row, one chunk per partition of rows.
+
+    Args:
+        partitions (AsyncIterator[list[Row]]): The rows, in partitions.
+        columns (list[str]): The column names, in the order of the row values.
+
+    Returns:
+        AsyncIterator[bytes]: The header, then the rows.
+    """
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(columns)
+    yield buffer.getvalue().encode()
+
+    async for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            [
+                value.isoformat() if hasattr(value, "isoformat") else value
+                for value in row
+            ]
+            for row in rows
+        )
+        yield buffer.getvalue().encode()
+
+
+def encode_stream(
+    partitions: AsyncIterator[list[Row]],
+    columns: list[str],
+    stream_format: StreamFormat,
+) -> AsyncIterator[bytes]:
+    """
+    Encodes streamed rows in the requested format.
+
+    Args:
+        partitions (AsyncIterator[list[Row]]): The rows, in partitions.
+        columns (list[str]): The column names, in the order of the row values.
+        stream_format (StreamFormat): The format of the response.
+
+    Returns:
+        AsyncIterator[bytes]: The encoded rows.
+    """
+
+    if stream_format == StreamFormat.CSV:
+        return encode_csv(partitions, columns)
+
+    return encode_ndjson(partitions)
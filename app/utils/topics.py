@@ -0,0 +1,100 @@
+from functools import lru_cache
+from itertools import product
+
+from app.utils.message_identifiers import MessageIdentifiers
+
+# Matches any value of one segment of a topic
+WILDCARD: str = "*"
+# Topics have at most this many segments, a topic is matched against 2^segments patterns
+MAX_TOPIC_SEGMENTS: int = 4
+
+
+def get_machine_topic(client_id: str, identifier: MessageIdentifiers) -> str:
+    """
+    Args:
+        client_id (str): The client identifier the frame is addressed to, usually a
+            machine identifier.
+        identifier (MessageIdentifiers): The message identifier.
+
+    Returns:
+        str: The topic, e.g. machine:3:temp.
+    """
+    return f"machine:{client_id}:{identifier.topic}"
+
+
+def get_broadcast_topic(identifier: MessageIdentifiers) -> str:
+    """
+    Args:
+        identifier (MessageIdentifiers): The message identifier.
+
+    Returns:
+        str: The topic of a frame for every client, e.g. broadcast:command.
+    """
+    return f"broadcast:{identifier.topic}"
+
+
+def get_default_topics(client_id: str) -> list[str]:
+    """
+    Lists the topics a client connecting to /ws/{client_id} is subscribed to. A client
+    receives the frames addressed to its identifier, a gui_{id} client also those
+    addressed to machine {id}, and every client receives the broadcasts.
+
+    Args:
+        client_id (str): The client identifier.
+
+    Returns:
+        list[str]: The topic patterns.
+    """
+
+    topics: list[str] = [f"machine:{client_id}:{WILDCARD}"]
+    if client_id.startswith("gui_"):
+        topics.append(f"machine:{client_id.removeprefix('gui_')}:{WILDCARD}")
+    topics.append(f"broadcast:{WILDCARD}")
+
+    return topics
+
+
+def validate_topic(pattern: str) -> str:
+    """
+    Checks a topic pattern a client subscribes to, e.g. machine:3:temp or machine:*:log.
+
+    Args:
+        pattern (str): The topic pattern.
+
+    Returns:
+        str: The pattern.
+
+    Raises:
+        ValueError: If the pattern has empty or too many segments.
+    """
+
+    segments: list[str] = pattern.split(":")
+    if len(segments) > MAX_TOPIC_SEGMENTS or not all(segments):
+        raise ValueError(f"Invalid topic {pattern!r}")
+
+    return pattern
+
+
+@lru_cache(maxsize=4096)
+def get_topic_patterns(topic: str) -> tuple[str, ...]:
+    """
+    Lists the patterns that match a topic, each segment either as is or a wildcard. The
+    subscribers of a topic are looked up by these patterns, so publishing costs a few
+    lookups and then only touches the interested connections.
+
+    Args:
+        topic (str): The topic a frame is published on.
+
+    Returns:
+        tuple[str, ...]: The matching patterns, e.g. machine:3:temp, machine:*:temp, ...
+    """
+
+    segments: list[str] = topic.split(":")
+    if len(segments) > MAX_TOPIC_SEGMENTS:
+        # No subscription can have this many segments, only exact matches are possible
+        return (topic,)
+
+    return tuple(
+        ":".join(pattern)
+        for pattern in product(*((segment, WILDCARD) for segment in segments))
+    )
@@ -0,0 +1,46 @@
+from enum import Enum
+
+
+class SlowConsumerPolicy(Enum):
+    """
+    Represents what happens to a WebSocket connection whose send queue is full.
+    """
+
+    # Discard the oldest queued frame, so slow clients only see the latest values
+    DROP_OLDEST = "DROP_OLDEST"
+    # Discard the new frame and keep the queued backlog
+    DROP_NEWEST = "DROP_NEWEST"
+    # Close the connection of the slow client
+    DISCONNECT = "DISCONNECT"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class BrokerBackend(Enum):
+    """
+    Represents the pub/sub backends that carry WebSocket frames between processes.
+    """
+
+    # Frames only reach the connections of the publishing process
+    MEMORY = "MEMORY"
+    # Frames are relayed through PostgreSQL LISTEN/NOTIFY to every process
+    POSTGRES = "POSTGRES"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class FrameEncoding(Enum):
+    """
+    Represents the encodings of the frames sent to a WebSocket client. A client selects
+    one by offering it as a WebSocket subprotocol when it connects.
+    """
+
+    # JSON text frames, the default
+    JSON = "json"
+    # MessagePack binary frames, more compact and cheaper to decode for high-rate frames
+    MSGPACK = "msgpack"
+
+    def __str__(self) -> str:
+        return self.value
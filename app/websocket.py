@@ -1,40 +1,371 @@
+import asyncio
+import logging
+import time
+from decouple import config
 from fastapi import WebSocket
-from typing import Dict
+from typing import Callable, Dict
 
-from app.utils.json_utils import json_serialize
+from app.broker import Broker, create_broker
+from app.metrics import FRAMES_DROPPED, FRAMES_SENT, SEND_DURATION, get_client_kind
+from app.utils.frames import Frame
 from app.utils.message_identifiers import MessageIdentifiers
+from app.utils.topics import (
+    get_broadcast_topic,
+    get_default_topics,
+    get_machine_topic,
+    get_topic_patterns,
+    validate_topic,
+)
+from app.utils.websocket_enums import FrameEncoding, SlowConsumerPolicy
+
+logger = logging.getLogger(__name__)
 
 GROUP_1_ID: int = 8
 
+# Maximum number of frames queued per connection before the slow consumer policy applies
+SEND_QUEUE_SIZE: int = config("WS_SEND_QUEUE_SIZE", default=100, cast=int)
+# Seconds a single send may take before the connection is considered dead
+SEND_TIMEOUT: float = config("WS_SEND_TIMEOUT", default=5.0, cast=float)
+SLOW_CONSUMER_POLICY: SlowConsumerPolicy = config(
+    "WS_SLOW_CONSUMER_POLICY",
+    default=SlowConsumerPolicy.DROP_OLDEST.value,
+    cast=SlowConsumerPolicy,
+)
+
+# Value compared against the deadband, per identifier of the readings that may be throttled
+THROTTLED_READINGS: dict[str, str] = {
+    MessageIdentifiers.CurrentTemp.value: "temperature",
+    MessageIdentifiers.Humidity.value: "humidity",
+    MessageIdentifiers.CurrentDistance.value: "distance",
+}
+
+
+class Throttle:
+    """
+    Limits the readings a subscription sends to a connection, per topic: at most max_hz
+    frames per second, coalesced to the latest reading, and only readings that moved by
+    more than deadband from the last one accepted. Frames other than readings, e.g. logs
+    and commands, are never throttled.
+    """
+
+    def __init__(self, max_hz: float | None = None, deadband: float | None = None):
+        if max_hz is not None and max_hz <= 0:
+            raise ValueError("max_hz must be positive")
+        if deadband is not None and deadband < 0:
+            raise ValueError("deadband must not be negative")
+
+        self.max_hz = max_hz
+        self.deadband = deadband
+        self.interval: float = 1 / max_hz if max_hz else 0.0
+
+
+class ThrottledTopic:
+    """
+    The state of a throttle for one topic of a connection, e.g. machine:3:temp.
+    """
+
+    __slots__ = ("throttle", "last_value", "sent_at", "pending", "timer")
+
+    def __init__(self, throttle: Throttle):
+        self.throttle = throttle
+        # Value of the last reading sent or awaiting to be sent
+        self.last_value: float | None = None
+        self.sent_at: float = float("-inf")
+        # Latest reading held back by the rate limit, sent when the timer fires
+        self.pending: Frame | None = None
+        self.timer: asyncio.TimerHandle | None = None
+
+    def offer(self, frame: Frame, send: Callable[[Frame], bool]) -> None:
+        """
+        Sends a reading now, holds it back as the latest pending reading, or drops it.
+
+        Args:
+            frame (Frame): The frame.
+            send (Callable[[Frame], bool]): Queues the frame on the connection.
+        """
+
+        throttle: Throttle = self.throttle
+        message = frame.payload.get("message")
+        value = (
+            message.get(THROTTLED_READINGS[frame.payload["identifier"]])
+            if isinstance(message, dict)
+            else None
+        )
+
+        if throttle.deadband is not None and isinstance(value, (int, float)):
+            if (
+                self.last_value is not None
+                and abs(value - self.last_value) <= throttle.deadband
+            ):
+                return
+            self.last_value = value
+
+        loop = asyncio.get_running_loop()
+        wait: float = self.sent_at + throttle.interval - loop.time()
+        if wait <= 0:
+            # The timer may be due but not run yet, its reading is older than this one
+            self.cancel()
+            self.sent_at = loop.time()
+            send(frame)
+            return
+
+        self.pending = frame
+        if self.timer is None:
+            self.timer = loop.call_later(wait, self._send_pending, send)
+
+    def _send_pending(self, send: Callable[[Frame], bool]) -> None:
+        """
+        Sends the latest reading held back by the rate limit.
+
+        Args:
+            send (Callable[[Frame], bool]): Queues the frame on the connection.
+        """
+
+        frame, self.pending, self.timer = self.pending, None, None
+        if frame is not None:
+            self.sent_at = asyncio.get_running_loop().time()
+            send(frame)
+
+    def cancel(self) -> None:
+        """
+        Discards the pending reading.
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+        self.pending, self.timer = None, None
+
+
+class ClientConnection:
+    """
+    Wraps a WebSocket connection with a bounded send queue drained by a writer task,
+    so that a slow client never blocks the sender or the other clients. Frames are sent
+    in the encoding the client negotiated, as text (JSON) or binary (MessagePack).
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        client_id: str,
+        queue_size: int = SEND_QUEUE_SIZE,
+        policy: SlowConsumerPolicy = SLOW_CONSUMER_POLICY,
+        encoding: FrameEncoding = FrameEncoding.JSON,
+    ):
+        self.websocket = websocket
+        self.client_id = client_id
+        self.policy = policy
+        self.encoding = encoding
+        # Topic patterns the connection is subscribed to
+        self.topics: set[str] = set()
+        # Throttles of the throttled subscriptions, by topic pattern
+        self.throttles: dict[str, Throttle] = {}
+        # State of the throttles, by topic
+        self.throttled_topics: dict[str, ThrottledTopic] = {}
+        self.queue: asyncio.Queue[Frame] = asyncio.Queue(maxsize=queue_size)
+        self.dropped_frames: int = 0
+        self.writer_task: asyncio.Task | None = None
+        # Children of the metrics, resolved once instead of on every frame
+        self._frames_sent = FRAMES_SENT.labels(encoding.value)
+        self._frames_dropped = FRAMES_DROPPED.labels(policy.value)
+        self._send_duration = SEND_DURATION.labels(get_client_kind(client_id))
+
+    def start(self) -> None:
+        """
+        Starts the writer task of the connection.
+        """
+        self.writer_task = asyncio.create_task(self._writer())
+
+    def stop(self) -> None:
+        """
+        Stops the writer task of the connection. Queued and pending frames are discarded.
+        """
+        if self.writer_task is not None and not self.writer_task.done():
+            self.writer_task.cancel()
+
+        for throttled_topic in self.throttled_topics.values():
+            throttled_topic.cancel()
+        self.throttled_topics.clear()
+
+    def send(self, topic: str, frame: Frame, throttle: Throttle | None = None) -> None:
+        """
+        Queues a frame published on a topic, through the throttle of the subscription
+        if the frame is a reading.
+
+        Args:
+            topic (str): The topic of the frame.
+            frame (Frame): The frame.
+            throttle (Throttle | None): The throttle of the matching subscription.
+        """
+
+        if (
+            throttle is None
+            or frame.payload.get("identifier") not in THROTTLED_READINGS
+        ):
+            self.enqueue(frame)
+            return
+
+        throttled_topic: ThrottledTopic | None = self.throttled_topics.get(topic)
+        if throttled_topic is None or throttled_topic.throttle is not throttle:
+            if throttled_topic is not None:
+                throttled_topic.cancel()
+            throttled_topic = self.throttled_topics[topic] = ThrottledTopic(throttle)
+
+        throttled_topic.offer(frame, self.enqueue)
+
+    def enqueue(self, frame: Frame) -> bool:
+        """
+        Queues a frame for the writer task without waiting on the socket.
+
+        Args:
+            frame (Frame): The frame.
+
+        Returns:
+            bool: True if the frame was queued, False if it was dropped.
+        """
+
+        if self.queue.full():
+            self.dropped_frames += 1
+            self._frames_dropped.inc()
+
+            if self.policy == SlowConsumerPolicy.DROP_NEWEST:
+                return False
+
+            if self.policy == SlowConsumerPolicy.DISCONNECT:
+                self.stop()
+                asyncio.create_task(self._close())
+                return False
+
+            # Drop the oldest frame to make room for the latest one
+            self.queue.get_nowait()
+
+        self.queue.put_nowait(frame)
+        return True
+
+    async def _writer(self) -> None:
+        """
+        Sends the queued frames one at a time. A send that fails or exceeds the send
+        timeout closes the connection, which ends the receive loop of the endpoint.
+        """
+        try:
+            while True:
+                frame: Frame = await self.queue.get()
+                # Encoded once per encoding and shared by every connection
+                data: str | bytes = frame.encode(self.encoding)
+                send = (
+                    self.websocket.send_bytes(data)
+                    if isinstance(data, bytes)
+                    else self.websocket.send_text(data)
+                )
+                started: float = time.perf_counter()
+                await asyncio.wait_for(send, timeout=SEND_TIMEOUT)
+                self._send_duration.observe(time.perf_counter() - started)
+                self._frames_sent.inc()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await self._close()
+
+    async def _close(self) -> None:
+        """
+        Closes the underlying WebSocket, ignoring errors from an already closed socket.
+        """
+        try:
+            await self.websocket.close()
+        except Exception:
+            pass
+
 
 class ConnectionManager:
-    def __init__(self):
+    """
+    Routes frames to the connections subscribed to their topic, see app.utils.topics.
+    Frames addressed to a machine are published on machine:{id}:{kind}, broadcasts on
+    broadcast:{kind}, and the subscribers are looked up in an index from topic pattern
+    to connections, so a frame only touches the connections interested in it.
+    """
+
+    def __init__(self, broker: Broker | None = None):
         # Dictionary to store active WebSocket connections by client_id
-        self.active_connections: Dict[str, list[WebSocket]] = {}
+        self.active_connections: Dict[str, list[ClientConnection]] = {}
+        # Connections by the topic patterns they are subscribed to
+        self.subscriptions: Dict[str, set[ClientConnection]] = {}
+        # Carries frames to the connections of every process
+        self.broker: Broker = broker or create_broker()
 
-    async def connect(self, websocket: WebSocket, client_id: str) -> None:
+    async def start(self) -> None:
+        """
+        Starts the broker, after which frames published by any process are delivered to the
+        connections of this process.
+        """
+        await self.broker.start(self._deliver)
+
+    async def stop(self) -> None:
+        """
+        Stops the broker and the writer tasks of all connections.
+        """
+        await self.broker.stop()
+
+        for connections in self.active_connections.values():
+            for connection in connections:
+                connection.stop()
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        client_id: str,
+        topics: list[str] | None = None,
+        throttle: Throttle | None = None,
+    ) -> ClientConnection:
         """
         Accepts and stores a new WebSocket connection for a given client identifier.
+        A client that offers the msgpack subprotocol receives MessagePack binary frames,
+        other clients receive JSON text frames.
 
         Args:
             websocket (WebSocket): The WebSocket connection.
             client_id (str): The client identifier.
+            topics (list[str] | None): The topic patterns to subscribe to. By default the
+                client is subscribed to the frames addressed to it, see
+                get_default_topics, and its connection is announced.
+            throttle (Throttle | None): The throttle of the readings sent to the client,
+                by default every reading is sent.
+
+        Returns:
+            ClientConnection: The stored connection.
         """
         client_id = str(client_id)
-        await websocket.accept()
+
+        encoding = FrameEncoding.JSON
+        if FrameEncoding.MSGPACK.value in websocket.scope.get("subprotocols", []):
+            encoding = FrameEncoding.MSGPACK
+            await websocket.accept(subprotocol=encoding.value)
+        else:
+            await websocket.accept()
+
+        connection = ClientConnection(websocket, client_id, encoding=encoding)
+        connection.start()
+
         if client_id not in self.active_connections:
             self.active_connections[client_id] = []
-        self.active_connections[client_id].append(websocket)
-        print(
-            f"Client {client_id} connected. Total connections: {len(self.active_connections[client_id])}"
+            self.broker.announce(frozenset(self.active_connections))
+        self.active_connections[client_id].append(connection)
+        logger.info(
+            "Client connected client_id=%s connections=%d",
+            client_id,
+            len(self.active_connections[client_id]),
         )
 
+        if topics is not None:
+            self.subscribe(connection, topics, throttle)
+            return connection
+
+        self.subscribe(connection, get_default_topics(client_id), throttle)
         await self.send_personal_message(
             f"{client_id} connected to the server",
             client_id,
             MessageIdentifiers.MachineConnected,
         )
 
+        return connection
+
     async def disconnect(self, client_id: str, websocket: WebSocket) -> None:
         """
         Removes and closes a WebSocket connection by client identifier.
@@ -44,14 +375,22 @@ class ConnectionManager:
         """
         client_id = str(client_id)
         if client_id in self.active_connections:
-            self.active_connections[client_id].remove(websocket)
-            print(
-                f"Client {client_id} disconnected. Remaining connections: {len(self.active_connections[client_id])}"
+            for connection in self.active_connections[client_id]:
+                if connection.websocket is websocket:
+                    connection.stop()
+                    self.unsubscribe(connection, list(connection.topics))
+                    self.active_connections[client_id].remove(connection)
+                    break
+            logger.info(
+                "Client disconnected client_id=%s connections=%d",
+                client_id,
+                len(self.active_connections[client_id]),
             )
             if not self.active_connections[
                 client_id
             ]:  # If no more connections, remove the client_id entry
                 del self.active_connections[client_id]
+                self.broker.announce(frozenset(self.active_connections))
 
         await self.send_personal_message(
             f"{client_id} disconnected from the server",
@@ -59,55 +398,112 @@ class ConnectionManager:
             MessageIdentifiers.MachineDisconnected,
         )
 
+    def subscribe(
+        self,
+        connection: ClientConnection,
+        topics: list[str],
+        throttle: Throttle | None = None,
+    ) -> None:
+        """
+        Subscribes a connection to topic patterns, e.g. machine:3:temp or machine:*:log.
+        Subscribing again to a pattern replaces its throttle.
+
+        Args:
+            connection (ClientConnection): The connection.
+            topics (list[str]): The topic patterns, checked with validate_topic.
+            throttle (Throttle | None): The throttle of the readings of these patterns.
+
+        Raises:
+            ValueError: If a pattern is invalid, then no pattern is subscribed to.
+        """
+        for topic in topics:
+            validate_topic(topic)
+
+        for topic in topics:
+            self.subscriptions.setdefault(topic, set()).add(connection)
+            connection.topics.add(topic)
+            if throttle is None:
+                connection.throttles.pop(topic, None)
+            else:
+                connection.throttles[topic] = throttle
+
+    def unsubscribe(self, connection: ClientConnection, topics: list[str]) -> None:
+        """
+        Unsubscribes a connection from topic patterns.
+
+        Args:
+            connection (ClientConnection): The connection.
+            topics (list[str]): The topic patterns.
+        """
+        for topic in topics:
+            subscribers = self.subscriptions.get(topic)
+            if subscribers is not None:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self.subscriptions[topic]
+            connection.topics.discard(topic)
+            connection.throttles.pop(topic, None)
+
     async def send_personal_message(
         self, message: any, client_id: str, identifier: MessageIdentifiers
     ) -> None:
         """
-        Sends a personal message to a specific client by client identifier.
+        Sends a personal message to a specific client by client identifier, on any process.
+        The message is published on the machine topic of the client and identifier, and
+        queued on every subscribed connection without waiting on any socket.
 
         Args:
             message (any): The message to send.
             client_id (str): The client identifier.
             identifier (MessageIdentifiers): The message identifier.
         """
-        # Add the identifier to the message
-        message = json_serialize({"identifier": identifier.value, "message": message})
-        client_id = str(client_id)
-
-        if client_id in self.active_connections:
-            for websocket in self.active_connections[client_id]:
-                await websocket.send_text(message)
-                print(f"Message sent to client {client_id}")
-
-        # Create the gui id for the clients
-        gui_id: str = "gui_" + client_id
-        if gui_id in self.active_connections:
-            for websocket in self.active_connections[gui_id]:
-                await websocket.send_text(message)
-                print(f"Message sent to client {gui_id}")
+        await self.broker.publish(
+            get_machine_topic(str(client_id), identifier),
+            Frame.envelope(identifier, message),
+        )
 
     async def broadcast(self, message: any, identifier: MessageIdentifiers) -> None:
         """
-        Broadcasts a message to all connected clients.
+        Broadcasts a message to all clients subscribed to broadcasts, on any process.
+        The message is queued on every subscribed connection without waiting on any socket.
 
         Args:
-            message (str): The message to broadcast.
+            message (dict): The message to broadcast, sent with the identifier added.
             identifier (MessageIdentifiers): The message identifier.
         """
 
-        # Add the identifier to the message
-        message["identifier"] = identifier.value
+        # Add the identifier to a copy, the caller's message is left untouched
+        await self.broker.publish(
+            get_broadcast_topic(identifier),
+            Frame({**message, "identifier": identifier.value}),
+        )
 
-        message = json_serialize(message)
+    def _deliver(self, topic: str, frame: Frame) -> None:
+        """
+        Queues a frame received from the broker on the subscribed connections of this
+        process, once per connection even if several of its patterns match. A connection
+        with an unthrottled matching subscription receives every frame.
 
-        for client_id, websockets in self.active_connections.items():
-            for websocket in websockets:
-                await websocket.send_text(message)
-                print(f"Broadcast message to client {client_id}")
+        Args:
+            topic (str): The topic of the frame.
+            frame (Frame): The frame.
+        """
+        patterns: tuple[str, ...] = get_topic_patterns(topic)
+        subscribers: dict[ClientConnection, Throttle | None] = {}
+
+        for pattern in patterns:
+            for connection in self.subscriptions.get(pattern, ()):
+                throttle: Throttle | None = connection.throttles.get(pattern)
+                if throttle is None or connection not in subscribers:
+                    subscribers[connection] = throttle
+
+        for connection, throttle in subscribers.items():
+            connection.send(topic, frame, throttle)
 
     def is_client_connected(self, client_id: str) -> bool:
         """
-        Checks if a client is connected.
+        Checks if a client is connected to this process, or to another process as
+        announced through the broker.
 
         Args:
             client_id (str): The client identifier.
@@ -120,7 +516,10 @@ class ConnectionManager:
         if client_id == GROUP_1_ID:
             return True
 
-        return str(client_id) in self.active_connections
+        client_id = str(client_id)
+        return client_id in self.active_connections or self.broker.is_remote_client(
+            client_id
+        )
 
 
 # Create a global instance of the connection manager
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+from collections import deque
+from decouple import config
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.database import AsyncSessionLocal
+from app.crud.rollups import update_rollups
+
+logger = logging.getLogger(__name__)
+
+# Buffer readings in process memory and insert them in the background
+WRITE_BEHIND: bool = config("WRITE_BEHIND", default=False, cast=bool)
+# Maximum number of buffered rows, writers wait for a flush once it is reached
+WRITE_BEHIND_CAPACITY: int = config("WRITE_BEHIND_CAPACITY", default=10000, cast=int)
+# Number of buffered rows that triggers a flush before the interval elapses
+WRITE_BEHIND_FLUSH_ROWS: int = config("WRITE_BEHIND_FLUSH_ROWS", default=1000, cast=int)
+# Milliseconds between two flushes
+WRITE_BEHIND_FLUSH_INTERVAL_MS: int = config(
+    "WRITE_BEHIND_FLUSH_INTERVAL_MS", default=200, cast=int
+)
+
+
+class WriteBehindBuffer:
+    """
+    Holds telemetry rows in a bounded in-process buffer and inserts them in the
+    background, every flush interval or as soon as flush_rows rows are pending, with one
+    multi-row INSERT per table in a single transaction.
+
+    Writers get backpressure: once the buffer holds capacity rows, put waits until a
+    flush has made room. Rows of a flush that fails on a connection error are put back
+    and retried. When the database rejects a flush (integrity or data errors), the rows
+    are retried one at a time and only the rejected ones are dropped and counted, since
+    the request that produced them has already returned.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = WRITE_BEHIND,
+        capacity: int = WRITE_BEHIND_CAPACITY,
+        flush_rows: int = WRITE_BEHIND_FLUSH_ROWS,
+        flush_interval: float = WRITE_BEHIND_FLUSH_INTERVAL_MS / 1000,
+    ):
+        self.enabled = enabled
+        self.capacity = capacity
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        # Pending rows in arrival order, as (ORM model, column values)
+        self.rows: deque[tuple[type, dict]] = deque()
+        self.flushed_rows: int = 0
+        self.dropped_rows: int = 0
+        self._flush_requested = asyncio.Event()
+        self._space_available = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flusher_task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """
+        Starts the background flush task, if write-behind is enabled.
+        """
+        if self.enabled and self._flusher_task is None:
+            self._flusher_task = asyncio.create_task(self._flusher())
+
+    async def stop(self) -> None:
+        """
+        Stops the background flush task and flushes the remaining rows.
+        """
+        if self._flusher_task is not None:
+            # Let a flush in progress finish, cancelling it would lose its rows
+            async with self._flush_lock:
+                self._flusher_task.cancel()
+            try:
+                await self._flusher_task
+            except asyncio.CancelledError:
+                pass
+            self._flusher_task = None
+
+        await self.flush()
+
+    async def put(self, model: type, rows: list[dict]) -> None:
+        """
+        Buffers rows for insertion, waiting for room while the buffer is full.
+
+        Args:
+            model (type): The ORM model of the table.
+            rows (list[dict]): The column values of each row.
+        """
+
+        for row in rows:
+            while len(self.rows) >= self.capacity:
+                self._space_available.clear()
+                self._flush_requested.set()
+                await self._space_available.wait()
+
+            self.rows.append((model, row))
+
+        if len(self.rows) >= self.flush_rows:
+            self._flush_requested.set()
+
+    async def flush(self) -> None:
+        """
+        Inserts the buffered rows, one multi-row INSERT per table in a single transaction.
+        """
+
+        async with self._flush_lock:
+            if not self.rows:
+                return
+
+            pending: list[tuple[type, dict]] = list(self.rows)
+            self.rows.clear()
+
+            rows_per_model: dict[type, list[dict]] = {}
+            for model, row in pending:
+                rows_per_model.setdefault(model, []).append(row)
+
+            try:
+                await self._insert(rows_per_model)
+            except (IntegrityError, DataError):
+                # Retry the rows one at a time so a rejected row does not drop the others
+                retries: list[tuple[type, dict]] = [
+                    (model, row)
+                    for model, rows in rows_per_model.items()
+                    for row in rows
+                ]
+                for position, (model, row) in enumerate(retries):
+                    try:
+                        await self._insert({model: [row]})
+                    except (IntegrityError, DataError):
+                        self.dropped_rows += 1
+                        logger.warning(
+                            "Write-behind dropped a row table=%s row=%s",
+                            model.__tablename__,
+                            row,
+                        )
+                    except Exception:
+                        # The except clause below does not catch errors raised here, keep
+                        # the rows not inserted yet for the next flush
+                        self.rows.extendleft(reversed(retries[position:]))
+                        raise
+            except Exception:
+                # Keep the rows for the next flush, ahead of the rows buffered since
+                self.rows.extendleft(reversed(pending))
+                raise
+            finally:
+                if len(self.rows) < self.capacity:
+                    self._space_available.set()
+
+    async def _insert(self, rows_per_model: dict[type, list[dict]]) -> None:
+        """
+        Inserts rows and updates their rollups in a single transaction.
+
+        Args:
+            rows_per_model (dict[type, list[dict]]): The rows keyed by ORM model.
+        """
+        async with AsyncSessionLocal() as db:
+            for model, rows in rows_per_model.items():
+                await db.execute(insert(model), rows)
+                await update_rollups(db, model, rows)
+            await db.commit()
+
+        self.flushed_rows += sum(len(rows) for rows in rows_per_model.values())
+
+    async def _flusher(self) -> None:
+        """
+        Flushes the buffer every flush interval, or earlier when a flush is requested.
+        """
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._flush_requested.wait(), timeout=self.flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning("Write-behind flush failed, retrying error=%s", e)
+                await asyncio.sleep(self.flush_interval)
+
+
+# Create a global instance of the write-behind buffer
+write_behind = WriteBehindBuffer()
@@ -0,0 +1,402 @@
+"""
+Load tests the ingestion and WebSocket fan-out paths end to end.
+
+N simulated machines post temperature readings to /oven/log/temperature/{machine_id}
+(and an oven log every few readings to /oven/log/{machine_id}) at a fixed rate, while
+M simulated GUI clients listen on /ws/gui_{machine_id}. Each reading carries a unique
+temperature per machine, so the GUI clients can match every CurrentTemp frame to the
+request that produced it and measure the publish-to-receive latency.
+
+Unless --base-url is given, the application is started with uvicorn in a subprocess
+against the database in DATABASE_URL (PostgreSQL, or a SQLite file as a stand-in).
+
+Usage:
+    DATABASE_URL=postgresql://... python -m benchmarks.ingest_fanout --machines 20 --guis 40
+    python -m benchmarks.ingest_fanout --output results/run.json --compare results/base.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import websockets
+
+
+def summarise(latencies: list[float], errors: int, elapsed: float) -> dict[str, float]:
+    """
+    Reports the latency percentiles in milliseconds and the throughput of a series.
+
+    Args:
+        latencies (list[float]): The latencies in seconds.
+        errors (int): The number of failed operations.
+        elapsed (float): The duration of the run in seconds.
+
+    Returns:
+        dict[str, float]: The count, errors, p50, p99, max and throughput per second.
+    """
+
+    latencies = sorted(latency * 1000 for latency in latencies)
+
+    def percentile(q: float) -> float:
+        return round(latencies[int(q * (len(latencies) - 1))], 3) if latencies else 0.0
+
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+        "throughput_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+class Recorder:
+    """
+    Collects the request latencies and the publish times of the readings.
+    """
+
+    def __init__(self):
+        self.temperature_latencies: list[float] = []
+        self.temperature_errors: int = 0
+        self.log_latencies: list[float] = []
+        self.log_errors: int = 0
+        # Send time of each reading keyed by (machine_id, temperature)
+        self.published: dict[tuple[int, float], float] = {}
+        self.end_to_end_latencies: list[float] = []
+        self.frames_received: int = 0
+
+
+async def run_machine(
+    client: httpx.AsyncClient,
+    machine_id: int,
+    rate: float,
+    duration: float,
+    log_every: int,
+    recorder: Recorder,
+) -> None:
+    """
+    Posts readings for one machine at a fixed rate, one request in flight at a time.
+
+    Args:
+        client (httpx.AsyncClient): The HTTP client.
+        machine_id (int): The machine identifier.
+        rate (float): The readings per second.
+        duration (float): The duration of the run in seconds.
+        log_every (int): Post an oven log after this many readings, 0 to disable.
+        recorder (Recorder): Collects the results.
+    """
+
+    start: float = time.perf_counter()
+    sequence: int = 0
+
+    while time.perf_counter() - start < duration:
+        temperature: float = float(sequence)
+        sent: float = time.perf_counter()
+        recorder.published[(machine_id, temperature)] = sent
+
+        try:
+            response = await client.post(
+                f"/oven/log/temperature/{machine_id}",
+                params={"temperature": temperature},
+            )
+            response.raise_for_status()
+            recorder.temperature_latencies.append(time.perf_counter() - sent)
+        except httpx.HTTPError:
+            recorder.temperature_errors += 1
+
+        sequence += 1
+
+        if log_every and sequence % log_every == 0:
+            sent = time.perf_counter()
+            try:
+                response = await client.post(
+                    f"/oven/log/{machine_id}", params={"type": "PHASE_BAKING"}
+                )
+                response.raise_for_status()
+                recorder.log_latencies.append(time.perf_counter() - sent)
+            except httpx.HTTPError:
+                recorder.log_errors += 1
+
+        # Keep to the schedule, without catching up on readings that were late
+        delay: float = start + sequence / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def run_gui(
+    url: str, ready: asyncio.Event, stop: asyncio.Event, recorder: Recorder
+) -> None:
+    """
+    Listens on a GUI WebSocket and measures the latency of every CurrentTemp frame.
+
+    Args:
+        url (str): The WebSocket URL.
+        ready (asyncio.Event): Set once connected.
+        stop (asyncio.Event): Set when the run is over.
+        recorder (Recorder): Collects the results.
+    """
+
+    async with websockets.connect(url, max_queue=None) as websocket:
+        ready.set()
+
+        while not stop.is_set():
+            try:
+                frame = await asyncio.wait_for(websocket.recv(), timeout=0.5)
+            except asyncio.TimeoutError:
+                continue
+
+            received: float = time.perf_counter()
+            recorder.frames_received += 1
+
+            payload: dict = json.loads(frame)
+            if payload.get("identifier") != "CurrentTemp":
+                continue
+
+            message: dict = payload["message"]
+            sent: float | None = recorder.published.get(
+                (message["machine_id"], message["temperature"])
+            )
+            if sent is not None:
+                recorder.end_to_end_latencies.append(received - sent)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    """
+    Creates the machines, connects the GUI clients and drives the load.
+
+    Args:
+        args (argparse.Namespace): The benchmark parameters.
+
+    Returns:
+        dict: The results keyed by path.
+    """
+
+    recorder = Recorder()
+    limits = httpx.Limits(
+        max_connections=args.machines, max_keepalive_connections=args.machines
+    )
+
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=30
+    ) as client:
+        machine_ids: list[int] = []
+        for index in range(args.machines):
+            response = await client.post(
+                "/machines",
+                json={"name": f"Benchmark {index}", "active_profile_id": None},
+            )
+            response.raise_for_status()
+            machine_ids.append(response.json()["data"][0]["id"])
+
+        if args.with_batches:
+            for machine_id in machine_ids:
+                (await client.get(f"/oven/start/{machine_id}")).raise_for_status()
+
+        ws_base: str = args.base_url.replace("http", "ws", 1)
+        stop = asyncio.Event()
+        ready_events: list[asyncio.Event] = []
+        gui_tasks: list[asyncio.Task] = []
+
+        for index in range(args.guis):
+            ready = asyncio.Event()
+            ready_events.append(ready)
+            url = f"{ws_base}/ws/gui_{machine_ids[index % len(machine_ids)]}"
+            gui_tasks.append(asyncio.create_task(run_gui(url, ready, stop, recorder)))
+
+        await asyncio.wait_for(
+            asyncio.gather(*(ready.wait() for ready in ready_events)), timeout=30
+        )
+
+        start: float = time.perf_counter()
+        await asyncio.gather(
+            *(
+                run_machine(
+                    client,
+                    machine_id,
+                    args.rate,
+                    args.duration,
+                    args.log_every,
+                    recorder,
+                )
+                for machine_id in machine_ids
+            )
+        )
+        elapsed: float = time.perf_counter() - start
+
+        # Let the last frames arrive
+        await asyncio.sleep(args.drain)
+        stop.set()
+        await asyncio.gather(*gui_tasks, return_exceptions=True)
+
+    readings: int = len(recorder.temperature_latencies)
+    guis_per_machine: float = args.guis / args.machines
+
+    return {
+        "temperature_log": summarise(
+            recorder.temperature_latencies, recorder.temperature_errors, elapsed
+        ),
+        "oven_log": summarise(recorder.log_latencies, recorder.log_errors, elapsed),
+        "end_to_end": summarise(recorder.end_to_end_latencies, 0, elapsed)
+        | {
+            "expected_frames": round(readings * guis_per_machine),
+            "frames_received": recorder.frames_received,
+        },
+    }
+
+
+def start_server(args: argparse.Namespace) -> subprocess.Popen:
+    """
+    Starts the application with uvicorn and waits until it serves requests.
+
+    Args:
+        args (argparse.Namespace): The benchmark parameters.
+
+    Returns:
+        subprocess.Popen: The server process.
+    """
+
+    env: dict[str, str] = os.environ | {"WS_BROKER": args.broker}
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(args.port),
+            "--workers",
+            str(args.workers),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+
+    deadline: float = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{args.base_url}/docs", timeout=1).raise_for_status()
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+
+    server.terminate()
+    raise RuntimeError("The server did not start within 30 seconds.")
+
+
+def git_commit() -> str | None:
+    """
+    Returns:
+        str | None: The commit of the working tree, None outside a git checkout.
+    """
+
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict) -> None:
+    """
+    Prints the change of every metric against a previous run.
+
+    Args:
+        results (dict): The results of this run.
+        baseline (dict): The results of the previous run.
+    """
+
+    print(f"\nCompared to {baseline.get('commit')} ({baseline.get('created_at')}):")
+    for path, metrics in results.items():
+        for metric, value in metrics.items():
+            previous = baseline["results"].get(path, {}).get(metric)
+            if not previous or metric in ("count", "errors"):
+                continue
+            change: float = (value - previous) / previous * 100
+            print(f"  {path:<18}{metric:<20}{previous:>12}{value:>12}{change:>+9.1f}%")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--machines", type=int, default=10)
+    parser.add_argument("--guis", type=int, default=20)
+    parser.add_argument(
+        "--rate", type=float, default=10.0, help="Readings per second per machine."
+    )
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of load.")
+    parser.add_argument(
+        "--log-every", type=int, default=10, help="Readings per oven log, 0 to disable."
+    )
+    parser.add_argument(
+        "--with-batches", action="store_true", help="Start an oven batch per machine."
+    )
+    parser.add_argument(
+        "--drain", type=float, default=1.0, help="Seconds to wait for the last frames."
+    )
+    parser.add_argument(
+        "--base-url", default=None, help="Use a running server instead of starting one."
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--broker", default="MEMORY", choices=["MEMORY", "POSTGRES"])
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument(
+        "--compare", type=Path, default=None, help="A previous JSON result."
+    )
+    args = parser.parse_args()
+
+    server: subprocess.Popen | None = None
+    if args.base_url is None:
+        args.base_url = f"http://127.0.0.1:{args.port}"
+        server = start_server(args)
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(
+        f"{'path':<18}{'count':>8}{'errors':>8}{'p50 (ms)':>11}{'p99 (ms)':>11}{'max (ms)':>11}{'per s':>9}"
+    )
+    for path, metrics in results.items():
+        print(
+            f"{path:<18}{metrics['count']:>8}{metrics['errors']:>8}{metrics['p50_ms']:>11.3f}"
+            f"{metrics['p99_ms']:>11.3f}{metrics['max_ms']:>11.3f}{metrics['throughput_per_s']:>9.1f}"
+        )
+    print(
+        f"frames received {results['end_to_end']['frames_received']}, "
+        f"CurrentTemp frames expected {results['end_to_end']['expected_frames']}"
+    )
+
+    report: dict = {
+        "benchmark": "ingest_fanout",
+        "created_at": datetime.now(tz=timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "parameters": vars(args)
+        | {"output": str(args.output), "compare": str(args.compare)},
+        "results": results,
+    }
+
+    if args.compare is not None:
+        compare(results, json.loads(args.compare.read_text()))
+
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Benchmarks the machine/time and batch/time log queries before and after the
+composite indexes declared on the models.
+
+The tables are created in a scratch schema of the database in DATABASE_URL
+(PostgreSQL), filled with generated rows and dropped again afterwards.
+
+Usage:
+    DATABASE_URL=postgresql://... python -m benchmarks.log_indexes --rows 5000000
+"""
+
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import Select, desc, select, text
+from sqlalchemy.engine import Connection
+
+from app.database import Base, engine
+from app.models import (
+    Machine as MachineORM,
+    OvenBatch as OvenBatchORM,
+    OvenLog as OvenLogORM,
+    TemperatureLog as TemperatureLogORM,
+    TemperatureProfile as TemperatureProfileORM,
+)
+from app.utils.state_enum import BatchState
+
+SCHEMA: str = "bench_log_indexes"
+TABLES = [
+    MachineORM.__table__,
+    TemperatureProfileORM.__table__,
+    OvenBatchORM.__table__,
+    TemperatureLogORM.__table__,
+    OvenLogORM.__table__,
+]
+
+
+def populate(connection: Connection, machines: int, batches: int, rows: int) -> None:
+    """
+    Fills the scratch tables with generated machines, batches and logs.
+
+    Args:
+        connection (Connection): The connection to the scratch schema.
+        machines (int): The number of machines.
+        batches (int): The number of oven batches per machine.
+        rows (int): The number of temperature logs. A tenth as many oven logs are created.
+    """
+
+    connection.execute(
+        text(
+            f"INSERT INTO {SCHEMA}.machines (id, name) "
+            "SELECT m, 'Machine ' || m FROM generate_series(1, :machines) AS m"
+        ),
+        {"machines": machines},
+    )
+
+    # Batches are one hour long and consecutive per machine, the last one is active
+    connection.execute(
+        text(
+            f"INSERT INTO {SCHEMA}.oven_batches (start_time, stop_time, state, machine_id) "
+            "SELECT now() - (:batches - b) * interval '1 hour', "
+            "CASE WHEN b < :batches THEN now() - (:batches - b - 1) * interval '1 hour' END, "
+            "CASE WHEN b < :batches THEN 'COMPLETED' ELSE 'ACTIVE' END::batch_state_enum, m "
+            "FROM generate_series(1, :machines) AS m, generate_series(1, :batches) AS b"
+        ),
+        {"machines": machines, "batches": batches},
+    )
+
+    # Readings are spread evenly over the machines and over the batch history
+    for table, count, value in (
+        ("temperature_logs", rows, "temperature"),
+        ("oven_logs", rows // 10, "type"),
+    ):
+        value_expression: str = (
+            "20 + random() * 180"
+            if value == "temperature"
+            else "(enum_range(NULL::oven_log_type_enum))[1 + i % 12]"
+        )
+        connection.execute(
+            text(
+                f"INSERT INTO {SCHEMA}.{table} ({value}, created_at, machine_id, batch_id) "
+                f"SELECT {value_expression}, "
+                "now() - ((:count - i)::float / :count) * :batches * interval '1 hour', "
+                "1 + i % :machines, "
+                "(i % :machines) * :batches + 1 + ((i::bigint * :batches) / :count) "
+                "FROM generate_series(0, :count - 1) AS i"
+            ),
+            {"count": count, "machines": machines, "batches": batches},
+        )
+
+    connection.execute(text(f"ANALYZE {SCHEMA}.temperature_logs"))
+    connection.execute(text(f"ANALYZE {SCHEMA}.oven_logs"))
+    connection.execute(text(f"ANALYZE {SCHEMA}.oven_batches"))
+
+
+def benchmark_queries(machine_id: int, batch_id: int) -> dict[str, Select]:
+    """
+    Builds the queries issued by the CRUD layer for one machine and batch.
+
+    Args:
+        machine_id (int): The machine identifier.
+        batch_id (int): The batch identifier.
+
+    Returns:
+        dict[str, Select]: The queries keyed by name.
+    """
+
+    since: datetime = datetime.now(tz=timezone.utc) - timedelta(minutes=15)
+
+    return {
+        "temperature_logs_for_machine_window": select(TemperatureLogORM)
+        .where(TemperatureLogORM.machine_id == machine_id)
+        .where(TemperatureLogORM.created_at >= since)
+        .order_by(desc(TemperatureLogORM.created_at))
+        .limit(100),
+        "temperature_logs_for_batch": select(TemperatureLogORM).where(
+            TemperatureLogORM.batch_id == batch_id
+        ),
+        "oven_logs_for_machine": select(OvenLogORM)
+        .where(OvenLogORM.machine_id == machine_id)
+        .order_by(desc(OvenLogORM.created_at))
+        .limit(100),
+        "latest_oven_batch_for_machine": select(OvenBatchORM)
+        .where(OvenBatchORM.machine_id == machine_id)
+        .order_by(OvenBatchORM.start_time.desc())
+        .limit(1),
+        "active_oven_batch_for_machine": select(OvenBatchORM)
+        .where(OvenBatchORM.state == BatchState.ACTIVE)
+        .where(OvenBatchORM.machine_id == machine_id)
+        .limit(1),
+    }
+
+
+def time_queries(
+    connection: Connection, queries: dict[str, Select], repeat: int
+) -> dict[str, dict[str, float]]:
+    """
+    Times each query and reports the latency statistics in milliseconds.
+
+    Args:
+        connection (Connection): The connection to the scratch schema.
+        queries (dict[str, Select]): The queries keyed by name.
+        repeat (int): The number of timed executions per query.
+
+    Returns:
+        dict[str, dict[str, float]]: The median, p95 and max latency per query.
+    """
+
+    results: dict[str, dict[str, float]] = {}
+
+    for name, query in queries.items():
+        # Warm up the cache so that both runs measure the same thing
+        connection.execute(query).all()
+
+        latencies: list[float] = []
+        for _ in range(repeat):
+            start: float = time.perf_counter()
+            connection.execute(query).all()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        latencies.sort()
+        results[name] = {
+            "median_ms": round(statistics.median(latencies), 3),
+            "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 3),
+            "max_ms": round(latencies[-1], 3),
+        }
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--machines", type=int, default=20)
+    parser.add_argument("--batches", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    bench_engine = engine.execution_options(schema_translate_map={None: SCHEMA})
+    composite_indexes = [
+        index for table in TABLES for index in table.indexes if len(index.columns) > 1
+    ]
+
+    with bench_engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        connection.execute(text(f"SET search_path TO {SCHEMA}, public"))
+        Base.metadata.create_all(connection, tables=TABLES)
+        for index in composite_indexes:
+            index.drop(connection)
+
+        print(f"Populating {args.rows} temperature logs...")
+        populate(connection, args.machines, args.batches, args.rows)
+
+    machine_id: int = args.machines // 2
+    batch_id: int = (machine_id - 1) * args.batches + args.batches // 2
+    queries = benchmark_queries(machine_id, batch_id)
+
+    try:
+        with bench_engine.connect() as connection:
+            before = time_queries(connection, queries, args.repeat)
+
+        with bench_engine.begin() as connection:
+            for index in composite_indexes:
+                index.create(connection)
+            connection.execute(text(f"ANALYZE {SCHEMA}.temperature_logs"))
+            connection.execute(text(f"ANALYZE {SCHEMA}.oven_logs"))
+            connection.execute(text(f"ANALYZE {SCHEMA}.oven_batches"))
+
+        with bench_engine.connect() as connection:
+            after = time_queries(connection, queries, args.repeat)
+    finally:
+        with bench_engine.begin() as connection:
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+    print(f"{'query':<40}{'before (ms)':>14}{'after (ms)':>14}{'speed-up':>10}")
+    for name in queries:
+        before_ms: float = before[name]["median_ms"]
+        after_ms: float = after[name]["median_ms"]
+        print(
+            f"{name:<40}{before_ms:>14.3f}{after_ms:>14.3f}{before_ms / max(after_ms, 1e-3):>9.1f}x"
+        )
+
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(
+            json.dumps(
+                {
+                    "benchmark": "log_indexes",
+                    "created_at": datetime.now(tz=timezone.utc).isoformat(),
+                    "parameters": vars(args) | {"output": str(args.output)},
+                    "before": before,
+                    "after": after,
+                },
+                indent=2,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Benchmarks the serialization of large list responses: the Response model path, where
+FastAPI validates the data against every list type of the Response.data union and
+renders it with json, against the lean path of app.utils.responses, where the rows are
+read into dicts and rendered with orjson.
+
+Both routes return the same in-memory ORM objects through the full ASGI stack, so the
+database is not involved and the difference is the serialization alone. The responses
+of both routes are checked to be equal before timing.
+
+Usage:
+    DATABASE_URL=postgresql://... python -m benchmarks.serialization --rows 1000 5000
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from app.crud.pagination import get_next_cursor
+from app.models import TemperatureLog as TemperatureLogORM
+from app.schemas import PaginatedResponse, TemperatureLog
+from app.utils.http_messages import HTTPMessages
+from app.utils.responses import ORJSONResponse, build_response, dump_rows
+
+
+def generate_logs(rows: int) -> list[TemperatureLogORM]:
+    """
+    Args:
+        rows (int): The number of temperature logs.
+
+    Returns:
+        list[TemperatureLogORM]: The logs, newest first like a page of logs.
+    """
+
+    start = datetime(2026, 10, 1)
+    return [
+        TemperatureLogORM(
+            id=rows - i,
+            temperature=180.0 + (i % 97) * 0.37,
+            created_at=start - timedelta(seconds=i, microseconds=i % 1000),
+            machine_id=1,
+            batch_id=i // 500 or None,
+        )
+        for i in range(rows)
+    ]
+
+
+def create_app(logs: list[TemperatureLogORM]) -> FastAPI:
+    """
+    Args:
+        logs (list[TemperatureLogORM]): The logs returned by both routes.
+
+    Returns:
+        FastAPI: The application with the /model and /lean routes.
+    """
+
+    app = FastAPI(default_response_class=JSONResponse)
+
+    @app.get("/model", response_model=PaginatedResponse)
+    async def model_route() -> PaginatedResponse:
+        return PaginatedResponse(
+            success=True,
+            msg=HTTPMessages.TEMPERATURE_LOGS_RETRIEVED,
+            data=logs,
+            next_cursor=get_next_cursor(logs, len(logs)),
+        )
+
+    @app.get("/lean", response_model=PaginatedResponse)
+    async def lean_route() -> ORJSONResponse:
+        return build_response(
+            HTTPMessages.TEMPERATURE_LOGS_RETRIEVED,
+            dump_rows(logs, TemperatureLog),
+            next_cursor=get_next_cursor(logs, len(logs)),
+        )
+
+    return app
+
+
+async def time_route(
+    client: httpx.AsyncClient, path: str, repeat: int
+) -> dict[str, float]:
+    """
+    Args:
+        client (httpx.AsyncClient): The client of the application.
+        path (str): The path of the route.
+        repeat (int): The number of timed requests.
+
+    Returns:
+        dict[str, float]: The median and p90 CPU time per request in milliseconds, and
+            the size of the response.
+    """
+
+    await client.get(path)
+
+    timings: list[float] = []
+    for _ in range(repeat):
+        started: float = time.process_time()
+        response = await client.get(path)
+        timings.append((time.process_time() - started) * 1000)
+
+    timings.sort()
+    return {
+        "median_cpu_ms": round(statistics.median(timings), 3),
+        "p90_cpu_ms": round(timings[int(0.9 * (len(timings) - 1))], 3),
+        "bytes": len(response.content),
+    }
+
+
+async def run(rows: list[int], repeat: int) -> dict[int, dict[str, dict]]:
+    """
+    Args:
+        rows (list[int]): The page sizes to time.
+        repeat (int): The number of timed requests per page size and route.
+
+    Returns:
+        dict[int, dict[str, dict]]: The timings per page size and route.
+    """
+
+    results: dict[int, dict[str, dict]] = {}
+
+    for count in rows:
+        app = create_app(generate_logs(count))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            model_body = (await c.get("/model")).json()
+            lean_body = (await c.get("/lean")).json()
+            if model_body != lean_body:
+                raise AssertionError(f"The responses differ for {count} rows.")
+
+            results[count] = {
+                "model": await time_route(c, "/model", repeat),
+                "lean": await time_route(c, "/lean", repeat),
+            }
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.rows, args.repeat))
+
+    print(f"{'rows':>8}{'model (ms)':>14}{'lean (ms)':>14}{'speed-up':>10}")
+    for count, timings in results.items():
+        model_ms: float = timings["model"]["median_cpu_ms"]
+        lean_ms: float = timings["lean"]["median_cpu_ms"]
+        print(
+            f"{count:>8}{model_ms:>14.3f}{lean_ms:>14.3f}{model_ms / max(lean_ms, 1e-3):>9.1f}x"
+        )
+
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(
+            json.dumps(
+                {
+                    "benchmark": "serialization",
+                    "created_at": datetime.now(tz=timezone.utc).isoformat(),
+                    "parameters": vars(args) | {"output": str(args.output)},
+                    "results": results,
+                },
+                indent=2,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
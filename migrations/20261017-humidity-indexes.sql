@@ -0,0 +1,9 @@
+-- Composite indexes for the machine/time and batch/time humidity queries.
+-- On a live database, run each statement with CREATE INDEX CONCURRENTLY instead.
+CREATE INDEX IF NOT EXISTS ix_humidity_logs_machine_id_created_at
+ON humidity_logs (machine_id, created_at);
+
+CREATE INDEX IF NOT EXISTS ix_humidity_logs_batch_id_created_at
+ON humidity_logs (batch_id, created_at);
+
+ANALYZE humidity_logs;
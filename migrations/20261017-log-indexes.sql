@@ -0,0 +1,40 @@
+-- Composite indexes for the machine/time and batch/time log queries.
+-- On a live database with large log tables, run each statement separately with
+-- CREATE INDEX CONCURRENTLY to avoid blocking inserts while the index builds.
+
+-- Temperature logs
+CREATE INDEX IF NOT EXISTS ix_temperature_logs_machine_id_created_at
+ON temperature_logs (machine_id, created_at);
+
+CREATE INDEX IF NOT EXISTS ix_temperature_logs_batch_id_created_at
+ON temperature_logs (batch_id, created_at);
+
+-- Oven logs
+CREATE INDEX IF NOT EXISTS ix_oven_logs_machine_id_created_at
+ON oven_logs (machine_id, created_at);
+
+CREATE INDEX IF NOT EXISTS ix_oven_logs_batch_id_created_at
+ON oven_logs (batch_id, created_at);
+
+-- Press logs
+CREATE INDEX IF NOT EXISTS ix_press_logs_machine_id_created_at
+ON press_logs (machine_id, created_at);
+
+CREATE INDEX IF NOT EXISTS ix_press_logs_batch_id_created_at
+ON press_logs (batch_id, created_at);
+
+-- Oven batches
+CREATE INDEX IF NOT EXISTS ix_oven_batches_machine_id_state
+ON oven_batches (machine_id, state);
+
+CREATE INDEX IF NOT EXISTS ix_oven_batches_machine_id_start_time
+ON oven_batches (machine_id, start_time);
+
+-- Press batches
+CREATE INDEX IF NOT EXISTS ix_press_batches_machine_id_state
+ON press_batches (machine_id, state);
+
+CREATE INDEX IF NOT EXISTS ix_press_batches_machine_id_start_time
+ON press_batches (machine_id, start_time);
+
+ANALYZE temperature_logs, oven_logs, press_logs, oven_batches, press_batches;
@@ -0,0 +1,90 @@
+-- Converts the log tables to tables range partitioned by month on created_at.
+-- Queries on a recent time window then only scan the partitions of that window, and
+-- old months can be dropped or archived as a whole by app.maintenance.
+--
+-- Each table is rebuilt and its rows copied, so run this during a maintenance window.
+-- Monthly partitions are created from the first logged month up to three months ahead,
+-- plus a default partition that catches rows outside those months until the
+-- maintenance job moves them into a partition of their own. The primary key becomes
+-- (id, created_at), since it must contain the partition key.
+BEGIN;
+
+CREATE FUNCTION pg_temp.partition_log_table(log_table text) RETURNS void AS $$
+DECLARE
+    old_table text := log_table || '_unpartitioned';
+    id_sequence text := pg_get_serial_sequence(log_table, 'id');
+    partition_month date;
+    last_month date := date_trunc('month', now()) + interval '3 months';
+    foreign_key record;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table WHERE partrelid = log_table::regclass
+    ) THEN
+        RETURN;
+    END IF;
+
+    EXECUTE format('UPDATE %I SET created_at = now() WHERE created_at IS NULL', log_table);
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', log_table, old_table);
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS, PRIMARY KEY (id, created_at)) '
+        'PARTITION BY RANGE (created_at)',
+        log_table, old_table
+    );
+
+    EXECUTE format('SELECT date_trunc(''month'', min(created_at))::date FROM %I', old_table)
+    INTO partition_month;
+    partition_month := COALESCE(partition_month, date_trunc('month', now())::date);
+
+    WHILE partition_month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+            log_table || to_char(partition_month, '"_p"YYYY_MM'),
+            log_table,
+            partition_month,
+            partition_month + interval '1 month'
+        );
+        partition_month := partition_month + interval '1 month';
+    END LOOP;
+
+    EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', log_table || '_default', log_table);
+
+    EXECUTE format('INSERT INTO %I SELECT * FROM %I', log_table, old_table);
+
+    FOR foreign_key IN
+        SELECT conname, pg_get_constraintdef(oid) AS definition
+        FROM pg_constraint
+        WHERE conrelid = old_table::regclass AND contype = 'f'
+    LOOP
+        EXECUTE format(
+            'ALTER TABLE %I ADD CONSTRAINT %I %s',
+            log_table, foreign_key.conname, foreign_key.definition
+        );
+    END LOOP;
+
+    -- Keep the id sequence when the old table is dropped
+    EXECUTE format('ALTER SEQUENCE %s OWNED BY %I.id', id_sequence, log_table);
+    EXECUTE format('DROP TABLE %I', old_table);
+
+    EXECUTE format(
+        'CREATE INDEX %I ON %I (machine_id, created_at)',
+        'ix_' || log_table || '_machine_id_created_at', log_table
+    );
+    EXECUTE format(
+        'CREATE INDEX %I ON %I (batch_id, created_at)',
+        'ix_' || log_table || '_batch_id_created_at', log_table
+    );
+
+    EXECUTE format('ANALYZE %I', log_table);
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT pg_temp.partition_log_table(log_table)
+FROM unnest(ARRAY[
+    'temperature_logs',
+    'humidity_logs',
+    'oven_logs',
+    'press_logs',
+    'press_distance_logs'
+]) AS log_table;
+
+COMMIT;
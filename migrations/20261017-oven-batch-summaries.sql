@@ -0,0 +1,55 @@
+-- Summary of each completed oven batch, written when the batch is stopped
+CREATE TABLE IF NOT EXISTS oven_batch_summaries (
+    batch_id INT PRIMARY KEY REFERENCES oven_batches(id) ON DELETE CASCADE,
+    profile_id INT REFERENCES temperature_profiles(id) ON DELETE SET NULL,
+    desired_temp FLOAT,
+    max_temp FLOAT,
+    band_tolerance FLOAT NOT NULL,
+    reading_count INT NOT NULL,
+    peak_temperature FLOAT,
+    mean_temperature FLOAT,
+    time_in_band_sec FLOAT,
+    time_over_max_sec FLOAT,
+    peak_overshoot FLOAT,
+    duration_sec FLOAT NOT NULL
+);
+
+-- Backfill the completed batches, measured against the profile currently active on
+-- the machine and the default band tolerance of 5 degrees
+INSERT INTO oven_batch_summaries (
+    batch_id, profile_id, desired_temp, max_temp, band_tolerance, reading_count,
+    peak_temperature, mean_temperature, time_in_band_sec, time_over_max_sec,
+    peak_overshoot, duration_sec
+)
+SELECT
+    b.id,
+    p.id,
+    p.desired_temp,
+    p.max_temp,
+    5.0,
+    COUNT(r.temperature),
+    MAX(r.temperature),
+    AVG(r.temperature),
+    CASE WHEN p.id IS NOT NULL THEN COALESCE(SUM(r.held_sec) FILTER (
+        WHERE r.temperature BETWEEN p.desired_temp - 5.0 AND p.desired_temp + 5.0
+    ), 0) END,
+    CASE WHEN p.id IS NOT NULL THEN COALESCE(SUM(r.held_sec) FILTER (
+        WHERE r.temperature > p.max_temp
+    ), 0) END,
+    GREATEST(MAX(r.temperature) - p.max_temp, 0),
+    EXTRACT(EPOCH FROM b.stop_time - b.start_time)
+FROM oven_batches b
+JOIN machines m ON m.id = b.machine_id
+LEFT JOIN temperature_profiles p ON p.id = m.active_profile_id
+LEFT JOIN LATERAL (
+    SELECT
+        t.temperature,
+        EXTRACT(EPOCH FROM COALESCE(
+            LEAD(t.created_at) OVER (ORDER BY t.created_at, t.id), b.stop_time
+        ) - t.created_at) AS held_sec
+    FROM temperature_logs t
+    WHERE t.batch_id = b.id AND t.created_at IS NOT NULL
+) r ON TRUE
+WHERE b.state = 'COMPLETED' AND b.stop_time IS NOT NULL
+GROUP BY b.id, p.id
+ON CONFLICT (batch_id) DO NOTHING;
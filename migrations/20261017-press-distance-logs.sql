@@ -0,0 +1,14 @@
+-- Position time series of the press, sampled at high frequency during a stroke
+CREATE TABLE IF NOT EXISTS press_distance_logs (
+    id BIGSERIAL PRIMARY KEY,
+    distance REAL NOT NULL,
+    created_at TIMESTAMP NOT NULL,
+    machine_id INT NOT NULL REFERENCES machines(id),
+    batch_id INT REFERENCES press_batches(id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_press_distance_logs_machine_id_created_at
+ON press_distance_logs (machine_id, created_at);
+
+CREATE INDEX IF NOT EXISTS ix_press_distance_logs_batch_id_created_at
+ON press_distance_logs (batch_id, created_at);
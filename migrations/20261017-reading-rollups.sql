@@ -0,0 +1,75 @@
+-- Temperature and humidity logs pre-aggregated per machine and second, minute and hour.
+-- The application adds every inserted log to the rollups in the transaction of the
+-- insert (see app.crud.rollups), and answers bucket queries from the coarsest rollup
+-- that covers them exactly, so a month of daily or hourly buckets reads a few hundred
+-- rollup rows instead of millions of logs.
+BEGIN;
+
+DO $$
+BEGIN
+    CREATE TYPE bucket_resolution_enum AS ENUM ('SECOND', 'MINUTE', 'HOUR', 'DAY');
+EXCEPTION
+    WHEN duplicate_object THEN NULL;
+END
+$$;
+
+CREATE TABLE IF NOT EXISTS temperature_rollups (
+    machine_id INT NOT NULL REFERENCES machines(id) ON DELETE CASCADE,
+    resolution bucket_resolution_enum NOT NULL,
+    bucket_start TIMESTAMP NOT NULL,
+    min_temperature FLOAT NOT NULL,
+    max_temperature FLOAT NOT NULL,
+    sum_temperature FLOAT NOT NULL,
+    count INT NOT NULL,
+    PRIMARY KEY (machine_id, resolution, bucket_start)
+);
+
+CREATE TABLE IF NOT EXISTS humidity_rollups (
+    machine_id INT NOT NULL REFERENCES machines(id) ON DELETE CASCADE,
+    resolution bucket_resolution_enum NOT NULL,
+    bucket_start TIMESTAMP NOT NULL,
+    min_humidity FLOAT NOT NULL,
+    max_humidity FLOAT NOT NULL,
+    sum_humidity FLOAT NOT NULL,
+    count INT NOT NULL,
+    PRIMARY KEY (machine_id, resolution, bucket_start)
+);
+
+-- Backfill the rollups from the stored logs
+INSERT INTO temperature_rollups (
+    machine_id, resolution, bucket_start,
+    min_temperature, max_temperature, sum_temperature, count
+)
+SELECT
+    machine_id,
+    upper(resolution)::bucket_resolution_enum,
+    date_trunc(resolution, created_at),
+    MIN(temperature),
+    MAX(temperature),
+    SUM(temperature),
+    COUNT(*)
+FROM temperature_logs
+CROSS JOIN unnest(ARRAY['second', 'minute', 'hour']) AS resolution
+WHERE machine_id IS NOT NULL AND created_at IS NOT NULL AND temperature IS NOT NULL
+GROUP BY machine_id, resolution, date_trunc(resolution, created_at)
+ON CONFLICT DO NOTHING;
+
+INSERT INTO humidity_rollups (
+    machine_id, resolution, bucket_start,
+    min_humidity, max_humidity, sum_humidity, count
+)
+SELECT
+    machine_id,
+    upper(resolution)::bucket_resolution_enum,
+    date_trunc(resolution, created_at),
+    MIN(humidity),
+    MAX(humidity),
+    SUM(humidity),
+    COUNT(*)
+FROM humidity_logs
+CROSS JOIN unnest(ARRAY['second', 'minute', 'hour']) AS resolution
+WHERE machine_id IS NOT NULL AND created_at IS NOT NULL AND humidity IS NOT NULL
+GROUP BY machine_id, resolution, date_trunc(resolution, created_at)
+ON CONFLICT DO NOTHING;
+
+COMMIT;
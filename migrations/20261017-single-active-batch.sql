@@ -0,0 +1,46 @@
+-- Allows at most one active batch per machine, so concurrent start commands cannot
+-- leave a machine with two active batches. The start commands retry when they lose
+-- the race on this index.
+BEGIN;
+
+-- Complete every active batch but the latest one of each machine, stopping it when
+-- the next batch of the machine started
+WITH ranked AS (
+    SELECT id, ROW_NUMBER() OVER (
+        PARTITION BY machine_id ORDER BY start_time DESC, id DESC
+    ) AS position
+    FROM oven_batches
+    WHERE state = 'ACTIVE'
+)
+UPDATE oven_batches b
+SET state = 'COMPLETED',
+    stop_time = COALESCE(b.stop_time, (
+        SELECT MIN(n.start_time) FROM oven_batches n
+        WHERE n.machine_id = b.machine_id AND n.start_time > b.start_time
+    ), now())
+FROM ranked r
+WHERE r.id = b.id AND r.position > 1;
+
+WITH ranked AS (
+    SELECT id, ROW_NUMBER() OVER (
+        PARTITION BY machine_id ORDER BY start_time DESC, id DESC
+    ) AS position
+    FROM press_batches
+    WHERE state = 'ACTIVE'
+)
+UPDATE press_batches b
+SET state = 'COMPLETED',
+    stop_time = COALESCE(b.stop_time, (
+        SELECT MIN(n.start_time) FROM press_batches n
+        WHERE n.machine_id = b.machine_id AND n.start_time > b.start_time
+    ), now())
+FROM ranked r
+WHERE r.id = b.id AND r.position > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_oven_batches_machine_id_active
+ON oven_batches (machine_id) WHERE state = 'ACTIVE';
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_press_batches_machine_id_active
+ON press_batches (machine_id) WHERE state = 'ACTIVE';
+
+COMMIT;
@@ -0,0 +1,4 @@
+import os
+
+# The app reads its configuration on import, the tests never connect to the database
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, column, select, table
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from app.profiling import RequestProfile, normalize_statement
+
+logs = table(
+    "temperature_logs",
+    column("id", Integer),
+    column("machine_id", Integer),
+    column("created_at", DateTime),
+    column("source", String),
+)
+
+
+def compile_asyncpg(statement) -> str:
+    """
+    Args:
+        statement: The SQLAlchemy statement.
+
+    Returns:
+        str: The SQL sent to asyncpg, with the IN lists expanded.
+    """
+    return statement.compile(
+        dialect=asyncpg_dialect(), compile_kwargs={"render_postcompile": True}
+    ).string
+
+
+def get_lookup(machine_ids: list[int], created_at: list[datetime]) -> str:
+    """
+    Args:
+        machine_ids (list[int]): The machine identifiers of the IN list.
+        created_at (list[datetime]): The timestamps of the IN list.
+
+    Returns:
+        str: The lookup as sent to asyncpg.
+    """
+    return compile_asyncpg(
+        select(logs.c.id).where(
+            logs.c.machine_id.in_(machine_ids),
+            logs.c.created_at.in_(created_at),
+            logs.c.source == "hmi",
+        )
+    )
+
+
+def test_asyncpg_in_lists_of_different_lengths_collapse():
+    now = datetime(2026, 10, 17)
+    short: str = get_lookup([1, 2], [now])
+    long: str = get_lookup([1, 2, 3], [now, now])
+
+    assert "::INTEGER" in short and "::TIMESTAMP WITHOUT TIME ZONE" in short
+    assert normalize_statement(short) == normalize_statement(long)
+    assert normalize_statement(short) == (
+        "SELECT temperature_logs.id FROM temperature_logs "
+        "WHERE temperature_logs.machine_id IN (?) "
+        "AND temperature_logs.created_at IN (?) AND temperature_logs.source = ?"
+    )
+
+
+def test_repeated_asyncpg_lookups_are_flagged():
+    now = datetime(2026, 10, 17)
+    profile = RequestProfile("GET", "/oven/batches")
+    for count in range(1, 4):
+        profile.statements.append((get_lookup(list(range(count)), [now]), 0.001, 1))
+
+    assert list(profile.get_repeated(threshold=3).values()) == [3]
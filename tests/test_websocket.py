@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from app.utils.frames import Frame
+from app.utils.message_identifiers import MessageIdentifiers
+from app.websocket import Throttle, ThrottledTopic
+
+
+def get_reading(temperature: float) -> Frame:
+    """
+    Args:
+        temperature (float): The temperature.
+
+    Returns:
+        Frame: The CurrentTemp frame.
+    """
+    return Frame.envelope(MessageIdentifiers.CurrentTemp, {"temperature": temperature})
+
+
+def test_pending_reading_is_not_sent_after_a_newer_one():
+    async def offer_readings() -> list[float]:
+        sent: list[float] = []
+        topic = ThrottledTopic(Throttle(max_hz=10, deadband=1))
+
+        def send(frame: Frame) -> bool:
+            sent.append(frame.payload["message"]["temperature"])
+            return True
+
+        topic.offer(get_reading(20), send)
+        topic.offer(get_reading(25), send)
+        # Block the loop past the interval, so the timer is due but has not run yet
+        time.sleep(0.15)
+        topic.offer(get_reading(30), send)
+        topic.offer(get_reading(30.5), send)
+        await asyncio.sleep(0.2)
+        return sent
+
+    assert asyncio.run(offer_readings()) == [20, 30]
+
+
+def test_latest_reading_is_sent_when_the_interval_ends():
+    async def offer_readings() -> list[float]:
+        sent: list[float] = []
+        topic = ThrottledTopic(Throttle(max_hz=10, deadband=1))
+
+        def send(frame: Frame) -> bool:
+            sent.append(frame.payload["message"]["temperature"])
+            return True
+
+        for temperature in (20, 25, 25.5, 27):
+            topic.offer(get_reading(temperature), send)
+        await asyncio.sleep(0.2)
+        topic.offer(get_reading(40), send)
+        return sent
+
+    assert asyncio.run(offer_readings()) == [20, 27, 40]